@@ -6,37 +6,91 @@ __metaclass__ = type
 
 
 from ansible.errors import AnsibleActionFail
-from ansible.plugins.action import ActionBase
-from ansible.module_utils._text import to_text, to_bytes
 
-try:
-    import bcrypt
-    HAS_BCRYPT = True
-except Exception:
-    HAS_BCRYPT = False
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import opendistro_argument_spec
+from ansible_collections.jiuka.opendistro.plugins.plugin_utils.action import OpenDistroActionModule
+from ansible_collections.jiuka.opendistro.plugins.plugin_utils.password import PasswordHasher, hash_passwords
 
 
-class ActionModule(ActionBase):
+# Options of the user module which can also be given per item of users
+USER_OPTIONS = ('password', 'password_hash', 'hash', 'update_password', 'description', 'roles', 'attributes', 'state')
+
+
+class ActionModule(OpenDistroActionModule):
+
+    MODULE = 'user'
 
     def run(self, tmp=None, task_vars=None):
 
-        result = super(ActionModule, self).run(tmp, task_vars)
+        result = super(OpenDistroActionModule, self).run(tmp, task_vars)
+
+        if self._task.args.get('users', None) is not None:
+            result.update(self._run_users(task_vars))
+            return result
 
         password = self._task.args.get('password', None)
 
         new_module_args = self._task.args.copy()
 
         if password:
-            if not HAS_BCRYPT:
-                raise AnsibleActionFail("Python module bcrypt is required for the password parameter.")
+            user = dict((k, v) for k, v in self._task.args.items() if k in USER_OPTIONS)
+            user['name'] = self._task.args.get('name', self._task.args.get('user', None))
+
+            # Whether the user exists differs per cluster, so with clusters the password is always hashed
+            if self._task.args.get('clusters', None):
+                hash_passwords(PasswordHasher(rounds=self._task.args.get('password_hash_rounds', None)), [user])
+            else:
+                self._hash_passwords([user])
 
-            salt = bcrypt.gensalt(prefix=b'2a')
-            pwhash = bcrypt.hashpw(to_bytes(password), salt)
             new_module_args['password'] = None
-            new_module_args['password_hash'] = to_text(pwhash)
+            if user.get('password_hash', None):
+                new_module_args['password_hash'] = user['password_hash']
+
+        result.update(self._run_module(self.MODULE, new_module_args, task_vars))
+
+        return result
+
+    def _run_users(self, task_vars):
+        """Apply all users with a single run of the users module."""
+        if self._task.args.get('clusters', None):
+            raise AnsibleActionFail('clusters is not supported together with users')
+        for option in ('name', 'user'):
+            if self._task.args.get(option, None) is not None:
+                raise AnsibleActionFail('parameters are mutually exclusive: {0}|users'.format(option))
+
+        defaults = dict((k, v) for k, v in self._task.args.items() if k in USER_OPTIONS)
+        users = []
+        for user in self._task.args['users']:
+            user = dict(defaults, **user)
+            if 'user' in user:
+                if 'name' in user:
+                    raise AnsibleActionFail('parameters are mutually exclusive: name|user in users')
+                user['name'] = user.pop('user')
+            if user.get('hash', None) is not None and user.get('password_hash', None) is not None:
+                raise AnsibleActionFail('parameters are mutually exclusive: hash|password_hash for user {0}, '
+                                        'also if one is given on the task and one on the user'.format(user.get('name', None)))
+            users.append(user)
+
+        self._hash_passwords(users)
+
+        module_args = dict((k, v) for k, v in self._task.args.items() if k in opendistro_argument_spec())
+        module_args['users'] = users
+        if 'password_hash_rounds' in self._task.args:
+            module_args['password_hash_rounds'] = self._task.args['password_hash_rounds']
+
+        result = self._run_module('users', module_args, task_vars)
+        if result.get('failed', False):
+            return result
 
-        result.update(self._execute_module(module_name='jiuka.opendistro.user',
-                                           module_args=new_module_args,
-                                           task_vars=task_vars))
+        # Report each user like an item of a loop
+        diff = result.get('diff', None)
+        changed = set(result.get('created', []) + result.get('updated', []) + result.get('removed', []))
+        result['results'] = []
+        for user in users:
+            item = dict(name=user['name'], changed=user['name'] in changed, state=user.get('state', None) or 'present')
+            if diff is not None and item['changed']:
+                item['diff'] = dict(before=diff['before'].get(user['name'], {}),
+                                    after=diff['after'].get(user['name'], {}))
+            result['results'].append(item)
 
         return result
@@ -0,0 +1,28 @@
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+from ansible_collections.jiuka.opendistro.plugins.plugin_utils.action import OpenDistroActionModule
+
+
+class ActionModule(OpenDistroActionModule):
+
+    MODULE = 'users'
+
+    def run(self, tmp=None, task_vars=None):
+
+        result = super(OpenDistroActionModule, self).run(tmp, task_vars)
+
+        new_module_args = self._task.args.copy()
+        users = [dict(user) for user in self._task.args.get('users', None) or []]
+
+        if any(user.get('password', None) for user in users):
+            self._hash_passwords(users)
+            new_module_args['users'] = users
+
+        result.update(self._run_module(self.MODULE, new_module_args, task_vars))
+
+        return result
@@ -5,6 +5,8 @@ options:
         description:
             - The URL of the elasticsearch cluster.
             - If the value is not specified in the task, the value of environment variable C(ELASTICSEARCH_URL) will be used instead.
+            - Not required when running on a C(httpapi) connection with the C(jiuka.opendistro.opendistro) plugin,
+              requests are then sent over the persistent connection.
         required: false
         type: str
     elasticsearch_user:
@@ -41,4 +43,166 @@ options:
         required: false
         type: bool
         default: true
+    connection_pool_size:
+        description:
+            - Number of idle keep-alive connections to keep open to the elasticsearch cluster.
+        required: false
+        type: int
+        default: 4
+    connection_idle_timeout:
+        description:
+            - Seconds after which an idle keep-alive connection is not reused anymore.
+        required: false
+        type: int
+        default: 60
+    cache_dir:
+        description:
+            - Directory to cache cluster information in.
+            - If the value is not specified in the task, the value of environment variable C(ELASTICSEARCH_CACHE_DIR) will be used instead.
+        required: false
+        type: path
+        default: ~/.ansible/cache/jiuka.opendistro
+    server_info_cache_ttl:
+        description:
+            - Seconds to reuse the cached result of the C(_nodes/_local/plugins) probe for.
+            - The cache is keyed by I(elasticsearch_url) and the credentials used.
+            - Set to C(0) to probe the cluster on every run.
+        required: false
+        type: int
+        default: 300
+    max_concurrent_requests:
+        description:
+            - Maximum number of requests sent to the cluster at the same time by modules working on many entities.
+            - Consider raising I(connection_pool_size) along with it.
+        required: false
+        type: int
+        default: 8
+    retries:
+        description:
+            - Number of times a request is retried if the cluster answers with 429, 502, 503 or 504 or cannot be reached.
+            - Set to C(0) to disable retries.
+        required: false
+        type: int
+        default: 3
+    retry_backoff:
+        description:
+            - Base delay in seconds of the exponential backoff between retries.
+            - A C(Retry-After) header sent by the cluster takes precedence.
+        required: false
+        type: float
+        default: 0.5
+    retry_max_time:
+        description:
+            - Maximum number of seconds to spend retrying a single request.
+        required: false
+        type: float
+        default: 60
+    retry_patch:
+        description:
+            - Also retry PATCH requests.
+            - PATCH requests are not idempotent in general, only enable this if the sent patches are.
+        required: false
+        type: bool
+        default: false
+    metrics:
+        description:
+            - Return timings, byte counts and status codes of all requests sent to the cluster as C(metrics).
+            - Timings are split into C(dns), C(connect), C(tls), C(ttfb) and C(total) where a new connection was opened.
+        required: false
+        type: bool
+        default: false
+    metrics_file:
+        description:
+            - Append the metrics of each run as a JSON line to this file.
+        required: false
+        type: path
+    response_cache:
+        description:
+            - Cache the responses of GET requests in I(cache_dir) and revalidate them with C(If-None-Match) or C(If-Modified-Since).
+            - The cache is keyed by the URL, I(elasticsearch_url) and the credentials used.
+            - Every change made through the modules drops the cached responses of the changed ressource.
+            - Cached responses include password hashes, the cache files are only readable by the owner.
+        required: false
+        type: bool
+        default: false
+    response_cache_ttl:
+        description:
+            - Seconds to serve a cached response for without asking the cluster, if it was sent without C(ETag) or C(Last-Modified) header.
+            - Changes made to the cluster by other means may go unnoticed for this long.
+            - Set to C(0) to always fetch those responses again.
+        required: false
+        type: int
+        default: 30
+    snapshot:
+        description:
+            - Path to a snapshot written by M(jiuka.opendistro.security_snapshot).
+            - In check mode all informations are read from the snapshot instead of the cluster, no connection is made.
+            - I(elasticsearch_url) is not required in check mode if a snapshot is given.
+            - Ignored outside of check mode.
+        required: false
+        type: path
+    run_on_controller:
+        description:
+            - Run the module inside the Ansible worker on the controller instead of transferring it to the host.
+            - All runs in a worker, like the items of a loop, share their connections to the cluster.
+            - The module runs on the controller regardless of C(delegate_to) and without the task C(environment).
+            - If the value is not specified in the task, the value of environment variable C(ELASTICSEARCH_RUN_ON_CONTROLLER)
+              on the controller will be used instead.
+        required: false
+        type: bool
+        default: false
+'''
+
+    CLUSTERS = r'''
+options:
+    clusters:
+        description:
+            - Apply the same configuration to several clusters concurrently.
+            - Each cluster takes its connection parameters from the entry, unset ones default to the options of the task.
+            - The result of each cluster is returned in C(clusters), the task fails if any of them failed.
+        required: false
+        type: list
+        elements: dict
+        suboptions:
+            elasticsearch_url:
+                description:
+                    - The URL of the elasticsearch cluster.
+                required: true
+                type: str
+            elasticsearch_user:
+                description:
+                    - The username for the elasticsearch cluster.
+                required: false
+                type: str
+            elasticsearch_password:
+                description:
+                    - The password for the elasticsearch cluster.
+                required: false
+                type: str
+            elasticsearch_cert:
+                description:
+                    - Path to the PEM encoded X.509 Cert to use as client certificate.
+                required: false
+                type: path
+            elasticsearch_key:
+                description:
+                    - Path to the PEM encoded client key.
+                required: false
+                type: path
+            elasticsearch_cacert:
+                description:
+                    - Path to the PEM encoded CA cert.
+                required: false
+                type: path
+            validate_certs:
+                description:
+                    - Whether to validate the certificate of the elasticsearch cluster.
+                required: false
+                type: bool
+    max_concurrent_clusters:
+        description:
+            - Maximum number of I(clusters) worked on at the same time.
+        required: false
+        type: int
+        default: 8
 '''
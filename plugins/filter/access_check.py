@@ -0,0 +1,78 @@
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+DOCUMENTATION = '''
+name: access_check
+short_description: Check many accesses against an OpenDistro Security configuration
+version_added: "1.0.0"
+description:
+    - Decide for each check if the user may run the action, on the index if given or else on the cluster.
+    - The checks are evaluated locally from the internal users, role mappings, roles and action groups of the configuration.
+    - The compiled permissions are cached per version of the configuration, so thousands of checks take a fraction of a second.
+    - A snapshot path is versioned by its modification time and a configuration dict by its C(version),
+      like the result of the C(jiuka.opendistro.security) lookup for C(config). Other dicts are fingerprinted once per call.
+    - Role mappings by host are ignored.
+options:
+    _input:
+        description:
+            - The security configuration, a dict with the C(internalusers), C(rolesmapping), C(roles) and C(actiongroups) collections
+              or the path of a snapshot written by M(jiuka.opendistro.security_snapshot).
+        type: raw
+        required: true
+    checks:
+        description:
+            - The checks, dicts with C(user), C(action) and optionally C(index).
+        type: list
+        elements: dict
+        required: true
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = '''
+- name: Check the access policy against an exported configuration
+  assert:
+    that: item.allowed == item.expected
+  loop: "{{ '/tmp/security.zip' | jiuka.opendistro.access_check(access_policy) }}"
+  vars:
+    access_policy:
+      - { user: kibanaro, action: 'indices:data/read/search', index: logs-2020.01, expected: true }
+      - { user: kibanaro, action: 'indices:data/write/index', index: logs-2020.01, expected: false }
+      - { user: kibanaro, action: 'cluster:monitor/health', expected: true }
+'''
+
+RETURN = '''
+_value:
+    description: The checks with C(allowed) set.
+    type: list
+    elements: dict
+'''
+
+
+from ansible.errors import AnsibleFilterError
+from ansible.module_utils.common._collections_compat import Mapping
+
+from ansible_collections.jiuka.opendistro.plugins.plugin_utils.access import access_checker, check_access
+
+
+def access_check(config, checks):
+    checker = access_checker(config)
+
+    results = []
+    for check in checks:
+        if not isinstance(check, Mapping) or 'user' not in check or 'action' not in check:
+            raise AnsibleFilterError('Each check needs a user and an action, got {0}'.format(check))
+        results.append(dict(check, allowed=check_access(checker, check['user'], check['action'], check.get('index', None))))
+    return results
+
+
+class FilterModule(object):
+
+    def filters(self):
+        return {
+            'access_check': access_check,
+        }
@@ -0,0 +1,133 @@
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+DOCUMENTATION = '''
+httpapi: opendistro
+short_description: Persistent connection to an OpenDistro elasticsearch
+version_added: "1.0.0"
+description:
+    - Keep one authenticated session to the cluster for the whole play when used with the C(httpapi) connection.
+    - The keep-alive connections, TLS sessions and the informations about the cluster are shared by all tasks
+      of a host, instead of being set up again by every module.
+    - The modules of this collection send their requests through the persistent connection if
+      I(elasticsearch_url) is not given.
+    - The cluster is reached at C(ansible_host) on C(ansible_httpapi_port), C(9200) by default,
+      using C(ansible_user) and C(ansible_httpapi_password) for basic authentication.
+options:
+    ca_path:
+        description:
+            - CA certificate to validate the certificate of the cluster with.
+        type: path
+        vars:
+            - name: ansible_httpapi_opendistro_cacert
+    client_cert:
+        description:
+            - Client certificate to authenticate with.
+        type: path
+        vars:
+            - name: ansible_httpapi_opendistro_cert
+    client_key:
+        description:
+            - Key of the I(client_cert).
+        type: path
+        vars:
+            - name: ansible_httpapi_opendistro_key
+    pool_size:
+        description:
+            - Number of keep-alive connections to keep open to the cluster.
+        type: int
+        default: 4
+        vars:
+            - name: ansible_httpapi_opendistro_pool_size
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = '''
+- name: Manage users over one persistent connection per host
+  hosts: elasticsearch
+  gather_facts: false
+  vars:
+    ansible_connection: ansible.netcommon.httpapi
+    ansible_network_os: jiuka.opendistro.opendistro
+    ansible_httpapi_use_ssl: true
+    ansible_user: admin
+    ansible_httpapi_password: admin
+  tasks:
+    - name: Ensure user foo exists
+      jiuka.opendistro.user:
+        name: foo
+        password_hash: '$2a$12$AMTOYfh3q3DvdXQQNeiROeOhneR2YQ3wiI0VgXtcJyrCmZ96G7yRq'
+'''
+
+
+import json
+
+from ansible.module_utils._text import to_text
+from ansible.plugins.httpapi import HttpApiBase
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import basic_auth, parse_server_info
+from ansible_collections.jiuka.opendistro.plugins.module_utils.connection import ConnectionPool
+
+
+class HttpApi(HttpApiBase):
+    def __init__(self, connection):
+        super().__init__(connection)
+        self._pool = None
+        self._url = None
+        self._headers = None
+        self._server = None
+
+    def send_request(self, data, method='GET', path='/', headers=None):
+        """Send a request over the shared connection pool and return ``(status, body)``."""
+        if self._pool is None:
+            self._setup()
+
+        code, dummy, body = self._pool.request(method, self._url + path, body=data,
+                                               headers=dict(headers or {}, **self._headers))
+        return code, to_text(body)
+
+    def server_info(self):
+        """Informations about the cluster, probed once per connection."""
+        if self._server is None:
+            code, body = self.send_request(None, path='/_nodes/_local/plugins')
+            try:
+                data = json.loads(body)
+            except ValueError:
+                data = body
+            if code != 200 or 'nodes' not in data:
+                raise ValueError('Error talking to Elasticsearch {0}: HTTP {1}: {2}'.format(self._url, code, body))
+            self._server = parse_server_info(data)
+        return self._server
+
+    def _setup(self):
+        use_ssl = option(self.connection, 'use_ssl', False)
+        self._url = '{0}://{1}:{2}'.format('https' if use_ssl else 'http',
+                                           option(self.connection, 'host'),
+                                           option(self.connection, 'port', 9200))
+
+        self._headers = {}
+        username = option(self.connection, 'remote_user')
+        if username:
+            self._headers['Authorization'] = basic_auth(username, option(self.connection, 'password'))
+
+        self._pool = ConnectionPool(
+            maxsize=option(self, 'pool_size', 4),
+            client_cert=option(self, 'client_cert'),
+            client_key=option(self, 'client_key'),
+            ca_path=option(self, 'ca_path'),
+            validate_certs=option(self.connection, 'validate_certs', True),
+        )
+
+
+def option(plugin, name, default=None):
+    # Not every version of the httpapi connection knows every option or sets them on its httpapi plugin
+    try:
+        value = plugin.get_option(name)
+    except KeyError:
+        return default
+    return default if value is None else value
@@ -0,0 +1,132 @@
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+DOCUMENTATION = '''
+lookup: security
+short_description: Look up OpenDistro Security entities from a collection snapshot
+version_added: "1.0.0"
+description:
+    - Fetch a whole OpenDistro Security collection like C(internalusers) or C(roles) once from the controller
+      and look up entities by name in it.
+    - The snapshot is kept in the configured Ansible cache plugin, so with a persistent fact cache
+      all tasks and hosts of a play share a single request.
+    - Without names the whole collection is returned as a dict of name to entity.
+    - The pseudo collection C(config) returns all collections in one dict together with a C(version) which only changes
+      when one of the snapshots is fetched again. The C(jiuka.opendistro.allowed) test and the C(jiuka.opendistro.access_check)
+      filter reuse their compiled permissions for the same C(version).
+options:
+    _terms:
+        description:
+            - The collection to fetch, followed by the names to look up, or C(config) alone.
+        required: true
+    default:
+        description:
+            - Value returned for names which do not exist.
+        default: null
+    cache_timeout:
+        description:
+            - Seconds to reuse a snapshot for. Set to C(0) to always fetch the collection.
+        type: int
+        default: 300
+extends_documentation_fragment:
+    - jiuka.opendistro.baseapi
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = '''
+- name: Get the backend roles of some users
+  debug:
+    msg: "{{ item.backend_roles }}"
+  loop: "{{ lookup('jiuka.opendistro.security', 'internalusers', 'admin', 'kibanaro', wantlist=True) }}"
+
+- name: Get all roles
+  set_fact:
+    roles: "{{ lookup('jiuka.opendistro.security', 'roles') }}"
+
+- name: Check accesses against the current configuration
+  assert:
+    that: "'intern' is not jiuka.opendistro.allowed(security, 'indices:admin/delete', 'logs-2020.01')"
+  vars:
+    security: "{{ lookup('jiuka.opendistro.security', 'config') }}"
+'''
+
+RETURN = '''
+_raw:
+    description:
+        - The entities looked up by name, the whole collection if no names are given
+          or all collections and their C(version) for C(config).
+    type: list
+'''
+
+
+import time
+
+import ansible.constants as C
+from ansible.errors import AnsibleError
+from ansible.plugins.loader import cache_loader
+from ansible.plugins.lookup import LookupBase
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import credentials_fingerprint, fingerprint, opendistro_argument_spec
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi
+from ansible_collections.jiuka.opendistro.plugins.plugin_utils.api import ControllerModule
+
+
+COLLECTIONS = ['internalusers', 'roles', 'rolesmapping', 'actiongroups', 'tenants']
+
+
+class LookupModule(LookupBase):
+
+    _snapshots = {}
+
+    def run(self, terms, variables=None, default=None, cache_timeout=300, **kwargs):
+        if not terms or terms[0] not in COLLECTIONS + ['config']:
+            raise AnsibleError('The first term has to be one of {0}'.format(', '.join(COLLECTIONS + ['config'])))
+
+        unsupported = sorted(set(kwargs) - set(opendistro_argument_spec()))
+        if unsupported:
+            raise AnsibleError('Unsupported parameters for lookup security: {0}'.format(', '.join(unsupported)))
+
+        collection, names = terms[0], terms[1:]
+        if collection == 'config':
+            if names:
+                raise AnsibleError('The config term does not take names')
+            return [self._config(int(cache_timeout), kwargs)]
+
+        index = self._snapshot(collection, int(cache_timeout), kwargs)[1]['index']
+
+        if not names:
+            return [index]
+        return [index.get(name, default) for name in names]
+
+    def _config(self, cache_timeout, params):
+        snapshots = [self._snapshot(collection, cache_timeout, params) for collection in COLLECTIONS]
+
+        config = dict((collection, snapshot['index']) for collection, (key, snapshot) in zip(COLLECTIONS, snapshots))
+        config['version'] = fingerprint([[key, snapshot['timestamp']] for key, snapshot in snapshots])
+        return config
+
+    def _snapshot(self, collection, cache_timeout, params):
+        module = ControllerModule(params)
+        key = 'jiuka.opendistro.security.{0}.{1}'.format(credentials_fingerprint(module.params), collection)
+
+        cache = cache_loader.get(C.CACHE_PLUGIN)
+        snapshot = self._snapshots.get(key, None)
+        if snapshot is None and cache.contains(key):
+            snapshot = cache.get(key)
+
+        if snapshot is None or time.time() - snapshot['timestamp'] >= cache_timeout:
+            api = SecurityApi(module, 'jiuka.opendistro.security')
+            code, data = api.get(collection)
+            if code != 200:
+                module.fail_json(msg='Error fetching {0}'.format(collection), http_code=code, http_body=data)
+
+            snapshot = dict(timestamp=time.time(), index=data)
+            cache.set(key, snapshot)
+
+        self._snapshots[key] = snapshot
+        return key, snapshot
@@ -5,40 +5,154 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import binascii
+import codecs
+import copy
+import hashlib
+import hmac
 import json
+import os
 import os.path
+import random
+import shutil
+import threading
+import time
 from ansible.module_utils.basic import AnsibleModule, env_fallback
-from ansible.module_utils.urls import Request
-import ansible.module_utils.six.moves.urllib.error as urllib_error
+from ansible.module_utils._text import to_bytes, to_text
 
 
-class OpenDistroModule(AnsibleModule):
-    def __init__(self, argument_spec, **kwargs):
-        argument_spec.update(dict(
-            elasticsearch_url=dict(type='str',
-                                   required=False,
-                                   fallback=(env_fallback, ['ELASTICSEARCH_URL'])),
-            elasticsearch_user=dict(type='str',
-                                    required=False,
-                                    fallback=(env_fallback, ['ELASTICSEARCH_USER'])),
-            elasticsearch_password=dict(type='str',
-                                        required=False,
-                                        no_log=True,
-                                        fallback=(env_fallback, ['ELASTICSEARCH_PASSWORD'])),
-            elasticsearch_cert=dict(type='path',
+def opendistro_argument_spec():
+    return dict(
+        elasticsearch_url=dict(type='str',
+                               required=False,
+                               fallback=(env_fallback, ['ELASTICSEARCH_URL'])),
+        elasticsearch_user=dict(type='str',
+                                required=False,
+                                fallback=(env_fallback, ['ELASTICSEARCH_USER'])),
+        elasticsearch_password=dict(type='str',
                                     required=False,
-                                    fallback=(env_fallback, ['ELASTICSEARCH_CERT'])),
-            elasticsearch_key=dict(type='path',
+                                    no_log=True,
+                                    fallback=(env_fallback, ['ELASTICSEARCH_PASSWORD'])),
+        elasticsearch_cert=dict(type='path',
+                                required=False,
+                                fallback=(env_fallback, ['ELASTICSEARCH_CERT'])),
+        elasticsearch_key=dict(type='path',
+                               required=False,
+                               fallback=(env_fallback, ['ELASTICSEARCH_KEY'])),
+        elasticsearch_cacert=dict(type='path',
+                                  required=False,
+                                  fallback=(env_fallback, ['ELASTICSEARCH_CACERT'])),
+        validate_certs=dict(type='bool',
+                            required=False,
+                            default=True,
+                            fallback=(env_fallback, ['ELASTICSEARCH_VALIDATE_CERTS'])),
+        connection_pool_size=dict(type='int',
+                                  required=False,
+                                  default=4),
+        connection_idle_timeout=dict(type='int',
+                                     required=False,
+                                     default=60),
+        cache_dir=dict(type='path',
+                       required=False,
+                       default='~/.ansible/cache/jiuka.opendistro',
+                       fallback=(env_fallback, ['ELASTICSEARCH_CACHE_DIR'])),
+        server_info_cache_ttl=dict(type='int',
                                    required=False,
-                                   fallback=(env_fallback, ['ELASTICSEARCH_KEY'])),
-            elasticsearch_cacert=dict(type='path',
-                                      required=False,
-                                      fallback=(env_fallback, ['ELASTICSEARCH_CACERT'])),
-            validate_certs=dict(type='bool',
+                                   default=300),
+        max_concurrent_requests=dict(type='int',
+                                     required=False,
+                                     default=8),
+        retries=dict(type='int',
+                     required=False,
+                     default=3),
+        retry_backoff=dict(type='float',
+                           required=False,
+                           default=0.5),
+        retry_max_time=dict(type='float',
+                            required=False,
+                            default=60),
+        retry_patch=dict(type='bool',
+                         required=False,
+                         default=False),
+        metrics=dict(type='bool',
+                     required=False,
+                     default=False),
+        metrics_file=dict(type='path',
+                          required=False),
+        response_cache=dict(type='bool',
+                            required=False,
+                            default=False),
+        response_cache_ttl=dict(type='int',
                                 required=False,
-                                default=True,
-                                fallback=(env_fallback, ['ELASTICSEARCH_VALIDATE_CERTS'])),
-        ))
+                                default=30),
+        snapshot=dict(type='path',
+                      required=False,
+                      fallback=(env_fallback, ['ELASTICSEARCH_SNAPSHOT'])),
+        run_on_controller=dict(type='bool',
+                               required=False,
+                               default=False,
+                               fallback=(env_fallback, ['ELASTICSEARCH_RUN_ON_CONTROLLER'])),
+    )
+
+
+def clusters_argument_spec():
+    return dict(
+        clusters=dict(type='list',
+                      elements='dict',
+                      required=False,
+                      options=dict(
+                          elasticsearch_url=dict(type='str', required=True),
+                          elasticsearch_user=dict(type='str', required=False),
+                          elasticsearch_password=dict(type='str', required=False, no_log=True),
+                          elasticsearch_cert=dict(type='path', required=False),
+                          elasticsearch_key=dict(type='path', required=False),
+                          elasticsearch_cacert=dict(type='path', required=False),
+                          validate_certs=dict(type='bool', required=False),
+                      )),
+        max_concurrent_clusters=dict(type='int',
+                                     required=False,
+                                     default=8),
+    )
+
+
+class ClusterFailed(Exception):
+    def __init__(self, msg, result):
+        super().__init__(msg)
+        self.msg = msg
+        self.result = result
+
+
+class ClusterModule(object):
+    """Stand-in for an OpenDistroModule while working on one of its clusters.
+
+    The connection parameters of the cluster override the ones of the
+    module and fail_json only fails this cluster.
+    """
+
+    def __init__(self, module, cluster):
+        self._module = module
+        self.params = dict(module.params)
+        self.params.update((k, v) for k, v in cluster.items() if v is not None)
+        self.params['clusters'] = None
+        self.check_mode = module.check_mode
+        self._diff = module._diff
+        self._name = module._name
+        self.ansible_version = module.ansible_version
+        self.metrics = module.metrics
+
+    def warn(self, warning):
+        self._module.warn('{0}: {1}'.format(self.params['elasticsearch_url'], warning))
+
+    def fail_json(self, msg, **kwargs):
+        raise ClusterFailed(msg, kwargs)
+
+
+class OpenDistroModule(AnsibleModule):
+    def __init__(self, argument_spec, supports_clusters=False, **kwargs):
+        for name, spec in opendistro_argument_spec().items():
+            argument_spec.setdefault(name, spec)
+        if supports_clusters:
+            argument_spec.update(clusters_argument_spec())
         required_together = kwargs.get('required_together', [])
         required_together += [
             ['elasticsearch_user', 'elasticsearch_password'],
@@ -48,64 +162,466 @@ class OpenDistroModule(AnsibleModule):
 
         super().__init__(argument_spec, **kwargs)
 
-        if not self.params['elasticsearch_url']:
+        clusters = self.params.get('clusters', None) or []
+
+        if not self.params['elasticsearch_url'] and not clusters and not self._socket_path \
+                and not (self.params.get('snapshot', None) and self.check_mode):
             self.fail_json(msg="missing required arguments: elasticsearch_url")
 
-        for param in ['elasticsearch_cert', 'elasticsearch_key', 'elasticsearch_cacert']:
-            if not self.params.get(param, None):
-                continue
-            if os.path.exists(self.params[param]):
+        for params in [self.params] + clusters:
+            for param in ['elasticsearch_cert', 'elasticsearch_key', 'elasticsearch_cacert']:
+                if not params.get(param, None):
+                    continue
+                if os.path.exists(params[param]):
+                    continue
+                self.fail_json(msg='{0} "{1}" not found'.format(param, params[param]))
+
+    def run(self, api_class, module_name, reconcile):
+        """Reconcile the cluster, or all I(clusters) concurrently, and exit.
+
+        ``reconcile(module, api, result)`` implements the module against a
+        single cluster. For each of the I(clusters) it gets a ClusterModule
+        and its results are returned per cluster.
+        """
+        if not self.params.get('clusters', None):
+            result = dict(changed=False)
+            api = api_class(self, module_name)
+            result['server'] = api.server
+            reconcile(self, api, result)
+            self.exit_json(**result)
+
+        def run_cluster(cluster):
+            module = ClusterModule(self, cluster)
+            result = dict(changed=False, elasticsearch_url=module.params['elasticsearch_url'])
+            try:
+                api = api_class(module, module_name)
+                result['server'] = api.server
+                reconcile(module, api, result)
+            except ClusterFailed as e:
+                result.update(e.result, failed=True, msg=e.msg)
+            except request_errors() as e:
+                result.update(failed=True, msg=str(e))
+            return result
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        clusters = self.params['clusters']
+        concurrency = max(1, min(self.params.get('max_concurrent_clusters', None) or 1, len(clusters)))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(run_cluster, clusters))
+
+        result = dict(
+            changed=any(cluster['changed'] for cluster in results),
+            clusters=results,
+        )
+
+        diffs = []
+        for cluster in results:
+            if 'diff' in cluster:
+                diffs.append(dict(cluster.pop('diff'),
+                                  before_header=cluster['elasticsearch_url'],
+                                  after_header=cluster['elasticsearch_url']))
+        if diffs:
+            result['diff'] = diffs
+
+        failed = [cluster['elasticsearch_url'] for cluster in results if cluster.get('failed', False)]
+        if failed:
+            self.fail_json(msg='Failed on {0} of {1} clusters: {2}'.format(len(failed), len(results), ', '.join(failed)),
+                           **result)
+
+        self.exit_json(**result)
+
+    @property
+    def metrics(self):
+        if not hasattr(self, '_metrics'):
+            self._metrics = None
+            if self.params.get('metrics', False) or self.params.get('metrics_file', None):
+                self._metrics = RequestMetrics()
+        return self._metrics
+
+    def exit_json(self, **kwargs):
+        self._report_metrics(kwargs)
+        super().exit_json(**kwargs)
+
+    def fail_json(self, msg, **kwargs):
+        self._report_metrics(kwargs)
+        super().fail_json(msg=msg, **kwargs)
+
+    def _report_metrics(self, result):
+        if getattr(self, '_metrics', None) is None:
+            return
+
+        summary = self._metrics.summary()
+        if self.params.get('metrics', False):
+            result['metrics'] = summary
+        if self.params.get('metrics_file', None):
+            try:
+                with open(self.params['metrics_file'], 'a') as f:
+                    f.write(json.dumps(dict(summary, module=self._name, timestamp=time.time())) + '\n')
+            except (OSError, IOError) as e:
+                self.warn('Could not write metrics to {0}: {1}'.format(self.params['metrics_file'], e))
+
+
+class RequestMetrics(object):
+    """Collect timings and sizes of the requests sent by a module run."""
+
+    def __init__(self):
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def record(self, info):
+        with self._lock:
+            self.requests.append(dict((k, round(v, 6) if isinstance(v, float) else v) for k, v in info.items()))
+
+    def summary(self):
+        status_codes = {}
+        for request in self.requests:
+            status_codes[str(request['status'])] = status_codes.get(str(request['status']), 0) + 1
+
+        return dict(
+            calls=len(self.requests),
+            total=round(sum(request['total'] for request in self.requests), 6),
+            bytes_sent=sum(request['bytes_sent'] for request in self.requests),
+            bytes_received=sum(request['bytes_received'] for request in self.requests),
+            status_codes=status_codes,
+            requests=list(self.requests),
+        )
+
+
+class RetryPolicy(object):
+    """Decide if and when a failed request is sent again.
+
+    Requests answered with 429, 502, 503 or 504 or failing without a response
+    are retried with exponential backoff and full jitter, honouring a
+    ``Retry-After`` header. PATCH is only retried if ``retry_patch`` is set as
+    the security API applies it incrementally. No retry is scheduled past
+    ``max_time`` seconds after the first attempt.
+    """
+
+    RETRY_STATUS = (429, 502, 503, 504)
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+
+    def __init__(self, retries=3, backoff=0.5, max_time=60, retry_patch=False):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_time = max_time
+        self.retry_patch = retry_patch
+
+    def retryable(self, method):
+        return method in self.IDEMPOTENT_METHODS or (method == 'PATCH' and self.retry_patch)
+
+    def delay(self, method, attempt, started, code=None, headers=None):
+        """Return the seconds to wait before the next attempt or None to give up."""
+        if attempt >= self.retries or not self.retryable(method):
+            return None
+        if code is not None and code not in self.RETRY_STATUS:
+            return None
+
+        delay = self._retry_after(headers or [])
+        if delay is None:
+            delay = random.uniform(0, self.backoff * 2 ** attempt)
+
+        if time.time() + delay - started > self.max_time:
+            return None
+        return delay
+
+    def _retry_after(self, headers):
+        for name, value in headers:
+            if name.lower() != 'retry-after':
                 continue
-            self.fail_json(msg='{0} "{1}" not found'.format(param, self.params[param]))
+            try:
+                return max(0, float(value))
+            except ValueError:
+                from email.utils import parsedate_tz, mktime_tz
+
+                date = parsedate_tz(value)
+                if date is not None:
+                    return max(0, mktime_tz(date) - time.time())
+        return None
+
+
+class ResponseCache(object):
+    """On-disk cache of GET responses with one directory per ressource.
+
+    Entries keep the ETag and Last-Modified validators of their response to
+    be revalidated with a conditional request. Entries without validators
+    are served for ``ttl`` seconds. A write to a ressource drops all of its
+    entries.
+    """
+
+    def __init__(self, directory, ttl=0):
+        self.directory = directory
+        self.ttl = ttl
+
+    def load(self, ressource, url):
+        try:
+            with open(self._path(ressource, url)) as f:
+                entry = json.load(f)
+        except (OSError, IOError, ValueError):
+            return None
+        if entry.get('url', None) != url:
+            return None
+        return entry
+
+    def fresh(self, entry):
+        return time.time() - entry['timestamp'] < self.ttl
+
+    def store(self, ressource, url, code, headers, data):
+        headers = dict((name.lower(), value) for name, value in headers)
+        entry = dict(url=url, code=code, data=data, timestamp=time.time(),
+                     etag=headers.get('etag', None), last_modified=headers.get('last-modified', None))
+        try:
+            write_cache_file(self._path(ressource, url), json.dumps(entry))
+        except (OSError, IOError):
+            pass
+
+    def invalidate(self, ressource):
+        directory = os.path.join(self.directory, ressource)
+        if not os.path.isdir(directory):
+            return
+        # Move it away first so no reader sees a partially removed ressource
+        trash = '{0}.{1}.{2}.deleted'.format(directory, os.getpid(), random.randint(0, 2 ** 32))
+        try:
+            os.rename(directory, trash)
+        except OSError:
+            return
+        shutil.rmtree(trash, ignore_errors=True)
+
+    def _path(self, ressource, url):
+        return os.path.join(self.directory, ressource, '{0}.json'.format(hashlib.sha1(to_bytes(url)).hexdigest()))
+
+
+# Guards BaseApi.shared_clients
+_SHARED_CLIENTS_LOCK = threading.Lock()
 
 
 class BaseApi(object):
     PLUGIN = None
 
-    def __init__(self, module, module_name):
+    # Connection pools and server informations shared by all instances using the same
+    # cluster and credentials. Set to a dict by callers running many modules in one process.
+    shared_clients = None
+
+    def __init__(self, module, module_name, use_snapshot=True):
         self._module = module
         self._module_name = module_name
+        self._use_snapshot = use_snapshot
 
         self._es_url = self._module.params.get('elasticsearch_url')
 
         self._connect()
 
     def put(self, ressource, name=None, data=None):
+        self._invalidate(ressource)
         return self._open('PUT', self._url(ressource, name), data=data)
 
     def get(self, ressource, name=None):
+        if self.response_cache is not None:
+            return self._cached_get(ressource, self._url(ressource, name))
         return self._open('GET', self._url(ressource, name))
 
     def patch(self, ressource, name=None, data=None):
+        self._invalidate(ressource)
         return self._open('PATCH', self._url(ressource, name), data=data)
 
     def delete(self, ressource, name=None):
+        self._invalidate(ressource)
         return self._open('DELETE', self._url(ressource, name))
 
+    def iter_collection(self, ressource):
+        """Yield the ``(name, object)`` pairs of a collection while it is received.
+
+        The response is parsed incrementally, so neither the raw body nor the
+        whole collection is kept in memory at once.
+        """
+        url = self._url(ressource)
+        try:
+            code, body = self._request('GET', url, stream=True)
+            if code != 200:
+                data = b''.join(body)
+                try:
+                    data = json.loads(data)
+                except Exception:
+                    pass
+                self._module.fail_json(msg='Error fetching {0}'.format(ressource),
+                                       http_code=code,
+                                       http_body=data)
+                return
+
+            for name, obj in iter_json_object(body):
+                yield name, obj
+
+            # Read the body to its end, so the connection is put back into the pool
+            for dummy in body:
+                pass
+        except request_errors() as e:
+            self._module.fail_json(msg=str(e),
+                                   method='GET',
+                                   url=url)
+
+    def batch(self, operations, concurrency=None):
+        """Run many requests concurrently over the connection pool.
+
+        ``operations`` is a list of ``(method, ressource, name, data)`` tuples.
+        The ``(code, data)`` results are returned in the order of the
+        operations. A request failing without a HTTP response results in
+        ``(None, error message)`` instead of failing the module.
+        """
+        if concurrency is None:
+            concurrency = self._module.params.get('max_concurrent_requests', None) or 1
+
+        def run(operation):
+            method, ressource, name, data = operation
+            if method != 'GET':
+                self._invalidate(ressource)
+            try:
+                return self._request(method, self._url(ressource, name), data=data)
+            except request_errors() as e:
+                return None, str(e)
+
+        if concurrency <= 1 or len(operations) <= 1:
+            return [run(operation) for operation in operations]
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(operations))) as executor:
+            return list(executor.map(run, operations))
+
+    @property
+    def connection_pool(self):
+        # Created on the first request, so modules served from caches never load the HTTP stack
+        with self._lock:
+            if self._connection_pool is None:
+                shared = self._shared_client()
+                if shared is not None:
+                    with _SHARED_CLIENTS_LOCK:
+                        if 'pool' not in shared:
+                            shared['pool'] = self._connection_pool_create()
+                        self._connection_pool = shared['pool']
+                else:
+                    self._connection_pool = self._connection_pool_create()
+
+                metrics = getattr(self._module, 'metrics', None)
+                self._connection_pool.observer = metrics.record if metrics is not None else None
+            return self._connection_pool
+
+    @property
+    def server(self):
+        """Informations about the cluster, probed on first access."""
+        if self._server is None:
+            if self.snapshot is not None:
+                self._server = self._snapshot_call(lambda: self.snapshot.server)
+            elif self.connection is not None:
+                self._server = self._connection_call(lambda: self.connection.server_info())
+            else:
+                shared = self._shared_client()
+                if shared is not None and 'server' in shared:
+                    self._server = shared['server']
+                else:
+                    self._server = self._server_info()
+                    if shared is not None:
+                        shared['server'] = self._server
+        return self._server
+
     def _connect(self):
-        self.request = Request(
-            headers={'Accept': 'application/json'},
-            http_agent=self._http_agent(),
-            url_username=self._module.params.get('elasticsearch_user', None),
-            url_password=self._module.params.get('elasticsearch_password', None),
+        self._lock = threading.Lock()
+        self._connection_pool = None
+        self._server = None
+
+        backoff = self._module.params.get('retry_backoff', None)
+        max_time = self._module.params.get('retry_max_time', None)
+        self.retry_policy = RetryPolicy(
+            retries=self._module.params.get('retries', None) or 0,
+            backoff=0.5 if backoff is None else backoff,
+            max_time=60 if max_time is None else max_time,
+            retry_patch=self._module.params.get('retry_patch', False),
+        )
+
+        self.headers = {
+            'Accept': 'application/json',
+            'User-Agent': self._http_agent(),
+        }
+        if self._module.params.get('elasticsearch_user', None):
+            self.headers['Authorization'] = basic_auth(self._module.params.get('elasticsearch_user'),
+                                                       self._module.params.get('elasticsearch_password', None))
+
+        # Without an URL requests go through the persistent httpapi connection, if the module runs on one
+        self.connection = None
+        if not self._es_url and getattr(self._module, '_socket_path', None):
+            from ansible.module_utils.connection import Connection
+
+            self.connection = Connection(self._module._socket_path)
+            self._es_url = ''
+
+        # In check mode all requests are answered from the snapshot, if one is given
+        self.snapshot = None
+        if self._use_snapshot and getattr(self._module, 'check_mode', False) and self._module.params.get('snapshot', None):
+            from ansible_collections.jiuka.opendistro.plugins.module_utils.snapshot import SnapshotReader
+
+            self.snapshot = self._snapshot_call(lambda: SnapshotReader(self._module.params['snapshot']))
+
+        self.response_cache = None
+        if self.snapshot is None and self._module.params.get('response_cache', False) and self._module.params.get('cache_dir', None):
+            self.response_cache = ResponseCache(
+                os.path.join(os.path.expanduser(self._module.params['cache_dir']),
+                             'responses-{0}'.format(self._fingerprint())),
+                ttl=self._module.params.get('response_cache_ttl', None) or 0,
+            )
+
+    def _connection_pool_create(self):
+        from ansible_collections.jiuka.opendistro.plugins.module_utils.connection import ConnectionPool
+
+        return ConnectionPool(
+            maxsize=self._module.params.get('connection_pool_size', None) or 4,
+            idle_timeout=self._module.params.get('connection_idle_timeout', None) or 60,
             client_cert=self._module.params.get('elasticsearch_cert', None),
             client_key=self._module.params.get('elasticsearch_key', None),
             ca_path=self._module.params.get('elasticsearch_cacert', None),
-            force_basic_auth=True,
-            validate_certs=self._module.params.get('validate_certs'),
+            validate_certs=self._module.params.get('validate_certs', True),
         )
 
-        self._server_info()
+    def _shared_client(self):
+        if self.shared_clients is None:
+            return None
+        key = '{0}-{1}-{2}'.format(self._fingerprint(),
+                                   self._module.params.get('elasticsearch_cacert', None),
+                                   self._module.params.get('validate_certs', True))
+        with _SHARED_CLIENTS_LOCK:
+            return self.shared_clients.setdefault(key, {})
 
     def _server_info(self):
+        ttl = self._module.params.get('server_info_cache_ttl', None)
+        cache_file = None
+        if ttl and self._module.params.get('cache_dir', None):
+            cache_file = os.path.join(os.path.expanduser(self._module.params['cache_dir']),
+                                      'server-{0}.json'.format(self._fingerprint()))
+            try:
+                if time.time() - os.path.getmtime(cache_file) < ttl:
+                    with open(cache_file) as f:
+                        return json.load(f)
+            except (OSError, IOError, ValueError):
+                pass
+
         code, data = self._open('GET', '{0}/_nodes/_local/plugins'.format(self._es_url))
 
         if code != 200 or 'nodes' not in data:
             self._module.fail_json(msg='Error talking to Elasticsearch {0}'.format(self._es_url),
                                    http_code=code,
                                    http_body=data)
+            return {}
+
+        server = parse_server_info(data)
 
-        self.server = {}
+        if cache_file:
+            try:
+                write_cache_file(cache_file, json.dumps(server))
+            except (OSError, IOError):
+                pass
+
+        return server
+
+    def _fingerprint(self):
+        return credentials_fingerprint(self._module.params)
 
     def _http_agent(self):
         return 'ansible-{0}/jiuka.opendistro.{1}'.format(self._module.ansible_version,
@@ -116,62 +632,411 @@ class BaseApi(object):
             return '{0}/_opendistro/_{1}/api/{2}/{3}'.format(self._es_url, self.PLUGIN, ressource, name)
         return '{0}/_opendistro/_{1}/api/{2}'.format(self._es_url, self.PLUGIN, ressource)
 
+    def _cached_get(self, ressource, url):
+        entry = self.response_cache.load(ressource, url)
+
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+            if not headers and self.response_cache.fresh(entry):
+                return entry['code'], entry['data']
+
+        try:
+            code, response_headers, data = self._send('GET', url, headers=headers)
+        except request_errors() as e:
+            self._module.fail_json(msg=str(e),
+                                   method='GET',
+                                   url=url)
+            return None, None
+
+        if code == 304 and entry is not None:
+            return entry['code'], entry['data']
+
+        data = self._decode(data)
+        if code in (200, 404) and not isinstance(data, bytes):
+            self.response_cache.store(ressource, url, code, response_headers, data)
+
+        return code, data
+
+    def _invalidate(self, ressource):
+        if self.response_cache is not None:
+            self.response_cache.invalidate(ressource)
+
     def _open(self, method, url, data=None):
-        headers = None
+        try:
+            return self._request(method, url, data=data)
+        except request_errors() as e:
+            self._module.fail_json(msg=str(e),
+                                   method=method,
+                                   url=url,
+                                   data=json.dumps(data) if data else data)
+
+    def _request(self, method, url, data=None, stream=False):
+        code, dummy, body = self._send(method, url, data=data, stream=stream)
+        if stream:
+            return code, body
+        return code, self._decode(body)
+
+    def _send(self, method, url, data=None, headers=None, stream=False):
+        if self.snapshot is not None:
+            code, response_headers, body = self._snapshot_call(lambda: self.snapshot.request(method, url))
+            return code, response_headers, [body] if stream else body
+
+        headers = dict(self.headers, **(headers or {}))
 
         if data:
-            headers = {'Content-Type': 'application/json'}
+            headers['Content-Type'] = 'application/json'
             data = json.dumps(data)
 
-        try:
-            resp = self.request.open(method, url, data=data, headers=headers)
+        if self.connection is not None:
+            return self._send_persistent(method, url, data, headers, stream)
+
+        from ansible_collections.jiuka.opendistro.plugins.module_utils.connection import ERRORS, CertificateError
 
-            code = resp.code
-            body = resp.read()
-        except urllib_error.HTTPError as e:
-            code = e.code
+        started = time.time()
+        attempt = 0
+        while True:
             try:
-                body = e.read()
-            except AttributeError:
-                body = ''
-        except urllib_error.URLError as e:
-            self._module.fail_json(msg=str(e.reason),
-                                   method=method,
-                                   url=url,
-                                   data=data)
+                code, response_headers, body = self.connection_pool.request(
+                    method, url, body=data, headers=headers, stream=stream)
+            except CertificateError:
+                raise
+            except ERRORS:
+                delay = self.retry_policy.delay(method, attempt, started)
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry_policy.delay(method, attempt, started, code, response_headers)
+                if delay is None:
+                    break
+                if stream:
+                    # Drain the discarded response to release its connection
+                    for dummy in body:
+                        pass
+
+            time.sleep(delay)
+            attempt += 1
+
+        return code, response_headers, body
+
+    def _send_persistent(self, method, url, data, headers, stream):
+        started = time.time()
+        attempt = 0
+        while True:
+            code, body = self._connection_call(
+                lambda: self.connection.send_request(data, method=method, path=url, headers=headers))
+            delay = self.retry_policy.delay(method, attempt, started, code)
+            if delay is None:
+                break
+            time.sleep(delay)
+            attempt += 1
+
+        body = to_bytes(body)
+        return code, [], [body] if stream else body
+
+    def _connection_call(self, call):
+        from ansible.module_utils.connection import ConnectionError
+
+        try:
+            return call()
+        except ConnectionError as e:
+            self._module.fail_json(msg=to_text(e))
+            raise
+
+    def _snapshot_call(self, call):
+        from ansible_collections.jiuka.opendistro.plugins.module_utils.snapshot import SnapshotError
 
         try:
-            data = json.loads(body)
+            return call()
+        except SnapshotError as e:
+            self._module.fail_json(msg=str(e))
+            raise
+
+    def _decode(self, body):
+        try:
+            return json.loads(body)
         except Exception:
-            data = body
+            return body
 
-        return code, data
 
+def request_errors():
+    """Return the errors raised if a cluster could not be talked to.
 
-def create_patch(data, path, value):
-    if value is None:
-        return None
+    They are only known once the HTTP stack was loaded on the first request.
+    """
+    from ansible_collections.jiuka.opendistro.plugins.module_utils.connection import ERRORS
+    return ERRORS
 
-    old_value = data.get(path, None)
-    if 'sort' in dir(value):
-        value.sort()
-    if 'sort' in dir(old_value):
-        old_value.sort()
 
-    if old_value == value:
-        return None
+def basic_auth(user, password):
+    credentials = '{0}:{1}'.format(user, password or '')
+    return 'Basic {0}'.format(to_text(binascii.b2a_base64(to_bytes(credentials), newline=False)))
+
+
+def credentials_fingerprint(params):
+    # Keyed with the secret of the cache directory, so the file names do not allow to guess the password
+    identity = [params.get(param, None) for param in (
+        'elasticsearch_url', 'elasticsearch_user', 'elasticsearch_password', 'elasticsearch_cert', 'elasticsearch_key')]
+    return hmac.new(cache_secret(params.get('cache_dir', None)), to_bytes(json.dumps(identity)), hashlib.sha256).hexdigest()
+
+
+_CACHE_SECRETS = {}
+
 
-    if old_value:
-        return dict(op='replace',
-                    path="%s" % path,
-                    value=value)
+def cache_secret(directory):
+    """Return the random secret of a cache directory, created on first use.
+
+    The secret file is only readable by the owner. Without a usable
+    directory a secret is made up for the lifetime of the process.
+    """
+    if directory not in _CACHE_SECRETS:
+        secret = None
+        if directory:
+            path = os.path.join(os.path.expanduser(directory), 'secret')
+            try:
+                if not os.path.exists(path):
+                    # Linked into place so concurrent runs agree on a single, complete secret
+                    tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+                    write_cache_file(tmp_path, binascii.hexlify(os.urandom(32)).decode())
+                    try:
+                        os.link(tmp_path, path)
+                    except OSError:
+                        pass
+                    os.unlink(tmp_path)
+                with open(path) as f:
+                    secret = to_bytes(f.read().strip())
+            except (OSError, IOError):
+                pass
+        _CACHE_SECRETS[directory] = secret or os.urandom(32)
+    return _CACHE_SECRETS[directory]
+
+
+def parse_server_info(data):
+    for node_id, node in sorted(data.get('nodes', {}).items()):
+        plugins = dict((plugin['name'], plugin.get('version', None)) for plugin in node.get('plugins', []))
+        return dict(
+            node_id=node_id,
+            node_name=node.get('name', None),
+            version=node.get('version', None),
+            security_version=plugins.get('opendistro_security', plugins.get('opendistro-security', None)),
+            plugins=plugins,
+        )
+    return {}
+
+
+def write_cache_file(path, content):
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory, 0o700)
+
+    tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+    with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as f:
+        f.write(content)
+    os.rename(tmp_path, path)
+
+
+def canonicalize(value):
+    if isinstance(value, dict):
+        return dict((k, canonicalize(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sorted((canonicalize(v) for v in value), key=lambda v: json.dumps(v, sort_keys=True))
+    return value
+
+
+def compact(value):
+    if isinstance(value, dict):
+        value = dict((k, compact(v)) for k, v in value.items())
+        return dict((k, v) for k, v in value.items() if v not in (None, '', [], {}))
+    if isinstance(value, (list, tuple)):
+        return [compact(v) for v in value]
+    return value
+
+
+def fingerprint(value, memo=None):
+    """Return a digest of value which is equal for canonically equal values.
+
+    Each sub-tree is hashed once, the digests of nested values are kept in
+    ``memo`` and reused by their parents and by later calls sharing it.
+    """
+    if memo is None:
+        memo = {}
+
+    key = id(value)
+    if key in memo:
+        return memo[key][1]
+
+    if isinstance(value, dict):
+        raw = '{%s}' % ','.join(sorted('{0}:{1}'.format(json.dumps(k), fingerprint(v, memo)) for k, v in value.items()))
+    elif isinstance(value, (list, tuple)):
+        raw = '[%s]' % ','.join(sorted(fingerprint(v, memo) for v in value))
     else:
-        return dict(op='add',
-                    path=path,
-                    value=value)
+        raw = json.dumps(value)
+
+    digest = hashlib.sha1(to_bytes(raw)).hexdigest()
+    memo[key] = (value, digest)
+    return digest
+
+
+def diff_patch(old, new, path='', memo=None):
+    if memo is None:
+        memo = {}
+
+    if fingerprint(old, memo) == fingerprint(new, memo):
+        return []
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        patch = []
+        for key in sorted(new):
+            if key in old:
+                patch += diff_patch(old[key], new[key], path + json_pointer(key), memo)
+            else:
+                patch.append(dict(op='add', path=path + json_pointer(key), value=new[key]))
+        for key in sorted(set(old) - set(new)):
+            patch.append(dict(op='remove', path=path + json_pointer(key)))
+        return patch
+
+    if isinstance(old, list) and isinstance(new, list):
+        # Lists are compared regardless of their order, only differing entries are removed and added
+        missing = {}
+        for value in new:
+            key = fingerprint(value, memo)
+            missing[key] = missing.get(key, 0) + 1
+
+        removed = []
+        for index, value in enumerate(old):
+            key = fingerprint(value, memo)
+            if missing.get(key, 0):
+                missing[key] -= 1
+            else:
+                removed.append(index)
+
+        # Without common entries replacing the list is shorter
+        if len(removed) < len(old):
+            patch = [dict(op='remove', path=path + json_pointer(index)) for index in reversed(removed)]
+            for value in new:
+                key = fingerprint(value, memo)
+                if missing.get(key, 0):
+                    missing[key] -= 1
+                    patch.append(dict(op='add', path=path + json_pointer('-'), value=value))
+            return patch
+
+    return [dict(op='replace', path=path, value=new)]
+
+
+def create_patch(data, path, value):
+    if value is None:
+        return []
+
+    if path not in data:
+        return [dict(op='add', path=json_pointer(path), value=value)]
+
+    return diff_patch(data[path], value, json_pointer(path))
 
 
 def apply_patch(data, patch):
+    data = copy.deepcopy(data)
+
     for line in patch:
-        data[line['path']] = line['value']
+        parts = [part.replace('~1', '/').replace('~0', '~') for part in line['path'].split('/')[1:]]
+
+        target = data
+        for part in parts[:-1]:
+            target = target[int(part)] if isinstance(target, list) else target.setdefault(part, {})
+
+        if isinstance(target, list):
+            index = len(target) if parts[-1] == '-' else int(parts[-1])
+            if line['op'] == 'remove':
+                del target[index]
+            elif line['op'] == 'add':
+                target.insert(index, line['value'])
+            else:
+                target[index] = line['value']
+        elif line['op'] == 'remove':
+            target.pop(parts[-1], None)
+        else:
+            target[parts[-1]] = line['value']
+
     return data
+
+
+def iter_json_object(chunks):
+    """Incrementally decode a JSON object from an iterable of byte chunks.
+
+    Yields the ``(key, value)`` pairs of the top level object as soon as
+    they are complete. Only the unparsed rest of the data is kept buffered.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buf, pos, eof = u'', 0, False
+
+    def fill():
+        chunk = next(chunks, None)
+        if chunk is None:
+            return buf[pos:] + text.decode(b'', final=True), True
+        return buf[pos:] + text.decode(chunk), False
+
+    def token():
+        # Position of the next non-whitespace character, or None at the end of the buffer
+        end = len(buf)
+        index = pos
+        while index < end and buf[index] in ' \t\n\r':
+            index += 1
+        return index if index < end else None
+
+    state = 'start'
+    while True:
+        index = token()
+        if index is None:
+            if eof:
+                raise ValueError('Unexpected end of JSON data')
+            buf, eof = fill()
+            pos = 0
+            continue
+
+        char = buf[index]
+        if state == 'start':
+            if char != '{':
+                raise ValueError('Expected a JSON object at position {0}'.format(index))
+            pos, state = index + 1, 'key'
+        elif state == 'key' and char == '}':
+            return
+        elif state == 'next_key' and char != '"':
+            raise ValueError('Expected a JSON string at position {0}'.format(index))
+        elif state in ('key', 'next_key', 'value'):
+            try:
+                value, end = decoder.raw_decode(buf, index)
+            except ValueError:
+                value, end = None, None
+            # A value is only complete once something follows it, as numbers could continue in the next chunk
+            if end is None or (not eof and end >= len(buf)):
+                if eof:
+                    raise ValueError('Invalid JSON data at position {0}'.format(index))
+                buf, eof = fill()
+                pos = 0
+                continue
+            if state in ('key', 'next_key'):
+                if not isinstance(value, str):
+                    raise ValueError('Expected a JSON string at position {0}'.format(index))
+                key, pos, state = value, end, 'colon'
+            else:
+                yield key, value
+                pos, state = end, 'next'
+        elif state == 'colon':
+            if char != ':':
+                raise ValueError('Expected ":" at position {0}'.format(index))
+            pos, state = index + 1, 'value'
+        elif state == 'next':
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError('Expected "," or "}}" at position {0}'.format(index))
+            # Unlike right after "{" a key is required after ","
+            pos, state = index + 1, 'next_key'
+
+
+def json_pointer(*parts):
+    return ''.join('/' + str(part).replace('~', '~0').replace('/', '~1') for part in parts)
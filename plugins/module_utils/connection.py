@@ -0,0 +1,243 @@
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import socket
+import ssl
+import threading
+import time
+from ansible.module_utils._text import to_bytes
+from ansible.module_utils.six.moves import http_client
+from ansible.module_utils.six.moves.urllib.parse import urlsplit
+from ansible.module_utils.six.moves.urllib.request import getproxies, proxy_bypass
+
+
+# Errors raised by ConnectionPool.request if the cluster could not be talked to
+ERRORS = (socket.error, http_client.HTTPException)
+
+# Certificate errors are a kind of socket.error but must never be retried
+CertificateError = ssl.CertificateError
+
+
+class _HTTPConnection(http_client.HTTPConnection):
+    """HTTP connection recording the time spent resolving and connecting."""
+
+    def __init__(self, host, port=None, **kwargs):
+        super().__init__(host, port, **kwargs)
+        self.timings = {}
+
+    def connect(self):
+        started = time.time()
+        addresses = socket.getaddrinfo(self.host, self.port, 0, socket.SOCK_STREAM)
+        self.timings['dns'] = time.time() - started
+
+        error = socket.error('getaddrinfo returned no address for {0}'.format(self.host))
+        for dummy, dummy, dummy, dummy, address in addresses:
+            try:
+                self.sock = socket.create_connection(address[:2], self.timeout, self.source_address)
+                break
+            except socket.error as e:
+                error = e
+        else:
+            raise error
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.timings['connect'] = time.time() - started - self.timings['dns']
+
+        if self._tunnel_host:
+            self._tunnel()
+
+
+class _HTTPSConnection(_HTTPConnection):
+    """HTTPS connection resuming the last TLS session seen by its pool."""
+
+    default_port = http_client.HTTPS_PORT
+
+    def __init__(self, host, port=None, pool=None, **kwargs):
+        super().__init__(host, port, **kwargs)
+        self._pool = pool
+
+    def connect(self):
+        super().connect()
+
+        started = time.time()
+        server = (self._tunnel_host or self.host, self._tunnel_port or self.port)
+        self.sock = self._pool.ssl_context.wrap_socket(self.sock,
+                                                       server_hostname=server[0],
+                                                       session=self._pool.tls_sessions.get(server, None))
+        self.server = server
+        self.timings['tls'] = time.time() - started
+
+
+class ConnectionPool(object):
+    """Keep-alive HTTP(S) connections shared by all requests of a BaseApi.
+
+    Idle connections are kept per scheme, host and port, up to ``maxsize``
+    each, and dropped after ``idle_timeout`` seconds. All HTTPS connections
+    share one SSLContext and resume the last TLS session.
+    """
+
+    def __init__(self, maxsize=4, idle_timeout=60, timeout=10,
+                 client_cert=None, client_key=None, ca_path=None, validate_certs=True):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.tls_sessions = {}
+        self.observer = None
+
+        self._client_cert = client_cert
+        self._client_key = client_key
+        self._ca_path = ca_path
+        self._validate_certs = validate_certs
+        self._ssl_context = None
+
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ssl_context(self):
+        if self._ssl_context is None:
+            context = ssl.create_default_context(cafile=self._ca_path)
+            if not self._validate_certs:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            if self._client_cert:
+                context.load_cert_chain(self._client_cert, self._client_key)
+            self._ssl_context = context
+        return self._ssl_context
+
+    def request(self, method, url, body=None, headers=None, stream=False):
+        """Send a request and return ``(status, headers, body)``.
+
+        With ``stream`` the body is returned as an iterator over its chunks.
+        The connection goes back to the pool once it is exhausted.
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        target = parts.path or '/'
+        if parts.query:
+            target = '{0}?{1}'.format(target, parts.query)
+
+        info = dict(method=method, url=url, status=None,
+                    bytes_sent=len(to_bytes(body)) if body else 0, bytes_received=0)
+        started = time.time()
+
+        conn, reused = self._acquire(key)
+        try:
+            while True:
+                conn.timings = {}
+                try:
+                    conn.request(method, url if conn.proxy_url else target, body=body, headers=headers or {})
+                    resp = conn.getresponse()
+                    info['ttfb'] = time.time() - started
+                    if not stream:
+                        data = resp.read()
+                    break
+                except (http_client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    conn.close()
+                    if not reused:
+                        raise
+                    # The server dropped an idle keep-alive connection, start over
+                    conn, reused = self._acquire(key, fresh=True)
+                except Exception:
+                    conn.close()
+                    raise
+        except Exception as e:
+            info['error'] = str(e)
+            self._report(conn, info, reused, started)
+            raise
+
+        info['status'] = resp.status
+        if stream:
+            return resp.status, resp.getheaders(), self._stream(key, conn, resp, info, reused, started)
+
+        info['bytes_received'] = len(data)
+        self._report(conn, info, reused, started)
+        self._done(key, conn, resp)
+
+        return resp.status, resp.getheaders(), data
+
+    def _stream(self, key, conn, resp, info, reused, started, chunk_size=65536):
+        complete = False
+        try:
+            while True:
+                chunk = resp.read(chunk_size)
+                if not chunk:
+                    break
+                info['bytes_received'] += len(chunk)
+                yield chunk
+            complete = True
+        except Exception as e:
+            info['error'] = str(e)
+            raise
+        finally:
+            self._report(conn, info, reused, started)
+            if complete:
+                self._done(key, conn, resp)
+            else:
+                conn.close()
+
+    def _report(self, conn, info, reused, started):
+        info.update(conn.timings, reused=reused, total=time.time() - started)
+        if self.observer is not None:
+            self.observer(info)
+
+    def _done(self, key, conn, resp):
+        if isinstance(conn.sock, ssl.SSLSocket) and conn.sock.session is not None:
+            self.tls_sessions[conn.server] = conn.sock.session
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn, dummy in conns:
+                conn.close()
+
+    def _acquire(self, key, fresh=False):
+        if not fresh:
+            now = time.time()
+            with self._lock:
+                conns = self._idle.get(key, [])
+                while conns:
+                    conn, last_used = conns.pop()
+                    if now - last_used < self.idle_timeout:
+                        return conn, True
+                    conn.close()
+        return self._new_connection(*key), False
+
+    def _release(self, key, conn):
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            if len(conns) < self.maxsize:
+                conns.append((conn, time.time()))
+                return
+        conn.close()
+
+    def _new_connection(self, scheme, host, port):
+        proxy = None
+        if not proxy_bypass(host):
+            proxy = getproxies().get(scheme, None)
+
+        if scheme == 'https':
+            conn_class, kwargs = _HTTPSConnection, dict(pool=self)
+        else:
+            conn_class, kwargs = _HTTPConnection, dict()
+
+        if proxy:
+            proxy_parts = urlsplit(proxy)
+            conn = conn_class(proxy_parts.hostname, proxy_parts.port, timeout=self.timeout, **kwargs)
+            if scheme == 'https':
+                conn.set_tunnel(host, port)
+                proxy = None
+        else:
+            conn = conn_class(host, port, timeout=self.timeout, **kwargs)
+
+        conn.proxy_url = proxy
+        return conn
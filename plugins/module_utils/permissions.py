@@ -0,0 +1,268 @@
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import fnmatch
+import re
+
+
+class PermissionResolver(object):
+    """Resolve the effective permissions of users from the security collections.
+
+    The role mappings are indexed once by user and backend role, action
+    groups and the permissions of a role are expanded once and memoized,
+    so resolving many users only costs a lookup and a union per role.
+    Mappings by host can not be resolved without a request and are ignored.
+    """
+
+    def __init__(self, internalusers, rolesmapping, roles, actiongroups):
+        self.internalusers = internalusers
+        self.roles = roles
+        self.actiongroups = actiongroups
+
+        self._roles_by_user = {}
+        self._roles_by_backend_role = {}
+        self._user_patterns = []
+        self._backend_role_patterns = []
+        self._and_backend_roles = []
+
+        for role, mapping in rolesmapping.items():
+            for user in mapping.get('users', None) or []:
+                if is_mapping_pattern(user):
+                    self._user_patterns.append((mapping_matcher(user), role))
+                else:
+                    self._roles_by_user.setdefault(user, set()).add(role)
+            for backend_role in mapping.get('backend_roles', None) or []:
+                if is_mapping_pattern(backend_role):
+                    self._backend_role_patterns.append((mapping_matcher(backend_role), role))
+                else:
+                    self._roles_by_backend_role.setdefault(backend_role, set()).add(role)
+            if mapping.get('and_backend_roles', None):
+                self._and_backend_roles.append((set(mapping['and_backend_roles']), role))
+
+        self._users_by_role = None
+        self._expanded_groups = {}
+        self._role_permissions = {}
+
+    def roles_of(self, name):
+        """Return the sorted names of the roles of a user."""
+        user = self.internalusers.get(name, None) or {}
+        backend_roles = set(user.get('backend_roles', None) or [])
+
+        roles = set(user.get('opendistro_security_roles', None) or [])
+        roles |= self._roles_by_user.get(name, set())
+        roles.update(role for matcher, role in self._user_patterns if matcher(name))
+        for backend_role in backend_roles:
+            roles |= self._roles_by_backend_role.get(backend_role, set())
+            roles.update(role for matcher, role in self._backend_role_patterns if matcher(backend_role))
+        roles.update(role for required, role in self._and_backend_roles if required <= backend_roles)
+
+        return sorted(roles)
+
+    def users_of(self, role):
+        """Return the sorted names of the users with a role."""
+        if self._users_by_role is None:
+            self._users_by_role = {}
+            for name in sorted(self.internalusers):
+                for user_role in self.roles_of(name):
+                    self._users_by_role.setdefault(user_role, []).append(name)
+        return self._users_by_role.get(role, [])
+
+    def expand(self, actions):
+        """Return the sorted actions with all action groups replaced by their actions."""
+        expanded = set()
+        for action in actions or []:
+            expanded |= self._expand_action(action, ())[0]
+        return sorted(expanded)
+
+    def role_permissions(self, role):
+        """Return the permissions of a role with expanded action groups."""
+        if role not in self._role_permissions:
+            config = self.roles.get(role, None) or {}
+            self._role_permissions[role] = dict(
+                cluster_permissions=self.expand(config.get('cluster_permissions', None)),
+                index_permissions=[
+                    dict(permission,
+                         role=role,
+                         allowed_actions=self.expand(permission.get('allowed_actions', None)))
+                    for permission in config.get('index_permissions', None) or []],
+                tenant_permissions=[
+                    dict(permission,
+                         role=role,
+                         allowed_actions=self.expand(permission.get('allowed_actions', None)))
+                    for permission in config.get('tenant_permissions', None) or []],
+            )
+        return self._role_permissions[role]
+
+    def permissions(self, name):
+        """Return the roles and effective cluster, index and tenant permissions of a user."""
+        user = self.internalusers.get(name, None) or {}
+        roles = self.roles_of(name)
+
+        cluster_permissions = set()
+        index_permissions = []
+        tenant_permissions = []
+        for role in roles:
+            permissions = self.role_permissions(role)
+            cluster_permissions.update(permissions['cluster_permissions'])
+            index_permissions += permissions['index_permissions']
+            tenant_permissions += permissions['tenant_permissions']
+
+        return dict(
+            backend_roles=sorted(user.get('backend_roles', None) or []),
+            roles=roles,
+            missing_roles=[role for role in roles if role not in self.roles],
+            cluster_permissions=sorted(cluster_permissions),
+            index_permissions=index_permissions,
+            tenant_permissions=tenant_permissions,
+        )
+
+    def _expand_action(self, action, seen):
+        """Return the actions of an action and whether they are complete.
+
+        Expansions cut short by action groups referring to each other are
+        only complete for the outermost group and are not memoized below it.
+        """
+        if action not in self.actiongroups:
+            return set([action]), True
+        if action in self._expanded_groups:
+            return self._expanded_groups[action], True
+        if action in seen:
+            return set(), False
+
+        group = self.actiongroups[action]
+        if isinstance(group, dict):
+            group = group.get('allowed_actions', None) or []
+
+        expanded = set()
+        complete = True
+        for member in group:
+            actions, member_complete = self._expand_action(member, seen + (action,))
+            expanded |= actions
+            complete = complete and member_complete
+
+        if complete or not seen:
+            self._expanded_groups[action] = expanded
+        return expanded, complete or not seen
+
+
+def is_mapping_pattern(value):
+    return (len(value) > 1 and value.startswith('/') and value.endswith('/')) or any(char in value for char in '*?')
+
+
+def mapping_matcher(pattern):
+    """Return a function matching names like the users and backend roles of a role mapping."""
+    if len(pattern) > 1 and pattern.startswith('/') and pattern.endswith('/'):
+        return compile_pattern(pattern[1:-1], pattern).fullmatch
+    return lambda name: fnmatch.fnmatchcase(name, pattern)
+
+
+def compile_pattern(expression, pattern, flags=0):
+    """Compile the regular expression of a pattern, raising a ValueError naming the pattern if it is invalid."""
+    try:
+        return re.compile(expression, flags)
+    except re.error as e:
+        raise ValueError('Invalid pattern {0}: {1}'.format(pattern, e))
+
+
+class PatternMatcher(object):
+    """Match names against many wildcard and regex patterns at once.
+
+    Plain names are kept in a set and patterns ending in their only ``*``
+    in a prefix trie, all other patterns are combined into one regular
+    expression. Like the security plugin ``*`` and ``?`` are the only
+    wildcards and patterns enclosed in ``/`` are regular expressions.
+    """
+
+    def __init__(self, patterns):
+        self._names = set()
+        self._prefixes = {}
+        expressions = []
+
+        for pattern in patterns or []:
+            if len(pattern) > 1 and pattern.startswith('/') and pattern.endswith('/'):
+                compile_pattern(pattern[1:-1], pattern)
+                expressions.append(pattern[1:-1])
+            elif '*' not in pattern and '?' not in pattern:
+                self._names.add(pattern)
+            elif pattern.find('*') == len(pattern) - 1 and '?' not in pattern:
+                node = self._prefixes
+                for char in pattern[:-1]:
+                    node = node.setdefault(char, {})
+                node[None] = True
+            else:
+                expressions.append(''.join('.*' if char == '*' else '.' if char == '?' else re.escape(char) for char in pattern))
+
+        self._expression = None
+        if expressions:
+            self._expression = compile_pattern('|'.join('(?:{0})'.format(expression) for expression in expressions),
+                                               ', '.join(patterns), re.DOTALL)
+
+    def match(self, name):
+        if name in self._names:
+            return True
+
+        node = self._prefixes
+        for char in name:
+            if None in node:
+                return True
+            node = node.get(char, None)
+            if node is None:
+                break
+        else:
+            if None in node:
+                return True
+
+        return self._expression is not None and self._expression.fullmatch(name) is not None
+
+
+class AccessChecker(object):
+    """Decide locally if a user may run an action, on an index or the cluster.
+
+    The permissions of a user are resolved and compiled into matchers on
+    the first check of the user. Matchers are shared by all users with the
+    same patterns, patterns with ``${user.name}`` or ``${attr.internal.*}``
+    variables are compiled per user.
+    """
+
+    def __init__(self, internalusers, rolesmapping, roles, actiongroups):
+        self.resolver = PermissionResolver(internalusers, rolesmapping, roles, actiongroups)
+        self._matchers = {}
+        self._users = {}
+
+    def allowed(self, user, action, index=None):
+        cluster_permissions, index_permissions = self._compiled(user)
+        if index is None:
+            return cluster_permissions.match(action)
+        return any(actions.match(action) and indices.match(index) for indices, actions in index_permissions)
+
+    def _compiled(self, user):
+        if user not in self._users:
+            permissions = self.resolver.permissions(user)
+            self._users[user] = (
+                self._matcher(permissions['cluster_permissions']),
+                [(self._matcher(self._substitute(user, permission.get('index_patterns', None) or [])),
+                  self._matcher(permission['allowed_actions']))
+                 for permission in permissions['index_permissions']],
+            )
+        return self._users[user]
+
+    def _matcher(self, patterns):
+        key = tuple(sorted(patterns))
+        if key not in self._matchers:
+            self._matchers[key] = PatternMatcher(key)
+        return self._matchers[key]
+
+    def _substitute(self, user, patterns):
+        if not any('${' in pattern for pattern in patterns):
+            return patterns
+
+        variables = {'user.name': user, 'user_name': user}
+        config = self.resolver.internalusers.get(user, None) or {}
+        for key, value in (config.get('attributes', None) or {}).items():
+            variables['attr.internal.{0}'.format(key)] = value
+
+        return [re.sub(r'\$\{([^}]+)\}', lambda m: variables.get(m.group(1), m.group(0)), pattern) for pattern in patterns]
@@ -5,9 +5,115 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import fnmatch
+import re
 
-from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import BaseApi
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import BaseApi, create_patch, apply_patch, canonicalize, compact, \
+    json_pointer
 
 
 class SecurityApi(BaseApi):
     PLUGIN = 'security'
+
+
+SECRET_KEYS = ('password', 'hash')
+
+
+def redact(config):
+    return dict((k, v) for k, v in config.items() if k not in SECRET_KEYS)
+
+
+# Collections in the order they have to be applied, as later ones refer to earlier ones
+COLLECTIONS = ('actiongroups', 'tenants', 'roles', 'internalusers', 'rolesmapping')
+
+READ_ONLY_KEYS = ('reserved', 'hidden', 'static')
+
+
+def fields_patch(current_config, fields):
+    """Return the JSON-Patch setting the given fields of an existing entity.
+
+    The API leaves out empty fields, so values are compared compacted to
+    the compacted entity and empty values of missing fields are skipped.
+    """
+    current_config = compact(current_config)
+    patch = []
+    for key, value in sorted(fields.items()):
+        value = compact(value)
+        if value in ('', [], {}) and key not in current_config:
+            continue
+        patch += create_patch(current_config, key, value)
+    return patch
+
+
+def plan_collection(current, desired, purge=False, write_only=()):
+    """Plan the JSON-Patch turning the current into the desired collection.
+
+    Only the fields given for an entity are compared, lists regardless of
+    their order. Fields in ``write_only`` are only sent when creating an
+    entity. With ``purge`` entities missing in ``desired`` are removed,
+    except reserved, hidden and static ones.
+
+    Returns the patch, the names of the created, updated and removed
+    entities and the before and after state of the changed entities.
+    """
+    patch = []
+    plan = dict(created=[], updated=[], removed=[])
+    before = {}
+    after = {}
+
+    for name, config in sorted(desired.items()):
+        config = dict((key, canonicalize(compact(value))) for key, value in config.items() if value is not None)
+
+        if name not in current:
+            patch.append(dict(op='add', path=json_pointer(name), value=config))
+            plan['created'].append(name)
+            after[name] = config
+            continue
+
+        entity_patch = fields_patch(current[name], dict((key, value) for key, value in config.items() if key not in write_only))
+
+        if entity_patch:
+            patch += [dict(line, path=json_pointer(name) + line['path']) for line in entity_patch]
+            plan['updated'].append(name)
+            before[name] = current[name]
+            after[name] = apply_patch(current[name], entity_patch)
+
+    if purge:
+        for name, current_config in sorted(current.items()):
+            if name in desired or any(current_config.get(key, False) for key in READ_ONLY_KEYS):
+                continue
+            patch.append(dict(op='remove', path=json_pointer(name)))
+            plan['removed'].append(name)
+            before[name] = current_config
+
+    return patch, plan, before, after
+
+
+def is_pattern(name):
+    return any(char in name for char in '*?[')
+
+
+def select_collection(items, names=None, regex=None, fields=None, offset=0, limit=None):
+    """Filter, project and page the ``(name, object)`` pairs of a collection.
+
+    Entities are selected by exact name or glob pattern in ``names`` and by
+    ``regex``. Only the keys in ``fields`` are kept of each of them. Returns
+    a name ordered dict of ``limit`` entities starting at ``offset`` and
+    the number of all selected entities.
+    """
+    if regex is not None:
+        regex = re.compile(regex)
+
+    selected = []
+    for name, obj in items:
+        if names and not any(fnmatch.fnmatchcase(name, pattern) for pattern in names):
+            continue
+        if regex is not None and not regex.search(name):
+            continue
+        if fields is not None:
+            obj = dict((key, value) for key, value in obj.items() if key in fields)
+        selected.append((name, obj))
+
+    selected.sort(key=lambda item: item[0])
+    end = None if limit is None else offset + limit
+    return dict(selected[offset:end]), len(selected)
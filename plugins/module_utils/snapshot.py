@@ -0,0 +1,141 @@
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+import threading
+import zipfile
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.six.moves.urllib.parse import quote, unquote, urlsplit
+
+
+SERVER_MEMBER = 'server.json'
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class SnapshotWriter(object):
+    """Write a snapshot of security API collections to a zip file.
+
+    Each entity is stored as its own deflated member named after its
+    collection and quoted name, so single entities can be read without
+    decompressing the rest. The file is only put in place once closed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.changed = True
+        self._tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+        fd = os.open(self._tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        self._zip = zipfile.ZipFile(os.fdopen(fd, 'wb'), 'w', zipfile.ZIP_DEFLATED)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._zip.close()
+        if exc_type is None:
+            self.changed = snapshot_index(self._tmp_path) != snapshot_index(self.path)
+            os.rename(self._tmp_path, self.path)
+        else:
+            os.unlink(self._tmp_path)
+
+    def write_server(self, server):
+        self._zip.writestr(SERVER_MEMBER, json.dumps(server))
+
+    def write_collection(self, collection, items):
+        # An empty collection still needs a member to be known to the snapshot
+        self._zip.writestr('{0}/'.format(collection), b'')
+        count = 0
+        for name, obj in items:
+            self._zip.writestr(member_name(collection, name), json.dumps(obj))
+            count += 1
+        return count
+
+
+class SnapshotReader(object):
+    """Answer security API GET requests from a snapshot.
+
+    The zip central directory serves as index, only the members needed to
+    answer a request are decompressed.
+    """
+
+    def __init__(self, path):
+        try:
+            self._zip = zipfile.ZipFile(path)
+        except (IOError, OSError, zipfile.BadZipfile) as e:
+            raise SnapshotError('Could not read snapshot {0}: {1}'.format(path, e))
+        self.path = path
+        self._lock = threading.Lock()
+
+        self.collections = {}
+        for member in self._zip.namelist():
+            if '/' not in member:
+                continue
+            collection, name = member.split('/', 1)
+            names = self.collections.setdefault(collection, [])
+            if name:
+                names.append(unquote(name))
+
+    @property
+    def server(self):
+        try:
+            return json.loads(self._read(SERVER_MEMBER))
+        except KeyError:
+            raise SnapshotError('Snapshot {0} does not contain server informations'.format(self.path))
+
+    def request(self, method, url):
+        """Return ``(status, headers, body)`` like ConnectionPool.request."""
+        if method != 'GET':
+            raise SnapshotError('Snapshot {0} can only answer GET requests, not {1}'.format(self.path, method))
+
+        path = urlsplit(url).path
+        path = path[path.find('/_opendistro/') + 1:]
+        parts = [unquote(part) for part in path.split('/')]
+        if len(parts) < 4 or parts[0] != '_opendistro' or parts[2] != 'api':
+            raise SnapshotError('Snapshot {0} can not answer {1}'.format(self.path, url))
+
+        collection = parts[3]
+        if len(parts) == 4:
+            return 200, [], to_bytes(json.dumps(self.load(collection)))
+
+        if collection not in self.collections:
+            raise SnapshotError('Snapshot {0} does not contain {1}'.format(self.path, collection))
+
+        name = '/'.join(parts[4:])
+        try:
+            data = {name: json.loads(self._read(member_name(collection, name)))}
+        except KeyError:
+            return 404, [], to_bytes(json.dumps({'status': 'NOT_FOUND', 'message': "'{0}' not found.".format(name)}))
+        return 200, [], to_bytes(json.dumps(data))
+
+    def load(self, collection):
+        """Return a whole collection as dict by name."""
+        if collection not in self.collections:
+            raise SnapshotError('Snapshot {0} does not contain {1}'.format(self.path, collection))
+
+        return dict((name, json.loads(self._read(member_name(collection, name))))
+                    for name in self.collections[collection])
+
+    def _read(self, member):
+        with self._lock:
+            return to_text(self._zip.read(member))
+
+
+def member_name(collection, name):
+    return '{0}/{1}'.format(collection, quote(name, safe=''))
+
+
+def snapshot_index(path):
+    """Return the names and checksums of the members of a snapshot, if it exists."""
+    try:
+        with zipfile.ZipFile(path) as snapshot:
+            return sorted((info.filename, info.CRC) for info in snapshot.infolist())
+    except (IOError, OSError, zipfile.BadZipfile):
+        return None
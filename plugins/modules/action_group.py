@@ -0,0 +1,196 @@
+#!/usr/bin/python
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+module: action_group
+
+short_description: Manage OpenDistro Security action groups
+
+version_added: "1.0.0"
+
+description:
+    - Manage action groups in a openDistro elasticsearch with security enabled.
+    - Allowed actions are compared regardless of their order and only the changed fields are patched.
+
+options:
+    name:
+        description:
+            - Name of the action group to manage.
+        type: str
+        required: true
+        aliases: [ action_group ]
+    description:
+        description:
+            - Description of the action group.
+        type: str
+        required: false
+    allowed_actions:
+        description:
+            - List of actions and action groups in the action group.
+        type: list
+        elements: str
+        required: false
+    type:
+        description:
+            - Type of the action group.
+        type: str
+        required: false
+        choices: [ cluster, index, kibana ]
+    state:
+        description:
+            - The desired state of the action group.
+        type: str
+        required: false
+        choices: [ present, absent ]
+        default: present
+
+extends_documentation_fragment:
+    - jiuka.opendistro.baseapi
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = '''
+- name: Allow to search and read
+  jiuka.opendistro.action_group:
+    name: search_read
+    type: index
+    allowed_actions:
+      - indices:data/read/search*
+      - read
+'''
+
+RETURN = ''' # '''
+
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule, create_patch, apply_patch, canonicalize
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi, fields_patch
+
+
+def main():
+    # define available arguments/parameters a user can pass to the module
+    module_args = dict(
+        name=dict(type='str', required=True, aliases=['action_group']),
+        description=dict(type='str', required=False),
+        allowed_actions=dict(type='list', elements='str', required=False),
+        type=dict(type='str', required=False, choices=['cluster', 'index', 'kibana']),
+        state=dict(type='str',
+                   default='present',
+                   choices=['present', 'absent']),
+    )
+
+    # seed the result dict in the object
+    result = dict(
+        changed=False,
+    )
+
+    # Setup AnsibleModule
+    module = OpenDistroModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    # Parameters
+    name = module.params['name']
+    description = module.params['description']
+    state = module.params['state']
+
+    # Allowed actions are compared and sent in canonical order
+    fields = dict()
+    if module.params['allowed_actions'] is not None:
+        fields['allowed_actions'] = canonicalize(module.params['allowed_actions'])
+    if module.params['type'] is not None:
+        fields['type'] = module.params['type']
+
+    # Setup API
+    api = SecurityApi(module, 'jiuka.opendistro.action_group')
+    result['server'] = api.server
+
+    # Get current state
+    code, data = api.get('actiongroups', name)
+    if code == 200:
+        current_config = data[name]
+        current_state = 'present'
+    elif code == 404:
+        current_config = {}
+        current_state = 'absent'
+    else:
+        module.fail_json(msg='Error fetching action group infos',
+                         http_code=code,
+                         http_body=data,
+                         **result)
+
+    # Create
+    if state == 'present' and current_state == 'absent':
+        result['changed'] = True
+        payload = dict(fields)
+        if description:
+            payload['description'] = description
+
+        if not module.check_mode:
+            code, data = api.put('actiongroups', name, data=payload)
+
+            if code != 201:
+                module.fail_json(msg='Error creating action group',
+                                 http_code=code,
+                                 http_body=data,
+                                 **result)
+
+        new_config = payload
+
+    # Update
+    if state == 'present' and current_state == 'present':
+        payload = create_patch(current_config, 'description', description)
+        payload += fields_patch(current_config, fields)
+
+        if payload:
+            result['changed'] = True
+
+            if not module.check_mode:
+                code, data = api.patch('actiongroups', name, data=payload)
+
+                if code != 200:
+                    module.fail_json(msg='Error updating action group',
+                                     http_code=code,
+                                     http_body=data,
+                                     **result)
+
+            new_config = apply_patch(current_config, payload)
+
+    # Delete
+    if state == 'absent' and current_state == 'present':
+        result['changed'] = True
+        if not module.check_mode:
+            code, data = api.delete('actiongroups', name)
+            if code != 200:
+                module.fail_json(msg='Error deleting action group',
+                                 http_code=code,
+                                 http_body=data,
+                                 **result)
+        new_config = {}
+
+    if module._diff and result['changed']:
+        result['diff'] = dict(
+            before=current_config,
+            after=new_config,
+        )
+
+    # in the event of a successful module execution, you will want to
+    # simple AnsibleModule.exit_json(), passing the key/value results
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/python
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+module: effective_permissions
+short_description: Return the effective permissions of users.
+version_added: "1.0.0"
+description:
+    - Return the roles and the effective cluster, index and tenant permissions of users, with all action groups expanded.
+    - The internal users, role mappings, roles and action groups are fetched once, concurrently, and resolved locally.
+    - Users are mapped to roles by name, backend roles, C(and_backend_roles) and C(opendistro_security_roles).
+      Role mappings by host can not be resolved and are ignored.
+options:
+    name:
+        description:
+            - Names or glob patterns of the users to return the permissions of.
+            - Without I(name) and I(regex) all users are returned.
+        type: list
+        elements: str
+        required: false
+        aliases: [ user ]
+    regex:
+        description:
+            - Only return users whose name matches this regular expression.
+        type: str
+        required: false
+    offset:
+        description:
+            - Number of matching users to skip, ordered by name.
+        type: int
+        default: 0
+    limit:
+        description:
+            - Maximum number of users to return.
+        type: int
+        required: false
+extends_documentation_fragment:
+    - jiuka.opendistro.baseapi
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = '''
+- name: What can kibanaro do
+  jiuka.opendistro.effective_permissions:
+    name: kibanaro
+
+- name: Audit all service users
+  jiuka.opendistro.effective_permissions:
+    name: 'svc-*'
+  register: audit
+'''
+
+RETURN = '''
+users:
+    description: Effective permissions of the matching users by name.
+    returned: success
+    type: dict
+    contains:
+        backend_roles:
+            description: Backend roles of the user.
+            type: list
+            elements: str
+        roles:
+            description: Roles of the user.
+            type: list
+            elements: str
+        missing_roles:
+            description: Roles the user is mapped to which do not exist.
+            type: list
+            elements: str
+        cluster_permissions:
+            description: Expanded cluster actions of all roles.
+            type: list
+            elements: str
+        index_permissions:
+            description: Index permissions of all roles with expanded C(allowed_actions) and the C(role) granting them.
+            type: list
+            elements: dict
+        tenant_permissions:
+            description: Tenant permissions of all roles with expanded C(allowed_actions) and the C(role) granting them.
+            type: list
+            elements: dict
+total:
+    description: Number of matching users, regardless of I(offset) and I(limit).
+    returned: success
+    type: int
+'''
+
+
+import re
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule
+from ansible_collections.jiuka.opendistro.plugins.module_utils.permissions import PermissionResolver
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi, select_collection
+
+
+# Collections needed to resolve permissions, in the order PermissionResolver takes them
+COLLECTIONS = ('internalusers', 'rolesmapping', 'roles', 'actiongroups')
+
+
+def main():
+    # define available arguments/parameters a user can pass to the module
+    module_args = dict(
+        name=dict(type='list', elements='str', required=False, aliases=['user']),
+        regex=dict(type='str', required=False),
+        offset=dict(type='int', required=False, default=0),
+        limit=dict(type='int', required=False),
+    )
+
+    # seed the result dict in the object
+    result = dict(
+        changed=False,
+    )
+
+    # Setup AnsibleModule
+    module = OpenDistroModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    # Parameters
+    regex = module.params['regex']
+
+    if regex is not None:
+        try:
+            re.compile(regex)
+        except re.error as e:
+            module.fail_json(msg='Invalid regex {0}: {1}'.format(regex, e))
+
+    # Setup API
+    api = SecurityApi(module, 'jiuka.opendistro.effective_permissions')
+
+    # Get current state
+    collections = []
+    for collection, (code, data) in zip(COLLECTIONS, api.batch([('GET', collection, None, None) for collection in COLLECTIONS])):
+        if code != 200:
+            module.fail_json(msg='Error fetching {0}'.format(collection),
+                             http_code=code,
+                             http_body=data,
+                             **result)
+        collections.append(data)
+
+    # Resolve
+    try:
+        resolver = PermissionResolver(*collections)
+    except ValueError as e:
+        module.fail_json(msg=str(e), **result)
+    users, result['total'] = select_collection(collections[0].items(),
+                                               names=module.params['name'],
+                                               regex=regex,
+                                               fields=[],
+                                               offset=module.params['offset'],
+                                               limit=module.params['limit'])
+    result['users'] = dict((name, resolver.permissions(name)) for name in users)
+
+    # in the event of a successful module execution, you will want to
+    # simple AnsibleModule.exit_json(), passing the key/value results
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
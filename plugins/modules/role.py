@@ -0,0 +1,268 @@
+#!/usr/bin/python
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+module: role
+
+short_description: Manage OpenDistro Security roles
+
+version_added: "1.0.0"
+
+description:
+    - Manage roles in a openDistro elasticsearch with security enabled.
+    - Permission lists are compared regardless of their order and only the changed fields are patched.
+
+options:
+    name:
+        description:
+            - Name of the role to manage.
+        type: str
+        required: true
+        aliases: [ role ]
+    description:
+        description:
+            - Description of the role.
+        type: str
+        required: false
+    cluster_permissions:
+        description:
+            - List of cluster permissions and action groups.
+        type: list
+        elements: str
+        required: false
+    index_permissions:
+        description:
+            - List of index permissions.
+        type: list
+        elements: dict
+        required: false
+        suboptions:
+            index_patterns:
+                description:
+                    - Index patterns to apply the permissions to.
+                type: list
+                elements: str
+                required: true
+            dls:
+                description:
+                    - Document level security query.
+                type: str
+                required: false
+            fls:
+                description:
+                    - Field level security fields.
+                type: list
+                elements: str
+                required: false
+            masked_fields:
+                description:
+                    - Fields to mask.
+                type: list
+                elements: str
+                required: false
+            allowed_actions:
+                description:
+                    - Allowed actions and action groups.
+                type: list
+                elements: str
+                required: false
+    tenant_permissions:
+        description:
+            - List of tenant permissions.
+        type: list
+        elements: dict
+        required: false
+        suboptions:
+            tenant_patterns:
+                description:
+                    - Tenant patterns to apply the permissions to.
+                type: list
+                elements: str
+                required: true
+            allowed_actions:
+                description:
+                    - Allowed actions and action groups.
+                type: list
+                elements: str
+                required: false
+    state:
+        description:
+            - The desired state of the role.
+        type: str
+        required: false
+        choices: [ present, absent ]
+        default: present
+
+extends_documentation_fragment:
+    - jiuka.opendistro.baseapi
+    - jiuka.opendistro.baseapi.clusters
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = '''
+- name: Allow reading logs
+  jiuka.opendistro.role:
+    name: logs_read
+    cluster_permissions:
+      - cluster_composite_ops_ro
+    index_permissions:
+      - index_patterns:
+          - 'logs-*'
+        allowed_actions:
+          - read
+
+- name: Allow reading logs on all clusters
+  jiuka.opendistro.role:
+    name: logs_read
+    cluster_permissions:
+      - cluster_composite_ops_ro
+    clusters:
+      - elasticsearch_url: https://es-zrh.example.com:9200
+      - elasticsearch_url: https://es-gva.example.com:9200
+      - elasticsearch_url: https://es-bsl.example.com:9200
+        elasticsearch_password: '{{ bsl_password }}'
+'''
+
+RETURN = '''
+clusters:
+    description: Result of each of the I(clusters).
+    returned: clusters is set
+    type: list
+    elements: dict
+'''
+
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule, create_patch, apply_patch, canonicalize, compact
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi, fields_patch
+
+
+def reconcile(module, api, result):
+    # Parameters
+    name = module.params['name']
+    description = module.params['description']
+    state = module.params['state']
+
+    # Permissions are compared and sent in canonical order
+    fields = dict()
+    for param in ['cluster_permissions', 'index_permissions', 'tenant_permissions']:
+        if module.params[param] is not None:
+            fields[param] = canonicalize(compact(module.params[param]))
+
+    # Get current state
+    code, data = api.get('roles', name)
+    if code == 200:
+        current_config = data[name]
+        current_state = 'present'
+    elif code == 404:
+        current_config = {}
+        current_state = 'absent'
+    else:
+        module.fail_json(msg='Error fetching role infos',
+                         http_code=code,
+                         http_body=data,
+                         **result)
+
+    # Create
+    if state == 'present' and current_state == 'absent':
+        result['changed'] = True
+        payload = dict(fields)
+        if description:
+            payload['description'] = description
+
+        if not module.check_mode:
+            code, data = api.put('roles', name, data=payload)
+
+            if code != 201:
+                module.fail_json(msg='Error creating role',
+                                 http_code=code,
+                                 http_body=data,
+                                 **result)
+
+        new_config = payload
+
+    # Update
+    if state == 'present' and current_state == 'present':
+        payload = create_patch(current_config, 'description', description)
+        payload += fields_patch(current_config, fields)
+
+        if payload:
+            result['changed'] = True
+
+            if not module.check_mode:
+                code, data = api.patch('roles', name, data=payload)
+
+                if code != 200:
+                    module.fail_json(msg='Error updating role',
+                                     http_code=code,
+                                     http_body=data,
+                                     **result)
+
+            new_config = apply_patch(current_config, payload)
+
+    # Delete
+    if state == 'absent' and current_state == 'present':
+        result['changed'] = True
+        if not module.check_mode:
+            code, data = api.delete('roles', name)
+            if code != 200:
+                module.fail_json(msg='Error deleting role',
+                                 http_code=code,
+                                 http_body=data,
+                                 **result)
+        new_config = {}
+
+    if module._diff and result['changed']:
+        result['diff'] = dict(
+            before=current_config,
+            after=new_config,
+        )
+
+
+def main():
+    # define available arguments/parameters a user can pass to the module
+    module_args = dict(
+        name=dict(type='str', required=True, aliases=['role']),
+        description=dict(type='str', required=False),
+        cluster_permissions=dict(type='list', elements='str', required=False),
+        index_permissions=dict(type='list', elements='dict', required=False, options=dict(
+            index_patterns=dict(type='list', elements='str', required=True),
+            dls=dict(type='str', required=False),
+            fls=dict(type='list', elements='str', required=False),
+            masked_fields=dict(type='list', elements='str', required=False),
+            allowed_actions=dict(type='list', elements='str', required=False),
+        )),
+        tenant_permissions=dict(type='list', elements='dict', required=False, options=dict(
+            tenant_patterns=dict(type='list', elements='str', required=True),
+            allowed_actions=dict(type='list', elements='str', required=False),
+        )),
+        state=dict(type='str',
+                   default='present',
+                   choices=['present', 'absent']),
+    )
+
+    # Setup AnsibleModule
+    module = OpenDistroModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+        supports_clusters=True,
+    )
+
+    # Reconcile the cluster, or every one of clusters, and exit
+    module.run(SecurityApi, 'jiuka.opendistro.role', reconcile)
+
+
+if __name__ == '__main__':
+    main()
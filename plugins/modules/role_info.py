@@ -22,14 +22,40 @@ version_added: "1.0.0"
 
 description:
     - Return role information.
+    - Without I(name), with several names, glob patterns or a I(regex) all matching roles are returned in C(roles).
+      The roles collection is fetched once and filtered while it is received.
 
 options:
     name:
         description:
-            - Name of the role to fetch informations for.
-        type: str
-        required: true
+            - Names or glob patterns of the roles to fetch informations for.
+            - A single name without pattern returns the role in C(role).
+        type: list
+        elements: str
+        required: false
         aliases: [ role ]
+    regex:
+        description:
+            - Only return roles whose name matches this regular expression.
+            - The expression may match anywhere in the name, anchor it with C(^) and C($) to match the whole name.
+        type: str
+        required: false
+    fields:
+        description:
+            - Only return these fields of each role.
+        type: list
+        elements: str
+        required: false
+    offset:
+        description:
+            - Number of matching roles to skip, ordered by name.
+        type: int
+        default: 0
+    limit:
+        description:
+            - Maximum number of roles to return.
+        type: int
+        required: false
 
 extends_documentation_fragment:
     - jiuka.opendistro.baseapi
@@ -42,9 +68,22 @@ EXAMPLES = '''
 - name: Get admin
   jiuka.opendistor.role_info:
     name: admin
+
+- name: Get the cluster permissions of all kibana roles
+  jiuka.opendistro.role_info:
+    regex: '^kibana_'
+    fields: [ cluster_permissions ]
 '''
 
 RETURN = '''
+roles:
+    description: Matching roles by name, with the same contents as I(role).
+    returned: listing
+    type: dict
+total:
+    description: Number of matching roles, regardless of I(offset) and I(limit).
+    returned: listing
+    type: int
 role:
     description: Informations about the role.
     returned: if role exists
@@ -100,14 +139,20 @@ role:
 '''
 
 
+import re
+
 from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule
-from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi, is_pattern, select_collection
 
 
 def main():
     # define available arguments/parameters a user can pass to the module
     module_args = dict(
-        name=dict(type='str', required=True, aliases=['role']),
+        name=dict(type='list', elements='str', required=False, aliases=['role']),
+        regex=dict(type='str', required=False),
+        fields=dict(type='list', elements='str', required=False),
+        offset=dict(type='int', required=False, default=0),
+        limit=dict(type='int', required=False),
     )
 
     # seed the result dict in the object
@@ -122,16 +167,35 @@ def main():
     )
 
     # Parameters
-    name = module.params['name']
+    names = module.params['name']
+    regex = module.params['regex']
+    fields = module.params['fields']
+
+    if regex is not None:
+        try:
+            re.compile(regex)
+        except re.error as e:
+            module.fail_json(msg='Invalid regex {0}: {1}'.format(regex, e))
 
     # Setup API
     api = SecurityApi(module, 'jiuka.opendistro.role_info')
-    result['server'] = api.server
+
+    # List roles
+    if not names or len(names) > 1 or is_pattern(names[0]) or regex is not None:
+        result['roles'], result['total'] = select_collection(api.iter_collection('roles'),
+                                                             names=names,
+                                                             regex=regex,
+                                                             fields=fields,
+                                                             offset=module.params['offset'],
+                                                             limit=module.params['limit'])
+        module.exit_json(**result)
 
     # Get current state
+    name = names[0]
     code, data = api.get('roles', name)
     if code == 200:
-        result['role'] = data[name]
+        roles, dummy = select_collection(data.items(), fields=fields)
+        result['role'] = roles[name]
         result['role']['name'] = name
         result['state'] = 'present'
         result['exists'] = True
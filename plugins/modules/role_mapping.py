@@ -0,0 +1,207 @@
+#!/usr/bin/python
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+module: role_mapping
+
+short_description: Manage OpenDistro Security role mappings
+
+version_added: "1.0.0"
+
+description:
+    - Manage the mapping of users, backend roles and hosts to a role in a openDistro elasticsearch with security enabled.
+    - Lists are compared regardless of their order and only the changed fields are patched.
+
+options:
+    name:
+        description:
+            - Name of the role to map.
+        type: str
+        required: true
+        aliases: [ role ]
+    description:
+        description:
+            - Description of the role mapping.
+        type: str
+        required: false
+    backend_roles:
+        description:
+            - List of backend roles mapped to the role.
+        type: list
+        elements: str
+        required: false
+    and_backend_roles:
+        description:
+            - List of backend roles a user must all have to be mapped to the role.
+        type: list
+        elements: str
+        required: false
+    hosts:
+        description:
+            - List of hosts mapped to the role.
+        type: list
+        elements: str
+        required: false
+    users:
+        description:
+            - List of users mapped to the role.
+        type: list
+        elements: str
+        required: false
+    state:
+        description:
+            - The desired state of the role mapping.
+        type: str
+        required: false
+        choices: [ present, absent ]
+        default: present
+
+extends_documentation_fragment:
+    - jiuka.opendistro.baseapi
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = '''
+- name: Map the logs backend role to logs_read
+  jiuka.opendistro.role_mapping:
+    name: logs_read
+    backend_roles:
+      - logs
+'''
+
+RETURN = ''' # '''
+
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule, create_patch, apply_patch, canonicalize
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi, fields_patch
+
+
+def main():
+    # define available arguments/parameters a user can pass to the module
+    module_args = dict(
+        name=dict(type='str', required=True, aliases=['role']),
+        description=dict(type='str', required=False),
+        backend_roles=dict(type='list', elements='str', required=False),
+        and_backend_roles=dict(type='list', elements='str', required=False),
+        hosts=dict(type='list', elements='str', required=False),
+        users=dict(type='list', elements='str', required=False),
+        state=dict(type='str',
+                   default='present',
+                   choices=['present', 'absent']),
+    )
+
+    # seed the result dict in the object
+    result = dict(
+        changed=False,
+    )
+
+    # Setup AnsibleModule
+    module = OpenDistroModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    # Parameters
+    name = module.params['name']
+    description = module.params['description']
+    state = module.params['state']
+
+    # Lists are compared and sent in canonical order
+    fields = dict()
+    for param in ['backend_roles', 'and_backend_roles', 'hosts', 'users']:
+        if module.params[param] is not None:
+            fields[param] = canonicalize(module.params[param])
+
+    # Setup API
+    api = SecurityApi(module, 'jiuka.opendistro.role_mapping')
+    result['server'] = api.server
+
+    # Get current state
+    code, data = api.get('rolesmapping', name)
+    if code == 200:
+        current_config = data[name]
+        current_state = 'present'
+    elif code == 404:
+        current_config = {}
+        current_state = 'absent'
+    else:
+        module.fail_json(msg='Error fetching role mapping infos',
+                         http_code=code,
+                         http_body=data,
+                         **result)
+
+    # Create
+    if state == 'present' and current_state == 'absent':
+        result['changed'] = True
+        payload = dict(fields)
+        if description:
+            payload['description'] = description
+
+        if not module.check_mode:
+            code, data = api.put('rolesmapping', name, data=payload)
+
+            if code != 201:
+                module.fail_json(msg='Error creating role mapping',
+                                 http_code=code,
+                                 http_body=data,
+                                 **result)
+
+        new_config = payload
+
+    # Update
+    if state == 'present' and current_state == 'present':
+        payload = create_patch(current_config, 'description', description)
+        payload += fields_patch(current_config, fields)
+
+        if payload:
+            result['changed'] = True
+
+            if not module.check_mode:
+                code, data = api.patch('rolesmapping', name, data=payload)
+
+                if code != 200:
+                    module.fail_json(msg='Error updating role mapping',
+                                     http_code=code,
+                                     http_body=data,
+                                     **result)
+
+            new_config = apply_patch(current_config, payload)
+
+    # Delete
+    if state == 'absent' and current_state == 'present':
+        result['changed'] = True
+        if not module.check_mode:
+            code, data = api.delete('rolesmapping', name)
+            if code != 200:
+                module.fail_json(msg='Error deleting role mapping',
+                                 http_code=code,
+                                 http_body=data,
+                                 **result)
+        new_config = {}
+
+    if module._diff and result['changed']:
+        result['diff'] = dict(
+            before=current_config,
+            after=new_config,
+        )
+
+    # in the event of a successful module execution, you will want to
+    # simple AnsibleModule.exit_json(), passing the key/value results
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
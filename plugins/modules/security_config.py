@@ -0,0 +1,236 @@
+#!/usr/bin/python
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+module: security_config
+
+short_description: Manage the whole OpenDistro Security configuration at once
+
+version_added: "1.0.0"
+
+description:
+    - Manage internal users, roles, role mappings, action groups and tenants of a openDistro elasticsearch with security enabled in a single task.
+    - Each given collection is fetched once and all its changes are sent as a single JSON-Patch.
+    - The collections are changed in the order action groups, tenants, roles, internal users and role mappings, so entities exist before they are referred to.
+    - Only the fields given for an entity are compared, lists regardless of their order. Collections which are not given are left alone.
+
+options:
+    actiongroups:
+        description:
+            - Action groups by name, in the format of the REST API.
+        type: dict
+        required: false
+    tenants:
+        description:
+            - Tenants by name, in the format of the REST API.
+        type: dict
+        required: false
+    roles:
+        description:
+            - Roles by name, in the format of the REST API.
+        type: dict
+        required: false
+    internalusers:
+        description:
+            - Internal users by name, in the format of the REST API.
+            - C(password) and C(hash) are only sent when creating the user, unless I(update_password) is set.
+            - The given passwords and hashes are hidden from the output.
+        type: dict
+        required: false
+    update_password:
+        description:
+            - Also send C(password) and C(hash) of existing I(internalusers).
+            - The cluster never returns the stored hash, the users are updated and the task reported as changed on every run.
+        type: bool
+        default: false
+    rolesmapping:
+        description:
+            - Role mappings by role name, in the format of the REST API.
+            - Every mapped role must exist or be given in I(roles).
+        type: dict
+        required: false
+    purge:
+        description:
+            - Remove all entities of the given collections which are not listed.
+            - Reserved, hidden and static entities are never removed.
+        type: bool
+        default: false
+
+extends_documentation_fragment:
+    - jiuka.opendistro.baseapi
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = '''
+- name: Configure logs access
+  jiuka.opendistro.security_config:
+    actiongroups:
+      logs_read:
+        type: index
+        allowed_actions:
+          - read
+          - search
+    roles:
+      logs_reader:
+        index_permissions:
+          - index_patterns: [ 'logs-*' ]
+            allowed_actions: [ logs_read ]
+    internalusers:
+      fluentd:
+        hash: '$2a$12$AMTOYfh3q3DvdXQQNeiROeOhneR2YQ3wiI0VgXtcJyrCmZ96G7yRq'
+        backend_roles: [ logs ]
+    rolesmapping:
+      logs_reader:
+        backend_roles: [ logs ]
+'''
+
+RETURN = '''
+plan:
+    description: Created, updated and removed entities per collection, in the order they are applied.
+    returned: success
+    type: list
+    elements: dict
+    sample:
+        - collection: roles
+          created: [ logs_reader ]
+          updated: []
+          removed: []
+'''
+
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi, COLLECTIONS, SECRET_KEYS, \
+    plan_collection, redact
+
+
+def fetch_collection(module, api, collection, result):
+    code, data = api.get(collection)
+    if code != 200:
+        module.fail_json(msg='Error fetching {0}'.format(collection),
+                         http_code=code,
+                         http_body=data,
+                         **result)
+    return data
+
+
+def main():
+    # define available arguments/parameters a user can pass to the module
+    module_args = dict(
+        actiongroups=dict(type='dict', required=False),
+        tenants=dict(type='dict', required=False),
+        roles=dict(type='dict', required=False),
+        internalusers=dict(type='dict', required=False),
+        rolesmapping=dict(type='dict', required=False),
+        update_password=dict(type='bool', required=False, default=False, no_log=False),
+        purge=dict(type='bool', required=False, default=False),
+    )
+
+    # seed the result dict in the object
+    result = dict(
+        changed=False,
+        plan=[],
+    )
+
+    # Setup AnsibleModule
+    module = OpenDistroModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    # Parameters
+    purge = module.params['purge']
+    update_password = module.params['update_password']
+
+    # The internal users are a plain dict, hide their secrets like no_log options
+    for config in (module.params['internalusers'] or {}).values():
+        for key in SECRET_KEYS:
+            if (config or {}).get(key, None):
+                module.no_log_values.add(config[key])
+
+    # Setup API
+    api = SecurityApi(module, 'jiuka.opendistro.security_config')
+    result['server'] = api.server
+
+    # Get current state
+    current = dict()
+    for collection in COLLECTIONS:
+        if module.params[collection] is not None:
+            current[collection] = fetch_collection(module, api, collection, result)
+
+    # Plan
+    plans = dict()
+    patches = dict()
+    before = dict()
+    after = dict()
+    for collection in COLLECTIONS:
+        if collection not in current:
+            continue
+
+        patch, plan, before[collection], after[collection] = plan_collection(
+            current[collection], module.params[collection], purge=purge,
+            write_only=SECRET_KEYS if collection == 'internalusers' and not update_password else ())
+
+        plans[collection] = plan
+        result['plan'].append(dict(plan, collection=collection))
+        if patch:
+            patches[collection] = patch
+
+    # Role mappings must refer to existing roles
+    if module.params['rolesmapping']:
+        if 'roles' in current:
+            roles = set(current['roles']) - set(plans['roles']['removed'])
+            roles |= set(module.params['roles'])
+        else:
+            roles = set(fetch_collection(module, api, 'roles', result))
+
+        missing = sorted(set(module.params['rolesmapping']) - roles)
+        if missing:
+            module.fail_json(msg='Role mappings refer to unknown roles: {0}'.format(', '.join(missing)),
+                             **result)
+
+    # Apply
+    if patches:
+        result['changed'] = True
+
+        if not module.check_mode:
+            for collection in COLLECTIONS:
+                if collection not in patches:
+                    continue
+
+                code, data = api.patch(collection, data=patches[collection])
+
+                if code != 200:
+                    module.fail_json(msg='Error updating {0}'.format(collection),
+                                     http_code=code,
+                                     http_body=data,
+                                     **result)
+
+    if module._diff and result['changed']:
+        if 'internalusers' in before:
+            before['internalusers'] = dict((k, redact(v)) for k, v in before['internalusers'].items())
+            after['internalusers'] = dict((k, redact(v)) for k, v in after['internalusers'].items())
+        result['diff'] = dict(
+            before=dict((k, v) for k, v in before.items() if v),
+            after=dict((k, v) for k, v in after.items() if v),
+        )
+
+    # in the event of a successful module execution, you will want to
+    # simple AnsibleModule.exit_json(), passing the key/value results
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
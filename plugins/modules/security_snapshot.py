@@ -0,0 +1,134 @@
+#!/usr/bin/python
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+module: security_snapshot
+
+short_description: Write a snapshot of the OpenDistro Security configuration
+
+version_added: "1.0.0"
+
+description:
+    - Fetch the security configuration of a openDistro elasticsearch once and write it to a compressed local file.
+    - Other modules of this collection read from this snapshot in check mode if given the same I(snapshot), without talking to the cluster.
+    - The snapshot is written in check mode as well, it is a local copy and does not change the cluster.
+    - The snapshot contains password hashes, it is only readable by the owner.
+
+options:
+    snapshot:
+        description:
+            - Path to write the snapshot to.
+        type: path
+        required: true
+    collections:
+        description:
+            - Collections to include in the snapshot.
+        type: list
+        elements: str
+        choices: [ actiongroups, tenants, roles, internalusers, rolesmapping ]
+        default: [ actiongroups, tenants, roles, internalusers, rolesmapping ]
+
+extends_documentation_fragment:
+    - jiuka.opendistro.baseapi
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = '''
+- name: Snapshot the security configuration once
+  jiuka.opendistro.security_snapshot:
+    snapshot: /tmp/security.zip
+  delegate_to: localhost
+  run_once: true
+
+- name: Dry-run against the snapshot
+  jiuka.opendistro.user:
+    name: foo
+    password_hash: '$2a$12$AMTOYfh3q3DvdXQQNeiROeOhneR2YQ3wiI0VgXtcJyrCmZ96G7yRq'
+    snapshot: /tmp/security.zip
+  check_mode: true
+'''
+
+RETURN = '''
+snapshot:
+    description: Path of the written snapshot.
+    returned: success
+    type: str
+entities:
+    description: Number of entities written per collection.
+    returned: success
+    type: dict
+    sample:
+        internalusers: 12
+        roles: 30
+'''
+
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi, COLLECTIONS
+from ansible_collections.jiuka.opendistro.plugins.module_utils.snapshot import SnapshotWriter
+
+
+def main():
+    # define available arguments/parameters a user can pass to the module
+    module_args = dict(
+        snapshot=dict(type='path', required=True),
+        collections=dict(type='list', elements='str', required=False,
+                         choices=list(COLLECTIONS), default=list(COLLECTIONS)),
+    )
+
+    # seed the result dict in the object
+    result = dict(
+        changed=False,
+        entities=dict(),
+    )
+
+    # Setup AnsibleModule
+    module = OpenDistroModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    # The cluster is always needed, even in check mode
+    if not module.params['elasticsearch_url'] and not module._socket_path:
+        module.fail_json(msg="missing required arguments: elasticsearch_url")
+
+    # Parameters
+    path = module.params['snapshot']
+    result['snapshot'] = path
+
+    # Setup API, the snapshot is written and never read
+    api = SecurityApi(module, 'jiuka.opendistro.security_snapshot', use_snapshot=False)
+
+    # Write snapshot
+    try:
+        with SnapshotWriter(path) as writer:
+            writer.write_server(api.server)
+            for collection in COLLECTIONS:
+                if collection in module.params['collections']:
+                    result['entities'][collection] = writer.write_collection(collection, api.iter_collection(collection))
+    except (IOError, OSError) as e:
+        module.fail_json(msg='Error writing snapshot {0}: {1}'.format(path, e),
+                         **result)
+
+    result['changed'] = writer.changed
+
+    # in the event of a successful module execution, you will want to
+    # simple AnsibleModule.exit_json(), passing the key/value results
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/python
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+module: tenant
+
+short_description: Manage OpenDistro Security tenants
+
+version_added: "1.0.0"
+
+description:
+    - Manage Kibana tenants in a openDistro elasticsearch with security enabled.
+    - Use M(jiuka.opendistro.tenants) to manage many tenants at once.
+
+options:
+    name:
+        description:
+            - Name of the tenant to manage.
+        type: str
+        required: true
+        aliases: [ tenant ]
+    description:
+        description:
+            - Description of the tenant.
+        type: str
+        required: false
+    state:
+        description:
+            - The desired state of the tenant.
+        type: str
+        required: false
+        choices: [ present, absent ]
+        default: present
+
+extends_documentation_fragment:
+    - jiuka.opendistro.baseapi
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = '''
+- name: Create the analysts tenant
+  jiuka.opendistro.tenant:
+    name: analysts
+    description: Dashboards of the analysts
+'''
+
+RETURN = ''' # '''
+
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule, create_patch, apply_patch
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi
+
+
+def main():
+    # define available arguments/parameters a user can pass to the module
+    module_args = dict(
+        name=dict(type='str', required=True, aliases=['tenant']),
+        description=dict(type='str', required=False),
+        state=dict(type='str',
+                   default='present',
+                   choices=['present', 'absent']),
+    )
+
+    # seed the result dict in the object
+    result = dict(
+        changed=False,
+    )
+
+    # Setup AnsibleModule
+    module = OpenDistroModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    # Parameters
+    name = module.params['name']
+    description = module.params['description']
+    state = module.params['state']
+
+    # Setup API
+    api = SecurityApi(module, 'jiuka.opendistro.tenant')
+    result['server'] = api.server
+
+    # Get current state
+    code, data = api.get('tenants', name)
+    if code == 200:
+        current_config = data[name]
+        current_state = 'present'
+    elif code == 404:
+        current_config = {}
+        current_state = 'absent'
+    else:
+        module.fail_json(msg='Error fetching tenant infos',
+                         http_code=code,
+                         http_body=data,
+                         **result)
+
+    # Create
+    if state == 'present' and current_state == 'absent':
+        result['changed'] = True
+        payload = dict()
+        if description:
+            payload['description'] = description
+
+        if not module.check_mode:
+            code, data = api.put('tenants', name, data=payload)
+
+            if code != 201:
+                module.fail_json(msg='Error creating tenant',
+                                 http_code=code,
+                                 http_body=data,
+                                 **result)
+
+        new_config = payload
+
+    # Update
+    if state == 'present' and current_state == 'present':
+        payload = create_patch(current_config, 'description', description)
+
+        if payload:
+            result['changed'] = True
+
+            if not module.check_mode:
+                code, data = api.patch('tenants', name, data=payload)
+
+                if code != 200:
+                    module.fail_json(msg='Error updating tenant',
+                                     http_code=code,
+                                     http_body=data,
+                                     **result)
+
+            new_config = apply_patch(current_config, payload)
+
+    # Delete
+    if state == 'absent' and current_state == 'present':
+        result['changed'] = True
+        if not module.check_mode:
+            code, data = api.delete('tenants', name)
+            if code != 200:
+                module.fail_json(msg='Error deleting tenant',
+                                 http_code=code,
+                                 http_body=data,
+                                 **result)
+        new_config = {}
+
+    if module._diff and result['changed']:
+        result['diff'] = dict(
+            before=current_config,
+            after=new_config,
+        )
+
+    # in the event of a successful module execution, you will want to
+    # simple AnsibleModule.exit_json(), passing the key/value results
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
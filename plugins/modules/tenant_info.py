@@ -0,0 +1,120 @@
+#!/usr/bin/python
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+module: tenant_info
+
+short_description: Return tenant information.
+
+version_added: "1.0.0"
+
+description:
+    - Return tenant information.
+
+options:
+    name:
+        description:
+            - Name of the tenant to fetch informations for.
+        type: str
+        required: true
+        aliases: [ tenant ]
+
+extends_documentation_fragment:
+    - jiuka.opendistro.baseapi
+
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = '''
+- name: Get the global tenant
+  jiuka.opendistro.tenant_info:
+    name: global_tenant
+'''
+
+RETURN = '''
+tenant:
+    description: Informations about the tenant.
+    returned: if tenant exists
+    type: dict
+    contains:
+        name:
+            description: Name of the tenant.
+            type: str
+        description:
+            description: Description of the tenant.
+            type: str
+        hidden:
+            description: If the tenant is hidden.
+            type: bool
+        reserved:
+            description: If the tenant is reserved.
+            type: bool
+        static:
+            description: If the tenant is static.
+            type: bool
+'''
+
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi
+
+
+def main():
+    # define available arguments/parameters a user can pass to the module
+    module_args = dict(
+        name=dict(type='str', required=True, aliases=['tenant']),
+    )
+
+    # seed the result dict in the object
+    result = dict(
+        changed=False,
+    )
+
+    # Setup AnsibleModule
+    module = OpenDistroModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    # Parameters
+    name = module.params['name']
+
+    # Setup API
+    api = SecurityApi(module, 'jiuka.opendistro.tenant_info')
+
+    # Get current state
+    code, data = api.get('tenants', name)
+    if code == 200:
+        result['tenant'] = data[name]
+        result['tenant']['name'] = name
+        result['state'] = 'present'
+        result['exists'] = True
+    elif code == 404:
+        result['state'] = 'absent'
+        result['exists'] = False
+    else:
+        module.fail_json(msg='Error fetching tenant infos',
+                         http_code=code,
+                         http_body=data,
+                         **result)
+
+    # in the event of a successful module execution, you will want to
+    # simple AnsibleModule.exit_json(), passing the key/value results
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
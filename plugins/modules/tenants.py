@@ -0,0 +1,191 @@
+#!/usr/bin/python
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+module: tenants
+
+short_description: Manage many OpenDistro Security tenants at once
+
+version_added: "1.0.0"
+
+description:
+    - Manage the Kibana tenants of a openDistro elasticsearch with security enabled in bulk.
+    - The whole tenants collection is fetched once and all changes are sent as a single JSON-Patch.
+
+options:
+    tenants:
+        description:
+            - List of tenants to manage.
+        type: list
+        elements: dict
+        required: true
+        suboptions:
+            name:
+                description:
+                    - Name of the tenant to manage.
+                type: str
+                required: true
+            description:
+                description:
+                    - Description of the tenant.
+                type: str
+                required: false
+            state:
+                description:
+                    - The desired state of the tenant.
+                type: str
+                required: false
+                choices: [ present, absent ]
+                default: present
+    purge:
+        description:
+            - Remove all tenants not listed in I(tenants).
+            - Reserved, hidden and static tenants are never removed.
+        type: bool
+        default: false
+
+extends_documentation_fragment:
+    - jiuka.opendistro.baseapi
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = '''
+- name: Ensure a tenant per team exists
+  jiuka.opendistro.tenants:
+    tenants:
+      - name: analysts
+        description: Dashboards of the analysts
+      - name: operations
+      - name: interns
+        state: absent
+'''
+
+RETURN = '''
+created:
+    description: Names of the created tenants.
+    returned: success
+    type: list
+    elements: str
+updated:
+    description: Names of the updated tenants.
+    returned: success
+    type: list
+    elements: str
+removed:
+    description: Names of the removed tenants.
+    returned: success
+    type: list
+    elements: str
+patch:
+    description: The JSON-Patch sent to the cluster.
+    returned: changed
+    type: list
+    elements: dict
+'''
+
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule, json_pointer
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi, plan_collection
+
+
+def main():
+    # define available arguments/parameters a user can pass to the module
+    tenant_args = dict(
+        name=dict(type='str', required=True),
+        description=dict(type='str', required=False),
+        state=dict(type='str',
+                   default='present',
+                   choices=['present', 'absent']),
+    )
+    module_args = dict(
+        tenants=dict(type='list', elements='dict', required=True, options=tenant_args),
+        purge=dict(type='bool', required=False, default=False),
+    )
+
+    # seed the result dict in the object
+    result = dict(
+        changed=False,
+        created=[],
+        updated=[],
+        removed=[],
+    )
+
+    # Setup AnsibleModule
+    module = OpenDistroModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    # Parameters
+    tenants = module.params['tenants']
+    purge = module.params['purge']
+
+    # Setup API
+    api = SecurityApi(module, 'jiuka.opendistro.tenants')
+    result['server'] = api.server
+
+    # Get current state
+    code, data = api.get('tenants')
+    if code != 200:
+        module.fail_json(msg='Error fetching tenant infos',
+                         http_code=code,
+                         http_body=data,
+                         **result)
+    current_tenants = data
+
+    # Create, update and purge
+    desired = dict()
+    for tenant in tenants:
+        if tenant['state'] == 'present':
+            desired[tenant['name']] = dict(description=tenant['description'])
+
+    patch, plan, before, after = plan_collection(current_tenants, desired, purge=purge)
+    result.update(plan)
+
+    # Delete
+    for tenant in tenants:
+        name = tenant['name']
+        if tenant['state'] == 'absent' and name in current_tenants and name not in result['removed']:
+            patch.append(dict(op='remove', path=json_pointer(name)))
+            result['removed'].append(name)
+            before[name] = current_tenants[name]
+
+    if patch:
+        result['changed'] = True
+        result['patch'] = patch
+
+        if not module.check_mode:
+            code, data = api.patch('tenants', data=patch)
+
+            if code != 200:
+                module.fail_json(msg='Error updating tenants',
+                                 http_code=code,
+                                 http_body=data,
+                                 **result)
+
+    if module._diff and result['changed']:
+        result['diff'] = dict(
+            before=before,
+            after=after,
+        )
+
+    # in the event of a successful module execution, you will want to
+    # simple AnsibleModule.exit_json(), passing the key/value results
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
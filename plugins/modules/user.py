@@ -22,14 +22,62 @@ version_added: "1.0.0"
 
 description:
     - Manage user in a openDistro elasticsearch with security enabled.
+    - With I(users) many users are managed by a single run of M(jiuka.opendistro.users), fetching the users once and sending a single JSON-Patch.
 
 options:
     name:
         description:
             - Name of the user to manage.
+            - Either I(name) or I(users) is required.
         type: str
-        required: true
+        required: false
         aliases: [ user ]
+    users:
+        description:
+            - List of users to manage at once instead of a single user.
+            - Each item takes the user options, the options given on the task apply to every item not setting them.
+            - The result of each user is returned in C(results).
+            - I(clusters) and I(verify_after_write) are not supported with I(users).
+        type: list
+        elements: dict
+        required: false
+        suboptions:
+            name:
+                description:
+                    - Name of the user to manage.
+                type: str
+                required: true
+            password:
+                description:
+                    - Plaintext password to set for the user.
+                type: str
+            password_hash:
+                description:
+                    - BCrypt hashed password to set for the user.
+                type: str
+                aliases: [ hash ]
+            update_password:
+                description:
+                    - Should the password be updated on each run?
+                    - The cluster never returns the stored hash, the password is updated on every run.
+                type: bool
+            description:
+                description:
+                    - Description of the user.
+                type: str
+            roles:
+                description:
+                    - List of backend roles to assign the user to.
+                type: list
+            attributes:
+                description:
+                    - Dictonary of attributes to set for the user.
+                type: dict
+            state:
+                description:
+                    - The desired state of the user.
+                type: str
+                choices: [ present, absent ]
     password:
         description:
             - Plaintext password to set for the user.
@@ -44,8 +92,14 @@ options:
     update_password:
         description:
             - Should the password be updated on each run?
+            - The cluster never returns the stored hash, the password is updated and the user reported as changed on every run.
         type: bool
         default: false
+    password_hash_rounds:
+        description:
+            - BCrypt cost factor used to hash I(password) on the controller.
+        type: int
+        default: 12
     description:
         description:
             - Description of the user.
@@ -61,6 +115,12 @@ options:
             - Dictonary of attributes to set for the user.
         type: dict
         required: false
+    verify_after_write:
+        description:
+            - Fetch the user again after creating or updating it to report the state stored on the cluster.
+            - By default the new state is computed locally from the sent payload.
+        type: bool
+        default: false
     state:
         description:
             - The desired state of the user.
@@ -71,6 +131,7 @@ options:
 
 extends_documentation_fragment:
     - jiuka.opendistro.baseapi
+    - jiuka.opendistro.baseapi.clusters
 author:
     - Marius Rieder (@jiuka)
 '''
@@ -79,6 +140,17 @@ EXAMPLES = '''
 - name: Create Foo user
   jiuka.opendistor.user_info:
     name: admin
+
+- name: Create all team users at once
+  jiuka.opendistro.user:
+    users: "{{ team | map('combine', {'roles': ['team']}) | list }}"
+
+- name: Reset the password of a team user
+  jiuka.opendistro.user:
+    users:
+      - name: alice
+        password: "{{ alice_password }}"
+        update_password: true
 '''
 
 RETURN = '''
@@ -86,41 +158,34 @@ user:
     description: Informations about the user.
     returned: success
     type: dict
+clusters:
+    description: Result of each of the I(clusters).
+    returned: clusters is set
+    type: list
+    elements: dict
+results:
+    description: Result of each of the I(users), with its C(name), C(state), C(changed) and C(diff).
+    returned: users is set
+    type: list
+    elements: dict
 '''
 
 
 from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule, create_patch, apply_patch
-from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi, redact
 
 
-def main():
-    # define available arguments/parameters a user can pass to the module
-    module_args = dict(
-        name=dict(type='str', required=True, aliases=['user']),
-        password=dict(type='str', required=False, no_log=True),
-        password_hash=dict(type='str', required=False, aliases=['hash'], no_log=True),
-        update_password=dict(type='bool',
-                             required=False,
-                             default=False, no_log=False),
-        description=dict(type='str', required=False),
-        roles=dict(type='list', required=False),
-        attributes=dict(type='dict', required=False),
-        state=dict(type='str',
-                   default='present',
-                   choices=['present', 'absent']),
-    )
-
-    # seed the result dict in the object
-    result = dict(
-        changed=False,
-    )
+def fetch_user(module, api, name, result):
+    code, data = api.get('internalusers', name)
+    if code != 200:
+        module.fail_json(msg='Error fetching user infos',
+                         http_code=code,
+                         http_body=data,
+                         **result)
+    return data[name]
 
-    # Setup AnsibleModule
-    module = OpenDistroModule(
-        argument_spec=module_args,
-        supports_check_mode=True,
-    )
 
+def reconcile(module, api, result):
     # Parameters
     name = module.params['name']
     password = module.params['password']
@@ -129,12 +194,9 @@ def main():
     description = module.params['description']
     roles = module.params['roles']
     attributes = module.params['attributes']
+    verify_after_write = module.params['verify_after_write']
     state = module.params['state']
 
-    # Setup API
-    api = SecurityApi(module, 'jiuka.opendistro.user')
-    result['server'] = api.server
-
     # Get current state
     code, data = api.get('internalusers', name)
     if code == 200:
@@ -174,29 +236,22 @@ def main():
                                  http_body=data,
                                  **result)
 
-            code, data = api.get('internalusers', name)
-            if code != 200:
-                module.fail_json(msg='Error fetching user infos',
-                                 http_code=code,
-                                 http_body=data,
-                                 **result)
-            new_config = data[name]
+        if verify_after_write and not module.check_mode:
+            new_config = fetch_user(module, api, name, result)
         else:
-            new_config = payload
+            new_config = redact(payload)
 
     # Update
     if state == 'present' and current_state == 'present':
-        payload = list(filter(None, [
-            create_patch(current_config, 'description', description),
-            create_patch(current_config, 'backend_roles', roles),
-            create_patch(current_config, 'attributes', attributes),
-        ]))
+        payload = create_patch(current_config, 'description', description) + \
+            create_patch(current_config, 'backend_roles', roles) + \
+            create_patch(current_config, 'attributes', attributes)
 
         if update_password:
             if password:
-                payload.append(create_patch(current_config, 'password', password))
+                payload += create_patch(current_config, 'password', password)
             else:
-                payload.append(create_patch(current_config, 'hash', password_hash))
+                payload += create_patch(current_config, 'hash', password_hash)
 
         if payload:
             result['changed'] = True
@@ -210,16 +265,10 @@ def main():
                                      http_body=data,
                                      **result)
 
-                code, data = api.get('internalusers', name)
-                if code != 200:
-                    module.fail_json(msg='Error fetching user infos',
-                                     http_code=code,
-                                     http_body=data,
-                                     **result)
-                new_config = data[name]
+            if verify_after_write and not module.check_mode:
+                new_config = fetch_user(module, api, name, result)
             else:
-                new_config = current_config.copy()
-                apply_patch(new_config, payload)
+                new_config = redact(apply_patch(current_config, payload))
 
     # Delete
     if state == 'absent' and current_state == 'present':
@@ -235,13 +284,55 @@ def main():
 
     if module._diff and result['changed']:
         result['diff'] = dict(
-            before=current_config,
-            after=new_config,
+            before=redact(current_config),
+            after=redact(new_config),
         )
 
-    # in the event of a successful module execution, you will want to
-    # simple AnsibleModule.exit_json(), passing the key/value results
-    module.exit_json(**result)
+
+def main():
+    # define available arguments/parameters a user can pass to the module
+    module_args = dict(
+        name=dict(type='str', required=False, aliases=['user']),
+        users=dict(type='list', elements='dict', required=False, options=dict(
+            name=dict(type='str', required=True),
+            password=dict(type='str', required=False, no_log=True),
+            password_hash=dict(type='str', required=False, aliases=['hash'], no_log=True),
+            update_password=dict(type='bool', required=False, no_log=False),
+            description=dict(type='str', required=False),
+            roles=dict(type='list', required=False),
+            attributes=dict(type='dict', required=False),
+            state=dict(type='str', required=False, choices=['present', 'absent']),
+        )),
+        password=dict(type='str', required=False, no_log=True),
+        password_hash=dict(type='str', required=False, aliases=['hash'], no_log=True),
+        update_password=dict(type='bool',
+                             required=False,
+                             default=False, no_log=False),
+        password_hash_rounds=dict(type='int', required=False, default=12),
+        description=dict(type='str', required=False),
+        roles=dict(type='list', required=False),
+        attributes=dict(type='dict', required=False),
+        verify_after_write=dict(type='bool', required=False, default=False),
+        state=dict(type='str',
+                   default='present',
+                   choices=['present', 'absent']),
+    )
+
+    # Setup AnsibleModule
+    module = OpenDistroModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+        supports_clusters=True,
+        required_one_of=[['name', 'users']],
+        mutually_exclusive=[['name', 'users']],
+    )
+
+    # Many users are applied by the action plugin through the users module
+    if module.params['users'] is not None:
+        module.fail_json(msg='users is only supported through the jiuka.opendistro.user action')
+
+    # Reconcile the cluster, or every one of clusters, and exit
+    module.run(SecurityApi, 'jiuka.opendistro.user', reconcile)
 
 
 if __name__ == '__main__':
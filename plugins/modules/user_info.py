@@ -19,13 +19,39 @@ short_description: Return user information.
 version_added: "1.0.0"
 description:
     - Return user information.
+    - Without I(name), with several names, glob patterns or a I(regex) all matching users are returned in C(users).
+      The internalusers collection is fetched once and filtered while it is received.
 options:
     name:
         description:
-            - Name of the user to fetch informations for.
-        type: str
-        required: true
+            - Names or glob patterns of the users to fetch informations for.
+            - A single name without pattern returns the user in C(user).
+        type: list
+        elements: str
+        required: false
         aliases: [ user ]
+    regex:
+        description:
+            - Only return users whose name matches this regular expression.
+            - The expression may match anywhere in the name, anchor it with C(^) and C($) to match the whole name.
+        type: str
+        required: false
+    fields:
+        description:
+            - Only return these fields of each user.
+        type: list
+        elements: str
+        required: false
+    offset:
+        description:
+            - Number of matching users to skip, ordered by name.
+        type: int
+        default: 0
+    limit:
+        description:
+            - Maximum number of users to return.
+        type: int
+        required: false
 extends_documentation_fragment:
     - jiuka.opendistro.baseapi
 author:
@@ -36,24 +62,44 @@ EXAMPLES = '''
 - name: Get admin
   jiuka.opendistor.user_info:
     name: admin
+
+- name: Get the backend roles of the first hundred service users
+  jiuka.opendistro.user_info:
+    name: 'svc-*'
+    fields: [ backend_roles ]
+    limit: 100
 '''
 
 RETURN = '''
 user:
     description: Informations about the user.
-    returned: success
+    returned: single name
+    type: dict
+users:
+    description: Matching users by name.
+    returned: listing
     type: dict
+total:
+    description: Number of matching users, regardless of I(offset) and I(limit).
+    returned: listing
+    type: int
 '''
 
 
+import re
+
 from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule
-from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi, is_pattern, select_collection
 
 
 def main():
     # define available arguments/parameters a user can pass to the module
     module_args = dict(
-        name=dict(type='str', required=True, aliases=['user']),
+        name=dict(type='list', elements='str', required=False, aliases=['user']),
+        regex=dict(type='str', required=False),
+        fields=dict(type='list', elements='str', required=False),
+        offset=dict(type='int', required=False, default=0),
+        limit=dict(type='int', required=False),
     )
 
     # seed the result dict in the object
@@ -68,16 +114,34 @@ def main():
     )
 
     # Parameters
-    name = module.params['name']
+    names = module.params['name']
+    regex = module.params['regex']
+    fields = module.params['fields']
+
+    if regex is not None:
+        try:
+            re.compile(regex)
+        except re.error as e:
+            module.fail_json(msg='Invalid regex {0}: {1}'.format(regex, e))
 
     # Setup API
     api = SecurityApi(module, 'jiuka.opendistro.user_info')
-    result['server'] = api.server
+
+    # List users
+    if not names or len(names) > 1 or is_pattern(names[0]) or regex is not None:
+        result['users'], result['total'] = select_collection(api.iter_collection('internalusers'),
+                                                             names=names,
+                                                             regex=regex,
+                                                             fields=fields,
+                                                             offset=module.params['offset'],
+                                                             limit=module.params['limit'])
+        module.exit_json(**result)
 
     # Get current state
+    name = names[0]
     code, data = api.get('internalusers', name)
     if code == 200:
-        result['user'] = data
+        result['user'], dummy = select_collection(data.items(), fields=fields)
         result['state'] = 'present'
         result['exists'] = True
     elif code == 404:
@@ -0,0 +1,294 @@
+#!/usr/bin/python
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+module: users
+
+short_description: Manage many OpenDistro Security users at once
+
+version_added: "1.0.0"
+
+description:
+    - Manage the internal users of a openDistro elasticsearch with security enabled in bulk.
+    - The whole internalusers collection is fetched once and all changes are sent as a single JSON-Patch.
+
+options:
+    users:
+        description:
+            - List of users to manage.
+        type: list
+        elements: dict
+        required: true
+        suboptions:
+            name:
+                description:
+                    - Name of the user to manage.
+                type: str
+                required: true
+            password:
+                description:
+                    - Plaintext password to set for the user.
+                type: str
+                required: false
+            password_hash:
+                description:
+                    - BCrypt hashed password to set for the user.
+                type: str
+                required: false
+                aliases: [ hash ]
+            update_password:
+                description:
+                    - Should the password be updated on each run?
+                    - The cluster never returns the stored hash, the password is updated on every run.
+                type: bool
+                default: false
+            description:
+                description:
+                    - Description of the user.
+                type: str
+                required: false
+            roles:
+                description:
+                    - List of backend roles to assign the user to.
+                type: list
+                required: false
+            attributes:
+                description:
+                    - Dictonary of attributes to set for the user.
+                type: dict
+                required: false
+            state:
+                description:
+                    - The desired state of the user.
+                type: str
+                required: false
+                choices: [ present, absent ]
+                default: present
+    purge:
+        description:
+            - Remove all users not listed in I(users).
+            - Reserved, hidden and static users are never removed.
+        type: bool
+        default: false
+    password_hash_rounds:
+        description:
+            - BCrypt cost factor used to hash the I(password) of the users on the controller.
+            - The passwords of all users are hashed in parallel.
+        type: int
+        default: 12
+
+extends_documentation_fragment:
+    - jiuka.opendistro.baseapi
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = '''
+- name: Ensure foo and bar exist and baz does not
+  jiuka.opendistro.users:
+    users:
+      - name: foo
+        password_hash: '$2a$12$AMTOYfh3q3DvdXQQNeiROeOhneR2YQ3wiI0VgXtcJyrCmZ96G7yRq'
+        roles: [ foo ]
+      - name: bar
+        password_hash: '$2a$12$AMTOYfh3q3DvdXQQNeiROeOhneR2YQ3wiI0VgXtcJyrCmZ96G7yRq'
+        attributes:
+          team: bar
+      - name: baz
+        state: absent
+'''
+
+RETURN = '''
+created:
+    description: Names of the created users.
+    returned: success
+    type: list
+    elements: str
+updated:
+    description: Names of the updated users.
+    returned: success
+    type: list
+    elements: str
+removed:
+    description: Names of the removed users.
+    returned: success
+    type: list
+    elements: str
+patch:
+    description: The JSON-Patch sent to the cluster, with passwords and hashes redacted.
+    returned: changed
+    type: list
+    elements: dict
+'''
+
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule, apply_patch, json_pointer
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi, SECRET_KEYS, fields_patch, redact
+
+
+def redact_patch(patch):
+    for line in patch:
+        if line['path'].rsplit('/', 1)[-1] in SECRET_KEYS:
+            yield dict(line, value='********')
+        elif isinstance(line.get('value', None), dict):
+            yield dict(line, value=redact(line['value']))
+        else:
+            yield line
+
+
+def main():
+    # define available arguments/parameters a user can pass to the module
+    user_args = dict(
+        name=dict(type='str', required=True),
+        password=dict(type='str', required=False, no_log=True),
+        password_hash=dict(type='str', required=False, aliases=['hash'], no_log=True),
+        update_password=dict(type='bool',
+                             required=False,
+                             default=False, no_log=False),
+        description=dict(type='str', required=False),
+        roles=dict(type='list', required=False),
+        attributes=dict(type='dict', required=False),
+        state=dict(type='str',
+                   default='present',
+                   choices=['present', 'absent']),
+    )
+    module_args = dict(
+        users=dict(type='list', elements='dict', required=True, options=user_args),
+        purge=dict(type='bool', required=False, default=False),
+        password_hash_rounds=dict(type='int', required=False, default=12),
+    )
+
+    # seed the result dict in the object
+    result = dict(
+        changed=False,
+        created=[],
+        updated=[],
+        removed=[],
+    )
+
+    # Setup AnsibleModule
+    module = OpenDistroModule(
+        argument_spec=module_args,
+        supports_check_mode=True,
+    )
+
+    # Parameters
+    users = module.params['users']
+    purge = module.params['purge']
+
+    # Setup API
+    api = SecurityApi(module, 'jiuka.opendistro.users')
+    result['server'] = api.server
+
+    # Get current state
+    code, data = api.get('internalusers')
+    if code != 200:
+        module.fail_json(msg='Error fetching user infos',
+                         http_code=code,
+                         http_body=data,
+                         **result)
+    current_users = data
+
+    patch = []
+    before = {}
+    after = {}
+
+    for user in users:
+        name = user['name']
+        current_config = current_users.get(name, None)
+
+        # Create
+        if user['state'] == 'present' and current_config is None:
+            payload = dict()
+            if user['password']:
+                payload['password'] = user['password']
+            elif user['password_hash']:
+                payload['hash'] = user['password_hash']
+            else:
+                module.fail_json(msg='password or password_hash is mandatory to create user {0}.'.format(name))
+
+            if user['description']:
+                payload['description'] = user['description']
+            if user['roles']:
+                payload['backend_roles'] = user['roles']
+            if user['attributes']:
+                payload['attributes'] = user['attributes']
+
+            patch.append(dict(op='add', path=json_pointer(name), value=payload))
+            result['created'].append(name)
+            after[name] = redact(payload)
+
+        # Update
+        if user['state'] == 'present' and current_config is not None:
+            fields = dict(description=user['description'], backend_roles=user['roles'], attributes=user['attributes'])
+            if user['update_password']:
+                if user['password']:
+                    fields['password'] = user['password']
+                elif user['password_hash']:
+                    fields['hash'] = user['password_hash']
+
+            user_patch = fields_patch(current_config, dict((k, v) for k, v in fields.items() if v is not None))
+
+            if user_patch:
+                for line in user_patch:
+                    patch.append(dict(line, path=json_pointer(name) + line['path']))
+                result['updated'].append(name)
+                before[name] = redact(current_config)
+                after[name] = redact(apply_patch(current_config, user_patch))
+
+        # Delete
+        if user['state'] == 'absent' and current_config is not None:
+            patch.append(dict(op='remove', path=json_pointer(name)))
+            result['removed'].append(name)
+            before[name] = redact(current_config)
+
+    # Purge
+    if purge:
+        wanted = set(user['name'] for user in users)
+        for name, current_config in sorted(current_users.items()):
+            if name in wanted:
+                continue
+            if any(current_config.get(flag, False) for flag in ('reserved', 'hidden', 'static')):
+                continue
+            patch.append(dict(op='remove', path=json_pointer(name)))
+            result['removed'].append(name)
+            before[name] = redact(current_config)
+
+    if patch:
+        result['changed'] = True
+        result['patch'] = list(redact_patch(patch))
+
+        if not module.check_mode:
+            code, data = api.patch('internalusers', data=patch)
+
+            if code != 200:
+                module.fail_json(msg='Error updating users',
+                                 http_code=code,
+                                 http_body=data,
+                                 **result)
+
+    if module._diff and result['changed']:
+        result['diff'] = dict(
+            before=before,
+            after=after,
+        )
+
+    # in the event of a successful module execution, you will want to
+    # simple AnsibleModule.exit_json(), passing the key/value results
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
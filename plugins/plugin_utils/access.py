@@ -0,0 +1,74 @@
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+import os
+
+from ansible.errors import AnsibleFilterError
+from ansible.module_utils.common._collections_compat import Mapping
+from ansible.module_utils.six import string_types
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import fingerprint
+from ansible_collections.jiuka.opendistro.plugins.module_utils.permissions import AccessChecker
+from ansible_collections.jiuka.opendistro.plugins.module_utils.snapshot import SnapshotReader, SnapshotError
+
+
+# Collections needed to check access, in the order AccessChecker takes them
+COLLECTIONS = ('internalusers', 'rolesmapping', 'roles', 'actiongroups')
+
+# Number of configurations to keep compiled checkers for
+CACHE_SIZE = 8
+
+_checkers = {}
+
+
+def access_checker(config):
+    """Return the AccessChecker of a security configuration, cached per version of it.
+
+    The configuration is either a dict of the collections, like the result
+    of the security lookup for ``config``, or the path of a snapshot written
+    by the security_snapshot module. A snapshot is only checked for its
+    mtime and a dict with a ``version`` only for it. Ansible hands a new
+    object to every filter and test call, so a dict without a ``version``
+    is fingerprinted on every call.
+    """
+    if isinstance(config, string_types):
+        try:
+            key = ('snapshot', config, os.path.getmtime(config))
+        except OSError as e:
+            raise AnsibleFilterError('Could not read snapshot {0}: {1}'.format(config, e))
+        if key not in _checkers:
+            try:
+                reader = SnapshotReader(config)
+                collections = [reader.load(collection) if collection in reader.collections else {} for collection in COLLECTIONS]
+            except SnapshotError as e:
+                raise AnsibleFilterError(str(e))
+    elif isinstance(config, Mapping):
+        version = config.get('version', None)
+        key = ('version', version) if version is not None else None
+        if key not in _checkers:
+            collections = [config.get(collection, None) or {} for collection in COLLECTIONS]
+            if key is None:
+                key = fingerprint(collections)
+    else:
+        raise AnsibleFilterError('The security configuration has to be a dict of collections or the path of a snapshot')
+
+    if key not in _checkers:
+        if len(_checkers) >= CACHE_SIZE:
+            _checkers.clear()
+        try:
+            _checkers[key] = AccessChecker(*collections)
+        except ValueError as e:
+            raise AnsibleFilterError(str(e))
+    return _checkers[key]
+
+
+def check_access(checker, user, action, index=None):
+    """Check an access with an AccessChecker, raising an AnsibleFilterError for invalid patterns."""
+    try:
+        return checker.allowed(user, action, index)
+    except ValueError as e:
+        raise AnsibleFilterError(str(e))
@@ -0,0 +1,127 @@
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+import io
+import json
+import os
+import sys
+import traceback
+
+from ansible.errors import AnsibleError
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.common.json import AnsibleJSONEncoder
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.plugins.action import ActionBase
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import BaseApi, opendistro_argument_spec
+from ansible_collections.jiuka.opendistro.plugins.plugin_utils.password import PasswordHasher, hash_passwords
+
+
+class OpenDistroActionModule(ActionBase):
+    """Run a module of this collection, in-process on the controller with I(run_on_controller).
+
+    The modules only talk HTTP to the cluster, running them in the worker
+    saves transferring and starting the module. The connection pools and
+    server informations are shared by all runs of the worker, like all
+    items of a loop.
+    """
+
+    MODULE = None
+
+    def run(self, tmp=None, task_vars=None):
+
+        result = super(OpenDistroActionModule, self).run(tmp, task_vars)
+
+        result.update(self._run_module(self.MODULE, self._task.args.copy(), task_vars))
+
+        return result
+
+    def _run_module(self, module_name, module_args, task_vars):
+        module_name = 'jiuka.opendistro.{0}'.format(module_name)
+
+        if not self._run_on_controller():
+            return self._execute_module(module_name=module_name,
+                                        module_args=module_args,
+                                        task_vars=task_vars)
+
+        module_args = dict(module_args)
+        self._update_module_args(module_name, module_args, task_vars)
+        return run_module(module_name, module_args)
+
+    def _hash_passwords(self, users):
+        """Replace the plaintext passwords of users by hashes, where they are used."""
+        plaintext = [user for user in users if user.get('password', None)]
+        if not plaintext:
+            return
+
+        # Passwords of existing users are only used with update_password
+        existing = self._existing_users([user['name'] for user in plaintext
+                                         if (user.get('state', None) or 'present') == 'present' and
+                                         not boolean(user.get('update_password', False), strict=False)])
+
+        hash_passwords(PasswordHasher(rounds=self._task.args.get('password_hash_rounds', None)), users, existing)
+
+    def _existing_users(self, names):
+        """Return the names of the given users which exist on the cluster.
+
+        The users are looked up from the controller, without running a
+        module. If the cluster can not be reached from the controller, like
+        on a httpapi connection, all users are taken as new.
+        """
+        if not names:
+            return set()
+
+        from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi
+        from ansible_collections.jiuka.opendistro.plugins.plugin_utils.api import ControllerModule
+
+        try:
+            module = ControllerModule(dict((k, v) for k, v in self._task.args.items() if k in opendistro_argument_spec()))
+            api = SecurityApi(module, 'jiuka.opendistro.user')
+            if len(names) == 1:
+                code, data = api.get('internalusers', names[0])
+                return set(names) if code == 200 else set()
+            return set(name for name, dummy in api.iter_collection('internalusers')) & set(names)
+        except AnsibleError:
+            return set()
+
+    def _run_on_controller(self):
+        if self._task.async_val:
+            return False
+        value = self._task.args.get('run_on_controller', None)
+        if value is None:
+            value = os.environ.get('ELASTICSEARCH_RUN_ON_CONTROLLER', False)
+        return boolean(value, strict=False)
+
+
+def run_module(module_name, module_args):
+    """Run a module of this collection in the current process and return its result."""
+    from ansible.module_utils import basic
+
+    if BaseApi.shared_clients is None:
+        BaseApi.shared_clients = {}
+
+    basic._ANSIBLE_ARGS = to_bytes(json.dumps({'ANSIBLE_MODULE_ARGS': module_args}, cls=AnsibleJSONEncoder))
+    if hasattr(basic, '_ANSIBLE_PROFILE'):
+        basic._ANSIBLE_PROFILE = 'legacy'
+
+    stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        module = __import__('ansible_collections.jiuka.opendistro.plugins.modules.{0}'.format(module_name.rsplit('.', 1)[-1]),
+                            fromlist=['main'])
+        module.main()
+    except SystemExit:
+        pass
+    except Exception as e:
+        return dict(failed=True, msg='MODULE FAILURE: {0}'.format(to_text(e)), exception=traceback.format_exc())
+    finally:
+        output, sys.stdout = sys.stdout.getvalue(), stdout
+
+    try:
+        return json.loads(output)
+    except ValueError:
+        return dict(failed=True, msg='MODULE FAILURE', module_stdout=output)
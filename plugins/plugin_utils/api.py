@@ -0,0 +1,58 @@
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+import os
+
+from ansible.errors import AnsibleError
+from ansible.module_utils.common.validation import check_type_bool, check_type_float, check_type_int, check_type_path, check_type_str
+from ansible.release import __version__ as ansible_version
+
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import opendistro_argument_spec
+
+
+TYPE_CHECKERS = dict(
+    bool=check_type_bool,
+    float=check_type_float,
+    int=check_type_int,
+    path=check_type_path,
+    str=check_type_str,
+)
+
+
+class ControllerModule(object):
+    """Stand-in for OpenDistroModule to use the APIs from the controller.
+
+    The connection parameters get the same defaults and environment
+    fallbacks as in a module, fail_json raises an AnsibleError.
+    """
+
+    def __init__(self, params, check_mode=False, diff=False):
+        self.params = dict(params)
+        self.check_mode = check_mode
+        self._diff = diff
+        self.ansible_version = ansible_version
+
+        for name, spec in opendistro_argument_spec().items():
+            value = self.params.get(name, None)
+            if value is None and 'fallback' in spec:
+                for env in spec['fallback'][1]:
+                    if env in os.environ:
+                        value = os.environ[env]
+                        break
+            if value is None:
+                value = spec.get('default', None)
+            if value is not None:
+                value = TYPE_CHECKERS[spec['type']](value)
+            self.params[name] = value
+
+        if not self.params['elasticsearch_url'] and not (check_mode and self.params['snapshot']):
+            self.fail_json(msg="missing required arguments: elasticsearch_url")
+
+    def fail_json(self, msg, **kwargs):
+        if 'http_code' in kwargs:
+            msg = '{0} (HTTP {1}: {2})'.format(msg, kwargs['http_code'], kwargs.get('http_body', ''))
+        raise AnsibleError(msg)
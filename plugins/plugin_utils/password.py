@@ -0,0 +1,94 @@
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+import hashlib
+import hmac
+import json
+import os
+
+from ansible.errors import AnsibleActionFail
+from ansible.module_utils._text import to_text, to_bytes
+from ansible.module_utils.parsing.convert_bool import boolean
+
+
+DEFAULT_ROUNDS = 12
+
+
+def _bcrypt():
+    # Imported on demand, most tasks never hash a password
+    try:
+        import bcrypt
+    except ImportError:
+        raise AnsibleActionFail("Python module bcrypt is required for the password parameter.")
+    return bcrypt
+
+
+def _hashpw(password, rounds):
+    bcrypt = _bcrypt()
+    salt = bcrypt.gensalt(rounds=rounds, prefix=b'2a')
+    return to_text(bcrypt.hashpw(to_bytes(password), salt))
+
+
+class PasswordHasher(object):
+    """Hash passwords with bcrypt on the controller.
+
+    Hashes are memoized per user, password and cost factor for the lifetime
+    of the process and ``hash_many`` spreads the work over a process pool.
+    Users sharing a password still get hashes with different salts, the
+    memo is keyed with a random per-process secret.
+    """
+
+    _memo = {}
+    _secret = os.urandom(32)
+
+    def __init__(self, rounds=None, workers=None):
+        _bcrypt()
+
+        self.rounds = int(rounds or DEFAULT_ROUNDS)
+        self.workers = workers
+
+    def hash(self, name, password):
+        return self.hash_many([(name, password)])[0]
+
+    def hash_many(self, credentials):
+        """Return the hashes of a list of ``(name, password)`` pairs."""
+        keys = [self._key(name, password) for name, password in credentials]
+
+        missing = dict((key, password) for key, (name, password) in zip(keys, credentials) if key not in self._memo)
+        if len(missing) > 1 and self.workers != 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                hashes = executor.map(_hashpw, missing.values(), [self.rounds] * len(missing))
+                self._memo.update(zip(missing.keys(), hashes))
+        else:
+            for key, password in missing.items():
+                self._memo[key] = _hashpw(password, self.rounds)
+
+        return [self._memo[key] for key in keys]
+
+    def _key(self, name, password):
+        return hmac.new(self._secret, to_bytes(json.dumps([name, self.rounds, to_text(password)])), hashlib.sha256).hexdigest()
+
+
+def hash_passwords(hasher, users, existing=()):
+    """Replace the plaintext passwords of users by hashes.
+
+    The cluster never returns the stored hashes, a password is only used to
+    create a user or with ``update_password``. Only those passwords are
+    hashed, the others are dropped. ``existing`` are the names of the users
+    already on the cluster.
+    """
+    used = [user for user in users
+            if user.get('password', None) and (user.get('state', None) or 'present') == 'present' and
+            (boolean(user.get('update_password', False), strict=False) or user['name'] not in existing)]
+
+    for user, pwhash in zip(used, hasher.hash_many([(user['name'], user['password']) for user in used])):
+        user['password_hash'] = pwhash
+    for user in users:
+        if user.get('password', None):
+            user['password'] = None
@@ -0,0 +1,70 @@
+# Copyright: (c) 2020, Marius Rieder <marius.rieder@scs.ch>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+DOCUMENTATION = '''
+name: allowed
+short_description: Test if a user may run an action according to an OpenDistro Security configuration
+version_added: "1.0.0"
+description:
+    - Decide locally if the user may run the action, on the index if given or else on the cluster.
+    - The compiled permissions are cached per version of the configuration.
+    - A snapshot path is versioned by its modification time and a configuration dict by its C(version),
+      like the result of the C(jiuka.opendistro.security) lookup for C(config). Other dicts are fingerprinted by every test,
+      to check many accesses against them use the C(jiuka.opendistro.access_check) filter.
+    - Role mappings by host are ignored.
+options:
+    _input:
+        description:
+            - Name of the user.
+        type: str
+        required: true
+    config:
+        description:
+            - The security configuration, a dict with the C(internalusers), C(rolesmapping), C(roles) and C(actiongroups) collections
+              or the path of a snapshot written by M(jiuka.opendistro.security_snapshot).
+        type: raw
+        required: true
+    action:
+        description:
+            - The action to check, like C(indices:data/read/search).
+        type: str
+        required: true
+    index:
+        description:
+            - The index to check the action on. Without an index the action is checked on the cluster.
+        type: str
+        required: false
+author:
+    - Marius Rieder (@jiuka)
+'''
+
+EXAMPLES = '''
+- name: Interns must not delete indices
+  assert:
+    that: "'intern' is not jiuka.opendistro.allowed(security, 'indices:admin/delete', 'logs-2020.01')"
+'''
+
+RETURN = '''
+_value:
+    description: Whether the user may run the action.
+    type: bool
+'''
+
+
+from ansible_collections.jiuka.opendistro.plugins.plugin_utils.access import access_checker, check_access
+
+
+def allowed(user, config, action, index=None):
+    return check_access(access_checker(config), user, action, index)
+
+
+class TestModule(object):
+
+    def tests(self):
+        return {
+            'allowed': allowed,
+        }
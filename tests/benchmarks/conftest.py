@@ -0,0 +1,100 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import pytest
+
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+
+from .mockserver import MockSecurityServer, populate
+
+
+SCALES = [int(scale) for scale in os.environ.get('OPENDISTRO_BENCH_SCALES', '10').split(',')]
+LATENCY = float(os.environ.get('OPENDISTRO_BENCH_LATENCY', '0')) / 1000
+
+RESULTS = []
+
+
+def pytest_generate_tests(metafunc):
+    if 'scale' in metafunc.fixturenames:
+        metafunc.parametrize('scale', SCALES)
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not RESULTS:
+        return
+    terminalreporter.section('opendistro benchmarks')
+    terminalreporter.write_line('{0:<32} {1:>7} {2:>9} {3:>10} {4:>10} {5:>11}'.format(
+        'benchmark', 'scale', 'requests', 'req/entity', 'wall [s]', 'peak [KiB]'))
+    for result in RESULTS:
+        terminalreporter.write_line('{name:<32} {scale:>7} {requests:>9} {per_entity:>10.2f} {wall:>10.3f} {peak:>11.1f}'.format(**result))
+
+
+class Bench(object):
+    def __init__(self, server, tmpdir):
+        self.server = server
+        self.params = dict(
+            elasticsearch_url=server.url,
+            elasticsearch_user='admin',
+            elasticsearch_password='admin',
+            elasticsearch_cacert=server.cacert,
+            cache_dir=str(tmpdir),
+            retry_backoff=0.01,
+        )
+
+    @contextlib.contextmanager
+    def measure(self, name, scale):
+        self.server.reset()
+        tracemalloc.start()
+        started = time.time()
+        try:
+            yield
+        finally:
+            wall = time.time() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        requests = len(self.server.requests())
+        RESULTS.append(dict(name=name, scale=scale, requests=requests, per_entity=float(requests) / scale,
+                            wall=wall, peak=peak / 1024.0))
+
+    def run_module(self, module_name, **kwargs):
+        args = dict(self.params, **kwargs)
+        basic._ANSIBLE_ARGS = to_bytes(json.dumps({'ANSIBLE_MODULE_ARGS': args}))
+        if hasattr(basic, '_ANSIBLE_PROFILE'):
+            basic._ANSIBLE_PROFILE = 'legacy'
+        module = __import__('plugins.modules.{0}'.format(module_name), fromlist=['main'])
+
+        stdout = sys.stdout
+        sys.stdout = io.StringIO()
+        try:
+            module.main()
+        except SystemExit:
+            pass
+        finally:
+            output, sys.stdout = sys.stdout.getvalue(), stdout
+        return json.loads(output)
+
+
+@pytest.fixture
+def bench_server(request):
+    marker = request.node.get_closest_marker('server')
+    options = dict(marker.kwargs) if marker else dict()
+    options.setdefault('latency', LATENCY)
+    scale = request.getfixturevalue('scale') if 'scale' in request.fixturenames else 0
+    data = populate(users=scale if options.pop('users', False) else 0, roles=scale if options.pop('roles', False) else 0)
+    with MockSecurityServer(data=data, **options) as server:
+        yield server
+
+
+@pytest.fixture
+def bench(bench_server, tmpdir):
+    return Bench(bench_server, tmpdir)
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'server(**options): options for the mock security API server')
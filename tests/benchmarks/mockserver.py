@@ -0,0 +1,266 @@
+"""Stand-in for the Open Distro security API to benchmark against.
+
+The server runs in its own process so it does not show up in the memory
+and time measurements of the client. Besides the emulated endpoints it
+answers ``GET /_mock/stats`` with the requests it received and
+``DELETE /_mock/stats`` resets them. Latency and errors can be injected to
+see how the client copes with a slow or overloaded cluster.
+"""
+import datetime
+import json
+import multiprocessing
+import os
+import ssl
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from ansible.module_utils.six.moves import http_client
+
+
+PLUGINS = {
+    'nodes': {
+        'bench-node': {
+            'name': 'bench',
+            'version': '7.6.1',
+            'plugins': [{'name': 'opendistro_security', 'version': '1.7.0.0'}],
+        },
+    },
+}
+
+COLLECTIONS = ['internalusers', 'roles', 'rolesmapping', 'actiongroups', 'tenants']
+
+
+def populate(users=0, roles=0):
+    data = dict((collection, {}) for collection in COLLECTIONS)
+    for i in range(users):
+        data['internalusers']['user{0}'.format(i)] = {
+            'hash': '',
+            'reserved': False,
+            'hidden': False,
+            'backend_roles': ['role{0}'.format(i % 10)],
+            'attributes': {'team': 'team{0}'.format(i % 7)},
+            'description': 'Benchmark user {0}'.format(i),
+            'static': False,
+        }
+    for i in range(roles):
+        data['roles']['role{0}'.format(i)] = {
+            'reserved': False,
+            'hidden': False,
+            'cluster_permissions': ['cluster_composite_ops_ro'],
+            'index_permissions': [{
+                'index_patterns': ['logs-{0}-*'.format(i)],
+                'fls': [],
+                'masked_fields': [],
+                'allowed_actions': ['read', 'search'],
+            }],
+            'tenant_permissions': [],
+            'static': False,
+        }
+    return data
+
+
+def _pointer(path):
+    return [part.replace('~1', '/').replace('~0', '~') for part in path.split('/')[1:]]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    wbufsize = 65536
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, body):
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def _dispatch(self):
+        server = self.server
+        body = self._body()
+
+        if self.path == '/_mock/stats':
+            if self.command == 'DELETE':
+                with server.lock:
+                    del server.requests[:]
+            with server.lock:
+                return self._send(200, dict(requests=list(server.requests)))
+
+        with server.lock:
+            server.requests.append([self.command, self.path])
+            # Each request fails at most once so retries always get through
+            inject = server.error_every and len(server.requests) % server.error_every == 0 and \
+                self.path not in server.failed
+            if inject:
+                server.failed.add(self.path)
+
+        if server.latency:
+            time.sleep(server.latency)
+        if inject:
+            return self._send(server.error_status, {'status': 'ERROR', 'message': 'Injected error'})
+
+        if self.path == '/_nodes/_local/plugins':
+            return self._send(200, PLUGINS)
+
+        parts = [unquote(part) for part in self.path.split('?')[0].split('/')[1:]]
+        if parts[:3] != ['_opendistro', '_security', 'api'] or len(parts) not in (4, 5) or parts[3] not in server.data:
+            return self._send(400, {'status': 'BAD_REQUEST'})
+        collection = server.data[parts[3]]
+        name = parts[4] if len(parts) == 5 else None
+
+        with server.lock:
+            if self.command == 'GET':
+                if name is None:
+                    return self._send(200, collection)
+                if name in collection:
+                    return self._send(200, {name: collection[name]})
+                return self._send(404, {'status': 'NOT_FOUND', 'message': "'{0}' not found.".format(name)})
+
+            if self.command == 'PUT' and name is not None:
+                created = name not in collection
+                collection[name] = body
+                return self._send(201 if created else 200, {'status': 'CREATED' if created else 'OK'})
+
+            if self.command == 'DELETE' and name is not None:
+                if collection.pop(name, None) is None:
+                    return self._send(404, {'status': 'NOT_FOUND'})
+                return self._send(200, {'status': 'OK'})
+
+            if self.command == 'PATCH':
+                if name is not None and name not in collection:
+                    return self._send(404, {'status': 'NOT_FOUND'})
+                root = collection if name is None else collection[name]
+                for operation in body:
+                    parts = _pointer(operation['path'])
+                    target = root
+                    for part in parts[:-1]:
+                        target = target[int(part)] if isinstance(target, list) else target[part]
+                    if isinstance(target, list):
+                        if operation['op'] == 'remove':
+                            del target[int(parts[-1])]
+                        elif operation['op'] == 'add':
+                            target.insert(len(target) if parts[-1] == '-' else int(parts[-1]), operation['value'])
+                        else:
+                            target[int(parts[-1])] = operation['value']
+                    elif operation['op'] == 'remove':
+                        target.pop(parts[-1], None)
+                    else:
+                        target[parts[-1]] = operation['value']
+                return self._send(200, {'status': 'OK'})
+
+        return self._send(405, {'status': 'METHOD_NOT_ALLOWED'})
+
+    do_GET = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+
+def _serve(port_queue, data, latency, error_every, error_status, certfile, keyfile):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.daemon_threads = True
+    server.data = data
+    server.latency = latency
+    server.error_every = error_every
+    server.error_status = error_status
+    server.requests = []
+    server.failed = set()
+    server.lock = threading.Lock()
+    if certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def _self_signed_cert(directory):
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, u'localhost')])
+    now = datetime.datetime.utcnow()
+    cert = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key()) \
+        .serial_number(x509.random_serial_number()) \
+        .not_valid_before(now - datetime.timedelta(minutes=5)).not_valid_after(now + datetime.timedelta(days=1)) \
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName(u'localhost')]), critical=False) \
+        .sign(key, hashes.SHA256())
+
+    certfile = os.path.join(directory, 'cert.pem')
+    keyfile = os.path.join(directory, 'key.pem')
+    with open(certfile, 'wb') as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(keyfile, 'wb') as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return certfile, keyfile
+
+
+class MockSecurityServer(object):
+    def __init__(self, data=None, latency=0, error_every=0, error_status=503, tls=False):
+        self.data = data if data is not None else populate()
+        self.latency = latency
+        self.error_every = error_every
+        self.error_status = error_status
+        self.tls = tls
+        self.cacert = None
+        self.url = None
+        self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        certfile = keyfile = None
+        if self.tls:
+            self._tmpdir = tempfile.mkdtemp()
+            certfile, keyfile = _self_signed_cert(self._tmpdir)
+            self.cacert = certfile
+
+        context = multiprocessing.get_context('fork')
+        port_queue = context.Queue()
+        self._process = context.Process(target=_serve, args=(port_queue, self.data, self.latency, self.error_every,
+                                                             self.error_status, certfile, keyfile))
+        self._process.daemon = True
+        self._process.start()
+        port = port_queue.get(timeout=10)
+
+        self.url = '{0}://localhost:{1}'.format('https' if self.tls else 'http', port)
+        return self
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def requests(self):
+        return self._stats('GET')
+
+    def reset(self):
+        self._stats('DELETE')
+
+    def _stats(self, method):
+        if self.tls:
+            conn = http_client.HTTPSConnection('localhost', int(self.url.rsplit(':', 1)[1]),
+                                               context=ssl.create_default_context(cafile=self.cacert))
+        else:
+            conn = http_client.HTTPConnection('localhost', int(self.url.rsplit(':', 1)[1]))
+        conn.request(method, '/_mock/stats')
+        requests = json.loads(conn.getresponse().read())['requests']
+        conn.close()
+        return requests
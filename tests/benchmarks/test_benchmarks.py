@@ -0,0 +1,136 @@
+import pytest
+
+from plugins.module_utils.security import SecurityApi
+
+HASH = '$2y$12$zBnFO2LpnZ0JVbFSHIT2dOG5WfnOQdJMQpRbMnhpqm2cJRKYU/Q0.'
+
+
+class ApiModule(object):
+    def __init__(self, params):
+        self.params = dict(params, elasticsearch_key=None, elasticsearch_cert=None, validate_certs=True,
+                           connection_pool_size=4, connection_idle_timeout=60, server_info_cache_ttl=300,
+                           max_concurrent_requests=8, retries=3, retry_max_time=60, retry_patch=False)
+        self.ansible_version = 'bench'
+
+    def fail_json(self, msg, **kwargs):
+        raise AssertionError(msg)
+
+
+def api(bench):
+    return SecurityApi(ApiModule(bench.params), 'bench')
+
+
+def test_user_create(bench, scale):
+    with bench.measure('user create', scale):
+        for i in range(scale):
+            result = bench.run_module('user', name='user{0}'.format(i), password_hash=HASH)
+            assert result['changed']
+
+
+@pytest.mark.server(users=True)
+def test_user_unchanged(bench, scale):
+    with bench.measure('user unchanged', scale):
+        for i in range(scale):
+            result = bench.run_module('user', name='user{0}'.format(i), roles=['role{0}'.format(i % 10)])
+            assert not result['changed']
+
+
+def test_users_bulk_create(bench, scale):
+    users = [dict(name='user{0}'.format(i), password_hash=HASH) for i in range(scale)]
+    with bench.measure('users bulk create', scale):
+        result = bench.run_module('users', users=users)
+    assert len(result['created']) == scale
+
+
+@pytest.mark.server(users=True)
+def test_user_info(bench, scale):
+    with bench.measure('user_info', scale):
+        for i in range(scale):
+            result = bench.run_module('user_info', name='user{0}'.format(i))
+            assert 'user{0}'.format(i) in result['user']
+
+
+@pytest.mark.server(users=True)
+def test_user_info_response_cache(bench, scale):
+    for i in range(scale):
+        bench.run_module('user_info', name='user{0}'.format(i), response_cache=True)
+    with bench.measure('user_info response cache', scale):
+        for i in range(scale):
+            result = bench.run_module('user_info', name='user{0}'.format(i), response_cache=True)
+            assert 'user{0}'.format(i) in result['user']
+
+
+@pytest.mark.server(users=True)
+def test_user_check_mode_snapshot(bench, scale, tmpdir):
+    snapshot = str(tmpdir.join('snapshot.zip'))
+    bench.run_module('security_snapshot', snapshot=snapshot)
+    bench.server.reset()
+    with bench.measure('user check mode snapshot', scale):
+        for i in range(scale):
+            result = bench.run_module('user', name='user{0}'.format(i), roles=['role{0}'.format(i % 10)],
+                                      snapshot=snapshot, _ansible_check_mode=True)
+            assert not result['changed']
+    assert bench.server.requests() == []
+
+
+@pytest.mark.server(users=True, roles=True)
+def test_effective_permissions(bench, scale):
+    with bench.measure('effective_permissions', scale):
+        result = bench.run_module('effective_permissions')
+    assert result['total'] == scale
+
+
+@pytest.mark.server(roles=True)
+def test_role_info(bench, scale):
+    with bench.measure('role_info', scale):
+        for i in range(scale):
+            result = bench.run_module('role_info', name='role{0}'.format(i))
+            assert result['role']['name'] == 'role{0}'.format(i)
+
+
+@pytest.mark.server(users=True)
+def test_baseapi_get_collection(bench, scale):
+    with bench.measure('baseapi get collection', scale):
+        code, data = api(bench).get('internalusers')
+    assert code == 200
+    assert len(data) == scale
+
+
+@pytest.mark.server(users=True)
+def test_baseapi_iter_collection(bench, scale):
+    with bench.measure('baseapi iter collection', scale):
+        count = sum(1 for name, obj in api(bench).iter_collection('internalusers'))
+    assert count == scale
+
+
+@pytest.mark.server(users=True)
+def test_baseapi_get_sequential(bench, scale):
+    with bench.measure('baseapi get sequential', scale):
+        client = api(bench)
+        for i in range(scale):
+            assert client.get('internalusers', 'user{0}'.format(i))[0] == 200
+
+
+@pytest.mark.server(users=True)
+def test_baseapi_batch(bench, scale):
+    operations = [('GET', 'internalusers', 'user{0}'.format(i), None) for i in range(scale)]
+    with bench.measure('baseapi batch', scale):
+        results = api(bench).batch(operations)
+    assert all(code == 200 for code, data in results)
+
+
+@pytest.mark.server(users=True, error_every=5)
+def test_baseapi_batch_with_errors(bench, scale):
+    operations = [('GET', 'internalusers', 'user{0}'.format(i), None) for i in range(scale)]
+    with bench.measure('baseapi batch 20% errors', scale):
+        results = api(bench).batch(operations)
+    assert all(code == 200 for code, data in results)
+
+
+@pytest.mark.server(users=True, tls=True)
+def test_baseapi_get_sequential_tls(bench, scale):
+    pytest.importorskip('cryptography')
+    with bench.measure('baseapi get sequential tls', scale):
+        client = api(bench)
+        for i in range(scale):
+            assert client.get('internalusers', 'user{0}'.format(i))[0] == 200
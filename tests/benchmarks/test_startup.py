@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from .conftest import RESULTS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+IMPORT = '''
+import json, sys, time
+import tests.conftest
+import ansible.module_utils.basic
+started = time.time()
+import plugins.modules.{0}
+print(json.dumps(dict(wall=time.time() - started, modules=sorted(sys.modules))))
+'''
+
+# Only loaded once a request is actually sent
+LAZY = ['ssl', 'http.client', 'concurrent.futures', 'email.utils', 'urllib.request', 'bcrypt']
+
+
+def import_module(name):
+    output = subprocess.check_output([sys.executable, '-c', IMPORT.format(name)], cwd=ROOT)
+    return json.loads(output)
+
+
+@pytest.mark.parametrize('name', ['user', 'user_info', 'role_info', 'users', 'security_config'])
+def test_import(name):
+    result = import_module(name)
+
+    RESULTS.append(dict(name='import {0}'.format(name), scale=1, requests=0, per_entity=0,
+                        wall=result['wall'], peak=0))
+    assert [module for module in LAZY if module in result['modules']] == []
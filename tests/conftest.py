@@ -0,0 +1,11 @@
+import sys
+#sys.path.append('/usr/share/ansible/collections')
+
+def _import(name, *args, **kwargs):
+    if name.startswith('ansible_collections.jiuka.opendistro.'):
+        name = name[37:]
+    return original_import(name, *args, **kwargs)
+
+import builtins
+original_import = builtins.__import__
+builtins.__import__ = _import
@@ -0,0 +1,57 @@
+import httpretty
+from httpretty import HTTPretty
+import pytest
+from ansible_collections.jiuka.opendistro.plugins.httpapi.opendistro import HttpApi
+
+
+class MockConnection:
+    def __init__(self, **options):
+        self.options = dict(host='es', port=9200, use_ssl=False, remote_user='admin', password='secret')
+        self.options.update(options)
+
+    def get_option(self, name):
+        return self.options[name]
+
+
+@pytest.fixture(autouse=True)
+def httpretty_setup():
+    httpretty.enable(False)
+    yield
+    httpretty.disable()
+    httpretty.reset()
+
+
+def test_send_request():
+    HTTPretty.register_uri(HTTPretty.PATCH, 'http://es:9200/_opendistro/_security/api/internalusers', body='{"status": "OK"}')
+    httpapi = HttpApi(MockConnection())
+
+    assert httpapi.send_request('[]', method='PATCH', path='/_opendistro/_security/api/internalusers',
+                                headers={'Content-Type': 'application/json'}) == (200, '{"status": "OK"}')
+    assert HTTPretty.last_request.body == b'[]'
+    assert HTTPretty.last_request.headers.get('Authorization') == 'Basic YWRtaW46c2VjcmV0'
+    assert HTTPretty.last_request.headers.get('Content-Type') == 'application/json'
+
+
+def test_send_request_error():
+    HTTPretty.register_uri(HTTPretty.GET, 'http://es:9200/_opendistro/_security/api/roles/foo', body='{}', status=404)
+    httpapi = HttpApi(MockConnection(port=None))
+
+    assert httpapi.send_request(None, path='/_opendistro/_security/api/roles/foo') == (404, '{}')
+
+
+def test_server_info():
+    HTTPretty.register_uri(HTTPretty.GET, 'http://es:9200/_nodes/_local/plugins',
+                           body='{"nodes": {"n1": {"name": "es", "version": "7.8.0", "plugins": []}}}')
+    httpapi = HttpApi(MockConnection())
+
+    assert httpapi.server_info()['version'] == '7.8.0'
+    assert httpapi.server_info()['version'] == '7.8.0'
+    assert len(HTTPretty.latest_requests) == 1
+
+
+def test_server_info_error():
+    HTTPretty.register_uri(HTTPretty.GET, 'http://es:9200/_nodes/_local/plugins', body='Unauthorized', status=401)
+    httpapi = HttpApi(MockConnection())
+
+    with pytest.raises(ValueError, match='HTTP 401'):
+        httpapi.server_info()
@@ -0,0 +1,68 @@
+import httpretty
+from httpretty import HTTPretty
+import pytest
+from ansible.errors import AnsibleError
+from ansible_collections.jiuka.opendistro.plugins.lookup.security import LookupModule
+
+
+ES = dict(elasticsearch_url='https://es:9200', server_info_cache_ttl=0)
+
+
+@pytest.fixture(autouse=True)
+def httpretty_setup(monkeypatch):
+    monkeypatch.setattr(LookupModule, '_snapshots', {})
+    httpretty.enable(False)
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_nodes/_local/plugins',
+                           body='{"nodes": {"n1": {"name": "es", "version": "7.8.0", "plugins": []}}}')
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_security/api/internalusers',
+                           body='{"foo": {"backend_roles": ["a"]}, "bar": {"backend_roles": []}}')
+    yield
+    httpretty.disable()
+    httpretty.reset()
+
+
+def collection_requests():
+    return [request for request in HTTPretty.latest_requests if request.path == '/_opendistro/_security/api/internalusers']
+
+
+def test_run():
+    lookup = LookupModule()
+
+    assert lookup.run(['internalusers', 'foo'], **ES) == [{'backend_roles': ['a']}]
+    assert lookup.run(['internalusers'], **ES) == [{'foo': {'backend_roles': ['a']}, 'bar': {'backend_roles': []}}]
+    assert len(collection_requests()) == 1
+
+
+def test_run_default():
+    assert LookupModule().run(['internalusers', 'bar', 'nope'], default='none', **ES) == [{'backend_roles': []}, 'none']
+
+
+def test_run_cache_timeout():
+    lookup = LookupModule()
+
+    lookup.run(['internalusers', 'foo'], **ES)
+    lookup.run(['internalusers', 'foo'], cache_timeout=0, **ES)
+
+    assert len(collection_requests()) == 2
+
+
+def test_run_config():
+    for collection in ('roles', 'rolesmapping', 'actiongroups', 'tenants'):
+        HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_security/api/{0}'.format(collection), body='{}')
+    lookup = LookupModule()
+
+    config = lookup.run(['config'], **ES)[0]
+    assert config['internalusers'] == {'foo': {'backend_roles': ['a']}, 'bar': {'backend_roles': []}}
+    assert config['roles'] == {}
+    assert lookup.run(['config'], **ES)[0]['version'] == config['version']
+    assert lookup.run(['config'], cache_timeout=0, **ES)[0]['version'] != config['version']
+
+
+@pytest.mark.parametrize('terms,kwargs,match', [
+    (['nope'], ES, 'first term'),
+    (['config', 'foo'], ES, 'does not take names'),
+    (['internalusers'], dict(ES, elasticsearch_pasword='admin'), 'Unsupported parameters for lookup security: elasticsearch_pasword'),
+])
+def test_run_errors(terms, kwargs, match):
+    with pytest.raises(AnsibleError, match=match):
+        LookupModule().run(terms, **kwargs)
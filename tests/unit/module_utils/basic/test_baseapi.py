@@ -1,3 +1,8 @@
+import hashlib
+import json
+import os
+import stat
+
 from httpretty import HTTPretty
 import pytest
 from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import BaseApi
@@ -14,7 +19,15 @@ def base_api(ansible_module):
 def test_init(base_api):
     assert base_api
 
+    assert HTTPretty.latest_requests == []
+    assert base_api._connection_pool is None
+
+
+def test_server_probe(base_api):
+    assert base_api.server == {}
+
     assert HTTPretty.last_request.method == 'GET'
+    assert HTTPretty.last_request.path == '/_nodes/_local/plugins'
     assert HTTPretty.last_request.headers.get('User-Agent') == 'ansible-VERS/jiuka.opendistro.foobar'
 
 
@@ -82,3 +95,199 @@ def test_delete(base_api):
     assert HTTPretty.last_request.method == 'DELETE'
     assert HTTPretty.last_request.headers.get('User-Agent') == 'ansible-VERS/jiuka.opendistro.foobar'
     assert HTTPretty.last_request.path == '/_opendistro/_None/api/FOO/BAR'
+
+
+def test_basic_auth(ansible_module):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_nodes/_local/plugins', body='{}')
+    ansible_module.params.update(elasticsearch_user='foo', elasticsearch_password='bar')
+
+    BaseApi(ansible_module, 'foobar').server
+
+    assert HTTPretty.last_request.headers.get('Authorization') == 'Basic Zm9vOmJhcg=='
+
+
+PLUGINS = '''{"nodes": {"abc": {"name": "es1", "version": "7.6.1",
+              "plugins": [{"name": "opendistro_security", "version": "1.7.0.0"}]}}}'''
+
+
+def test_server_info(ansible_module):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_nodes/_local/plugins', body=PLUGINS)
+
+    base_api = BaseApi(ansible_module, 'foobar')
+
+    assert base_api.server['node_id'] == 'abc'
+    assert base_api.server['version'] == '7.6.1'
+    assert base_api.server['security_version'] == '1.7.0.0'
+
+
+def test_server_info_cache(ansible_module, tmp_path):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_nodes/_local/plugins', body=PLUGINS)
+    ansible_module.params.update(cache_dir=str(tmp_path), server_info_cache_ttl=60)
+
+    BaseApi(ansible_module, 'foobar').server
+    requests = len(HTTPretty.latest_requests)
+    base_api = BaseApi(ansible_module, 'foobar')
+
+    assert base_api.server['node_id'] == 'abc'
+    assert len(HTTPretty.latest_requests) == requests
+
+
+def test_server_info_cache_per_credentials(ansible_module, tmp_path):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_nodes/_local/plugins', body=PLUGINS)
+    ansible_module.params.update(cache_dir=str(tmp_path), server_info_cache_ttl=60)
+
+    BaseApi(ansible_module, 'foobar').server
+    ansible_module.params.update(elasticsearch_user='foo', elasticsearch_password='bar')
+    BaseApi(ansible_module, 'foobar').server
+
+    assert len(list(tmp_path.glob('server-*.json'))) == 2
+
+
+def test_server_info_cache_secret(ansible_module, tmp_path):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_nodes/_local/plugins', body=PLUGINS)
+    ansible_module.params.update(cache_dir=str(tmp_path), server_info_cache_ttl=60, elasticsearch_user='foo', elasticsearch_password='bar')
+
+    BaseApi(ansible_module, 'foobar').server
+
+    identity = json.dumps([ansible_module.params.get(param, None) for param in (
+        'elasticsearch_url', 'elasticsearch_user', 'elasticsearch_password', 'elasticsearch_cert', 'elasticsearch_key')])
+    assert [path.name for path in tmp_path.glob('server-*.json')] != ['server-{0}.json'.format(hashlib.sha256(identity.encode()).hexdigest())]
+    assert stat.S_IMODE(os.stat(str(tmp_path / 'secret')).st_mode) == 0o600
+
+
+def test_batch(base_api):
+    for name in ['A', 'B', 'C']:
+        HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_None/api/FOO/{0}'.format(name),
+                               body='{{"name": "{0}"}}'.format(name))
+    HTTPretty.register_uri(HTTPretty.PUT, 'https://es:9200/_opendistro/_None/api/FOO/D', body='{}', status=201)
+
+    results = base_api.batch([
+        ('GET', 'FOO', 'A', None),
+        ('GET', 'FOO', 'B', None),
+        ('PUT', 'FOO', 'D', {'x': 1}),
+        ('GET', 'FOO', 'C', None),
+    ], concurrency=3)
+
+    assert results == [(200, {'name': 'A'}), (200, {'name': 'B'}), (201, {}), (200, {'name': 'C'})]
+
+
+def test_batch_error(base_api, monkeypatch):
+    request = base_api.connection_pool.request
+
+    def failing_request(method, url, **kwargs):
+        if url.endswith('/B'):
+            raise ConnectionRefusedError('refused')
+        return request(method, url, **kwargs)
+
+    monkeypatch.setattr(base_api.connection_pool, 'request', failing_request)
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_None/api/FOO/A', body='{}')
+
+    results = base_api.batch([('GET', 'FOO', 'A', None), ('GET', 'FOO', 'B', None)], concurrency=2)
+
+    assert results == [(200, {}), (None, 'refused')]
+
+
+def test_iter_collection(base_api):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_None/api/FOO',
+                           body='{"A": {"x": 1}, "B": {"x": [2]}}')
+
+    assert list(base_api.iter_collection('FOO')) == [('A', {'x': 1}), ('B', {'x': [2]})]
+
+
+def test_iter_collection_reuses_connection(base_api):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_None/api/FOO',
+                           body='{"A": {"x": 1}}\n', connection='keep-alive')
+
+    list(base_api.iter_collection('FOO'))
+    conn, reused = base_api._connection_pool._acquire(('https', 'es', 9200))
+
+    assert reused
+
+
+def test_iter_collection_error(base_api):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_None/api/FOO',
+                           body='{"status": "FORBIDDEN"}', status=403)
+    calls = []
+    base_api._module.fail_json = lambda msg, **kwargs: calls.append(dict(kwargs, msg=msg))
+
+    assert list(base_api.iter_collection('FOO')) == []
+    assert calls == [dict(msg='Error fetching FOO', http_code=403, http_body={'status': 'FORBIDDEN'})]
+
+
+@pytest.fixture
+def cached_api(ansible_module, tmp_path):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_nodes/_local/plugins', body='{}')
+    ansible_module.params.update(cache_dir=str(tmp_path), response_cache=True, response_cache_ttl=60)
+    return BaseApi(ansible_module, 'foobar')
+
+
+def test_response_cache_revalidate(cached_api):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_None/api/FOO/BAR', responses=[
+        HTTPretty.Response(body='{"BAR": {}}', adding_headers={'ETag': '"v1"'}),
+        HTTPretty.Response(body='', status=304),
+    ])
+
+    assert cached_api.get('FOO', 'BAR') == (200, {'BAR': {}})
+    assert cached_api.get('FOO', 'BAR') == (200, {'BAR': {}})
+    assert HTTPretty.last_request.headers.get('If-None-Match') == '"v1"'
+
+
+def test_response_cache_ttl(cached_api):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_None/api/FOO/BAR', body='{"BAR": {}}')
+
+    cached_api.get('FOO', 'BAR')
+    requests = len(HTTPretty.latest_requests)
+    assert cached_api.get('FOO', 'BAR') == (200, {'BAR': {}})
+    assert len(HTTPretty.latest_requests) == requests
+
+
+def test_response_cache_invalidate(cached_api):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_None/api/FOO/BAR', body='{"BAR": {}}')
+    HTTPretty.register_uri(HTTPretty.PATCH, 'https://es:9200/_opendistro/_None/api/FOO', body='{}')
+
+    cached_api.get('FOO', 'BAR')
+    cached_api.patch('FOO', data=[])
+    requests = len(HTTPretty.latest_requests)
+    cached_api.get('FOO', 'BAR')
+    assert len(HTTPretty.latest_requests) == requests + 1
+
+
+class MockConnection:
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self.requests = []
+
+    def server_info(self):
+        return {'version': '7.8.0'}
+
+    def send_request(self, data, method='GET', path='/', headers=None):
+        self.requests.append((method, path, data))
+        return 200, '{"BAR": {}}'
+
+
+@pytest.fixture
+def persistent_api(ansible_module, monkeypatch):
+    monkeypatch.setattr('ansible.module_utils.connection.Connection', MockConnection)
+    ansible_module.params.update(elasticsearch_url=None)
+    ansible_module._socket_path = '/tmp/socket'
+    return BaseApi(ansible_module, 'foobar')
+
+
+def test_persistent_connection(persistent_api):
+    assert persistent_api.server == {'version': '7.8.0'}
+    assert persistent_api.get('FOO', 'BAR') == (200, {'BAR': {}})
+    assert persistent_api.patch('FOO', data=[{'op': 'remove', 'path': '/BAR'}]) == (200, {'BAR': {}})
+    assert list(persistent_api.iter_collection('FOO')) == [('BAR', {})]
+
+    assert persistent_api.connection.socket_path == '/tmp/socket'
+    assert persistent_api.connection.requests == [
+        ('GET', '/_opendistro/_None/api/FOO/BAR', None),
+        ('PATCH', '/_opendistro/_None/api/FOO', '[{"op": "remove", "path": "/BAR"}]'),
+        ('GET', '/_opendistro/_None/api/FOO', None),
+    ]
+    assert HTTPretty.latest_requests == []
+
+
+def test_persistent_connection_with_url(ansible_module):
+    ansible_module._socket_path = '/tmp/socket'
+    assert BaseApi(ansible_module, 'foobar').connection is None
@@ -0,0 +1,32 @@
+import json
+import pytest
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import iter_json_object
+
+DATA = {
+    'admin': {'hash': '$2y$12$abc', 'reserved': True, 'backend_roles': ['admin'], 'attributes': {}},
+    u'jürg': {'description': u'Müller, "quoted" {braces}', 'level': 12345, 'ratio': -1.5e3},
+    'empty': {},
+    'flag': False,
+    'number': 1234567890,
+}
+
+
+def chunked(raw, size):
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 100000])
+def test_iter_json_object(size):
+    raw = json.dumps(DATA, indent=2, ensure_ascii=False).encode('utf-8')
+
+    assert list(iter_json_object(chunked(raw, size))) == list(DATA.items())
+
+
+def test_iter_json_object_empty():
+    assert list(iter_json_object([b' { ', b' } '])) == []
+
+
+@pytest.mark.parametrize('raw', [b'[]', b'{"a": 1', b'{"a" 1}', b'{"a": 1 "b": 2}', b'{1: 2}', b'{"a": nope}', b'{"a": 1,}', b'{"a": 1, }', b'{"a": 1, 2: 3}'])
+def test_iter_json_object_invalid(raw):
+    with pytest.raises(ValueError):
+        list(iter_json_object(chunked(raw, 2)))
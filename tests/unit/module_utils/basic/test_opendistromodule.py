@@ -2,12 +2,14 @@ import pytest
 from unittest.mock import patch
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import OpenDistroModule, ClusterModule, ClusterFailed
 
 
 @pytest.fixture(autouse=True)
 def mocker():
     AnsibleModule.params = dict(elasticsearch_url=True)
+    AnsibleModule.check_mode = False
+    AnsibleModule._socket_path = None
     yield
 
 
@@ -46,3 +48,49 @@ def test_no_url(mock_init_method, mock_fail_json_method):
     AnsibleModule.params = dict(elasticsearch_url=None)
     OpenDistroModule({})
     mock_fail_json_method.assert_called_with(msg='missing required arguments: elasticsearch_url')
+
+
+@pytest.mark.parametrize('supports_clusters', [True, False])
+def test_clusters_argument_spec(mock_init_method, supports_clusters):
+    OpenDistroModule({}, supports_clusters=supports_clusters)
+    assert ('clusters' in mock_init_method.call_args[0][0]) == supports_clusters
+
+
+def test_no_url_with_snapshot(mock_init_method, mock_fail_json_method):
+    AnsibleModule.params = dict(elasticsearch_url=None, snapshot='/tmp/snapshot.zip')
+    AnsibleModule.check_mode = True
+    OpenDistroModule({})
+    mock_fail_json_method.assert_not_called()
+
+
+def test_no_url_with_persistent_connection(mock_init_method, mock_fail_json_method):
+    AnsibleModule.params = dict(elasticsearch_url=None)
+    AnsibleModule._socket_path = '/tmp/socket'
+    OpenDistroModule({})
+    mock_fail_json_method.assert_not_called()
+
+
+def test_no_url_with_clusters(mock_init_method, mock_fail_json_method):
+    AnsibleModule.params = dict(elasticsearch_url=None, clusters=[dict(elasticsearch_url='https://es:9200')])
+    OpenDistroModule({}, supports_clusters=True)
+    mock_fail_json_method.assert_not_called()
+
+
+def test_cluster_module(ansible_module):
+    ansible_module.params.update(elasticsearch_user='foo', clusters=[])
+    ansible_module.check_mode = True
+    ansible_module._diff = False
+    ansible_module._name = 'foo'
+    ansible_module.metrics = None
+
+    module = ClusterModule(ansible_module, dict(elasticsearch_url='https://other:9200', elasticsearch_user=None))
+
+    assert module.params['elasticsearch_url'] == 'https://other:9200'
+    assert module.params['elasticsearch_user'] == 'foo'
+    assert module.params['clusters'] is None
+    assert module.check_mode
+
+    with pytest.raises(ClusterFailed) as e:
+        module.fail_json(msg='Boom', http_code=500)
+    assert e.value.msg == 'Boom'
+    assert e.value.result == dict(http_code=500)
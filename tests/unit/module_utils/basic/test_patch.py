@@ -0,0 +1,121 @@
+import pytest
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import canonicalize, compact, fingerprint, \
+    diff_patch, create_patch, apply_patch, json_pointer
+
+
+def test_canonicalize():
+    assert canonicalize({'a': ['b', 'a'], 'c': [{'x': ['2', '1']}, {'w': 1}]}) == \
+        {'a': ['a', 'b'], 'c': [{'w': 1}, {'x': ['1', '2']}]}
+
+
+def test_compact():
+    assert compact({'a': None, 'b': [], 'c': '', 'd': [{'e': [], 'f': ['g']}]}) == {'d': [{'f': ['g']}]}
+
+
+@pytest.mark.parametrize('a,b', [
+    (['a', 'b'], ['b', 'a']),
+    ({'a': 1, 'b': [1, 2]}, {'b': [2, 1], 'a': 1}),
+    ([{'a': ['1', '2']}, {'b': 1}], [{'b': 1}, {'a': ['2', '1']}]),
+])
+def test_fingerprint_equal(a, b):
+    assert fingerprint(a) == fingerprint(b)
+
+
+@pytest.mark.parametrize('a,b', [
+    (['a', 'b'], ['a']),
+    ({'a': 1}, {'a': '1'}),
+    ({'a': []}, {'a': {}}),
+    ([['a', 'b']], [['a'], ['b']]),
+])
+def test_fingerprint_differ(a, b):
+    assert fingerprint(a) != fingerprint(b)
+
+
+def test_diff_patch_nested():
+    old = {'team': 'a', 'site': 'x', 'tags': ['1', '2']}
+    new = {'team': 'b', 'tags': ['2', '1'], 'new/key': 'c'}
+
+    assert diff_patch(old, new, '/attributes') == [
+        dict(op='add', path='/attributes/new~1key', value='c'),
+        dict(op='replace', path='/attributes/team', value='b'),
+        dict(op='remove', path='/attributes/site'),
+    ]
+
+
+def test_create_patch_none():
+    assert create_patch({'foo': 'bar'}, 'foo', None) == []
+
+
+def test_create_patch_unchanged():
+    assert create_patch({'foo': ['a', 'b']}, 'foo', ['b', 'a']) == []
+
+
+def test_create_patch_does_not_mutate():
+    value = ['b', 'a']
+    create_patch({'foo': ['a']}, 'foo', value)
+
+    assert value == ['b', 'a']
+
+
+def test_create_patch_list_of_dicts():
+    current = {'foo': [{'a': ['1', '2']}, {'b': 1}]}
+
+    assert create_patch(current, 'foo', [{'b': 1}, {'a': ['2', '1']}]) == []
+    assert create_patch(current, 'foo', [{'b': 2}]) == [dict(op='replace', path='/foo', value=[{'b': 2}])]
+
+
+def test_create_patch_list_entries():
+    current = {'index_permissions': [{'index_patterns': ['a']}, {'index_patterns': ['b']}, {'index_patterns': ['c']}]}
+    desired = [{'index_patterns': ['c']}, {'index_patterns': ['d']}, {'index_patterns': ['a']}]
+
+    patch = create_patch(current, 'index_permissions', desired)
+
+    assert patch == [
+        dict(op='remove', path='/index_permissions/1'),
+        dict(op='add', path='/index_permissions/-', value={'index_patterns': ['d']}),
+    ]
+    assert fingerprint(apply_patch(current, patch)['index_permissions']) == fingerprint(desired)
+
+
+def test_create_patch_list_duplicates():
+    current = {'foo': ['a', 'a', 'b']}
+
+    patch = create_patch(current, 'foo', ['b', 'a', 'c'])
+
+    assert patch == [dict(op='remove', path='/foo/1'), dict(op='add', path='/foo/-', value='c')]
+    assert sorted(apply_patch(current, patch)['foo']) == ['a', 'b', 'c']
+
+
+def test_create_patch_add():
+    assert create_patch({}, 'foo', 'bar') == [dict(op='add', path='/foo', value='bar')]
+
+
+def test_create_patch_attributes():
+    current = {'attributes': {'team': 'a'}}
+
+    assert create_patch(current, 'attributes', {'team': 'b'}) == \
+        [dict(op='replace', path='/attributes/team', value='b')]
+
+
+def test_apply_patch():
+    data = {'a': 1, 'b': {'c': 2, 'd': 3}, 'e': ['x']}
+    patch = [
+        dict(op='replace', path='/a', value=2),
+        dict(op='add', path='/b/f', value=4),
+        dict(op='remove', path='/b/d'),
+        dict(op='add', path='/e/-', value='y'),
+    ]
+
+    assert apply_patch(data, patch) == {'a': 2, 'b': {'c': 2, 'f': 4}, 'e': ['x', 'y']}
+    assert data == {'a': 1, 'b': {'c': 2, 'd': 3}, 'e': ['x']}
+
+
+def test_apply_diff_patch():
+    old = {'a': {'b': ['1'], 'c': 'x'}, 'd': 1}
+    new = {'a': {'b': ['2'], 'e': 'y'}, 'd': 1}
+
+    assert apply_patch(old, diff_patch(old, new)) == new
+
+
+def test_json_pointer():
+    assert json_pointer('a/b', 'c~d') == '/a~1b/c~0d'
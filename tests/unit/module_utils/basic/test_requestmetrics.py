@@ -0,0 +1,44 @@
+from httpretty import HTTPretty
+import pytest
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import BaseApi, RequestMetrics
+
+
+@pytest.fixture
+def metrics(ansible_module):
+    ansible_module.metrics = RequestMetrics()
+    return ansible_module.metrics
+
+
+def test_record(ansible_module, metrics):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_nodes/_local/plugins', body='{}')
+    HTTPretty.register_uri(HTTPretty.PUT, 'https://es:9200/_opendistro/_None/api/FOO/BAR', body='{"status": "CREATED"}',
+                           status=201)
+
+    base_api = BaseApi(ansible_module, 'foobar')
+    base_api.server
+    base_api.put('FOO', 'BAR', {'foo': 'bar'})
+
+    assert len(metrics.requests) == 2
+    request = metrics.requests[1]
+    assert request['method'] == 'PUT'
+    assert request['url'] == 'https://es:9200/_opendistro/_None/api/FOO/BAR'
+    assert request['status'] == 201
+    assert request['bytes_sent'] == len('{"foo": "bar"}')
+    assert request['bytes_received'] == len('{"status": "CREATED"}')
+    assert request['total'] >= request['ttfb'] >= 0
+    assert 'dns' in metrics.requests[0]
+
+
+def test_summary():
+    metrics = RequestMetrics()
+    metrics.record(dict(status=200, total=0.25, bytes_sent=0, bytes_received=10))
+    metrics.record(dict(status=200, total=0.5, bytes_sent=5, bytes_received=2))
+    metrics.record(dict(status=None, total=1.0, bytes_sent=0, bytes_received=0, error='refused'))
+
+    summary = metrics.summary()
+
+    assert summary['calls'] == 3
+    assert summary['total'] == 1.75
+    assert summary['bytes_sent'] == 5
+    assert summary['bytes_received'] == 12
+    assert summary['status_codes'] == {'200': 2, 'None': 1}
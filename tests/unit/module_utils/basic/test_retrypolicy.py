@@ -0,0 +1,92 @@
+from httpretty import HTTPretty
+import pytest
+from ansible_collections.jiuka.opendistro.plugins.module_utils import basic
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import BaseApi, RetryPolicy
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(basic.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+@pytest.fixture
+def base_api(ansible_module):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_nodes/_local/plugins', body='{}')
+    ansible_module.params.update(retries=3, retry_backoff=0.5, retry_max_time=60)
+    return BaseApi(ansible_module, 'foobar')
+
+
+@pytest.mark.parametrize('method,retry_patch,result', [
+    ('GET', False, True),
+    ('PUT', False, True),
+    ('DELETE', False, True),
+    ('PATCH', False, False),
+    ('PATCH', True, True),
+    ('POST', True, False),
+])
+def test_retryable(method, retry_patch, result):
+    assert RetryPolicy(retry_patch=retry_patch).retryable(method) is result
+
+
+def test_delay_backoff():
+    policy = RetryPolicy(retries=5, backoff=1)
+
+    for attempt in range(5):
+        assert 0 <= policy.delay('GET', attempt, basic.time.time(), 503) <= 2 ** attempt
+    assert policy.delay('GET', 5, basic.time.time(), 503) is None
+
+
+@pytest.mark.parametrize('code', [200, 201, 400, 404, 500])
+def test_delay_not_retried(code):
+    assert RetryPolicy().delay('GET', 0, basic.time.time(), code) is None
+
+
+def test_delay_retry_after():
+    assert RetryPolicy().delay('GET', 0, basic.time.time(), 429, [('Retry-After', '7')]) == 7
+
+
+def test_delay_max_time():
+    assert RetryPolicy(max_time=5).delay('GET', 0, basic.time.time(), 429, [('Retry-After', '7')]) is None
+
+
+def test_retry_policy_zero(ansible_module):
+    ansible_module.params.update(retries=3, retry_backoff=0, retry_max_time=0)
+    policy = BaseApi(ansible_module, 'foobar').retry_policy
+
+    assert policy.backoff == 0
+    assert policy.max_time == 0
+
+
+def test_retry(base_api, sleeps):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_None/api/FOO', responses=[
+        HTTPretty.Response(body='{}', status=503),
+        HTTPretty.Response(body='{}', status=429, adding_headers={'Retry-After': '2'}),
+        HTTPretty.Response(body='{"foo": "bar"}', status=200),
+    ])
+
+    code, data = base_api.get('FOO')
+
+    assert code == 200
+    assert data == {'foo': 'bar'}
+    assert len(sleeps) == 2
+    assert sleeps[1] == 2
+
+
+def test_retry_exhausted(base_api, sleeps):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_None/api/FOO', body='{}', status=503)
+
+    code, data = base_api.get('FOO')
+
+    assert code == 503
+    assert len(sleeps) == 3
+
+
+def test_no_retry_patch(base_api, sleeps):
+    HTTPretty.register_uri(HTTPretty.PATCH, 'https://es:9200/_opendistro/_None/api/FOO', body='{}', status=503)
+
+    code, data = base_api.patch('FOO', data=[])
+
+    assert code == 503
+    assert sleeps == []
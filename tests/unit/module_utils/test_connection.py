@@ -0,0 +1,52 @@
+from httpretty import HTTPretty
+import pytest
+from ansible_collections.jiuka.opendistro.plugins.module_utils.connection import ConnectionPool
+
+
+@pytest.fixture
+def pool():
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/FOO', body='{}', connection='keep-alive')
+    return ConnectionPool(maxsize=1, idle_timeout=60)
+
+
+def test_request(pool):
+    code, headers, data = pool.request('GET', 'https://es:9200/FOO', headers={'X-Foo': 'bar'})
+
+    assert code == 200
+    assert data == b'{}'
+    assert HTTPretty.last_request.path == '/FOO'
+    assert HTTPretty.last_request.headers.get('X-Foo') == 'bar'
+
+
+def test_reuse(pool):
+    pool.request('GET', 'https://es:9200/FOO')
+    conn, reused = pool._acquire(('https', 'es', 9200))
+
+    assert reused
+
+
+def test_maxsize(pool):
+    first, dummy = pool._acquire(('https', 'es', 9200))
+    second, dummy = pool._acquire(('https', 'es', 9200))
+    pool._release(('https', 'es', 9200), first)
+    pool._release(('https', 'es', 9200), second)
+
+    assert len(pool._idle[('https', 'es', 9200)]) == 1
+
+
+def test_idle_timeout(pool):
+    pool.idle_timeout = 0
+    pool.request('GET', 'https://es:9200/FOO')
+    conn, reused = pool._acquire(('https', 'es', 9200))
+
+    assert not reused
+
+
+def test_stream(pool):
+    code, headers, body = pool.request('GET', 'https://es:9200/FOO', stream=True)
+
+    assert code == 200
+    assert not pool._idle
+
+    assert b''.join(body) == b'{}'
+    assert len(pool._idle[('https', 'es', 9200)]) == 1
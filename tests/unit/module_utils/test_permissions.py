@@ -0,0 +1,148 @@
+import pytest
+from ansible_collections.jiuka.opendistro.plugins.module_utils.permissions import PermissionResolver, PatternMatcher, AccessChecker
+
+
+INTERNALUSERS = {
+    'admin': {'backend_roles': ['admin'], 'reserved': True},
+    'alice': {'backend_roles': ['dev', 'ops'], 'opendistro_security_roles': ['own_index']},
+    'bob': {'backend_roles': ['dev']},
+    'svc-logs': {'backend_roles': []},
+}
+
+ROLESMAPPING = {
+    'all_access': {'backend_roles': ['admin'], 'users': []},
+    'developer': {'backend_roles': ['dev'], 'users': []},
+    'operator': {'and_backend_roles': ['dev', 'ops']},
+    'logs_writer': {'users': ['svc-*']},
+    'auditor': {'users': ['/a.ic./']},
+    'ghost': {'users': ['bob']},
+}
+
+ROLES = {
+    'all_access': {'cluster_permissions': ['*'], 'index_permissions': [{'index_patterns': ['*'], 'allowed_actions': ['*']}]},
+    'developer': {'cluster_permissions': ['cluster_monitor'],
+                  'index_permissions': [{'index_patterns': ['dev-*'], 'allowed_actions': ['crud'], 'dls': ''}],
+                  'tenant_permissions': [{'tenant_patterns': ['dev'], 'allowed_actions': ['kibana_all_write']}]},
+    'operator': {'cluster_permissions': ['cluster:admin/settings/update']},
+    'logs_writer': {'index_permissions': [{'index_patterns': ['logs-*'], 'allowed_actions': ['write']}]},
+    'auditor': {'cluster_permissions': ['cluster_monitor']},
+    'own_index': {'index_permissions': [{'index_patterns': ['alice'], 'allowed_actions': ['read']}]},
+}
+
+ACTIONGROUPS = {
+    'read': {'allowed_actions': ['indices:data/read*']},
+    'write': {'allowed_actions': ['indices:data/write*']},
+    'crud': {'allowed_actions': ['read', 'write', 'indices:admin/mapping/put']},
+    'cluster_monitor': ['cluster:monitor/*'],
+    'kibana_all_write': {'allowed_actions': ['kibana:saved_objects/*/write']},
+    'loop_a': {'allowed_actions': ['loop_b', 'a']},
+    'loop_b': {'allowed_actions': ['loop_a', 'b']},
+}
+
+
+@pytest.fixture
+def resolver():
+    return PermissionResolver(INTERNALUSERS, ROLESMAPPING, ROLES, ACTIONGROUPS)
+
+
+@pytest.mark.parametrize('name,roles', [
+    ('admin', ['all_access']),
+    ('alice', ['auditor', 'developer', 'operator', 'own_index']),
+    ('bob', ['developer', 'ghost']),
+    ('svc-logs', ['logs_writer']),
+    ('nobody', []),
+])
+def test_roles_of(resolver, name, roles):
+    assert resolver.roles_of(name) == roles
+
+
+def test_users_of(resolver):
+    assert resolver.users_of('developer') == ['alice', 'bob']
+    assert resolver.users_of('operator') == ['alice']
+    assert resolver.users_of('nope') == []
+
+
+def test_expand(resolver):
+    assert resolver.expand(['crud', 'indices:monitor/stats']) == [
+        'indices:admin/mapping/put', 'indices:data/read*', 'indices:data/write*', 'indices:monitor/stats']
+    assert resolver.expand(['cluster_monitor']) == ['cluster:monitor/*']
+
+
+def test_expand_loop(resolver):
+    assert resolver.expand(['loop_b']) == ['a', 'b']
+    assert resolver.expand(['loop_a']) == ['a', 'b']
+
+
+def test_permissions(resolver):
+    permissions = resolver.permissions('bob')
+
+    assert permissions['roles'] == ['developer', 'ghost']
+    assert permissions['missing_roles'] == ['ghost']
+    assert permissions['cluster_permissions'] == ['cluster:monitor/*']
+    assert permissions['index_permissions'] == [{
+        'index_patterns': ['dev-*'],
+        'dls': '',
+        'role': 'developer',
+        'allowed_actions': ['indices:admin/mapping/put', 'indices:data/read*', 'indices:data/write*'],
+    }]
+    assert permissions['tenant_permissions'] == [{
+        'tenant_patterns': ['dev'],
+        'role': 'developer',
+        'allowed_actions': ['kibana:saved_objects/*/write'],
+    }]
+
+
+def test_permissions_memoized(resolver):
+    assert resolver.permissions('alice')['index_permissions'][0] is resolver.permissions('bob')['index_permissions'][0]
+
+
+@pytest.mark.parametrize('name,expected', [
+    ('logs', True),
+    ('logs-2020', True),
+    ('log', False),
+    ('metrics-1', True),
+    ('metrics-10', False),
+    ('audit', True),
+    ('audit-x', False),
+    ('a.b', True),
+    ('axb', False),
+    ('other', False),
+])
+def test_pattern_matcher(name, expected):
+    matcher = PatternMatcher(['logs*', 'metrics-?', 'audit', '/a\\.b/'])
+
+    assert matcher.match(name) == expected
+
+
+def test_pattern_matcher_all():
+    assert PatternMatcher(['*']).match('anything')
+    assert not PatternMatcher([]).match('anything')
+
+
+def test_pattern_matcher_invalid():
+    with pytest.raises(ValueError, match='Invalid pattern /a\\(/'):
+        PatternMatcher(['logs*', '/a(/'])
+
+
+@pytest.mark.parametrize('user,action,index,expected', [
+    ('admin', 'indices:admin/delete', 'anything', True),
+    ('bob', 'indices:data/read/search', 'dev-1', True),
+    ('bob', 'indices:data/read/search', 'prod-1', False),
+    ('bob', 'indices:admin/delete', 'dev-1', False),
+    ('bob', 'cluster:monitor/health', None, True),
+    ('bob', 'cluster:admin/settings/update', None, False),
+    ('alice', 'cluster:admin/settings/update', None, True),
+    ('alice', 'indices:data/read/get', 'alice', True),
+    ('alice', 'indices:data/read/get', 'bob', False),
+    ('carol', 'indices:data/read/get', 'home-carol', True),
+    ('carol', 'indices:data/read/get', 'home-bob', False),
+    ('svc-logs', 'indices:data/write/bulk', 'logs-1', True),
+    ('nobody', 'indices:data/read/get', 'logs-1', False),
+])
+def test_access_checker(user, action, index, expected):
+    users = dict(INTERNALUSERS, carol={'backend_roles': ['home']})
+    mapping = dict(ROLESMAPPING, home={'backend_roles': ['home']})
+    roles = dict(ROLES, home={'index_permissions': [{'index_patterns': ['home-${user.name}'], 'allowed_actions': ['read']}]})
+    checker = AccessChecker(users, mapping, roles, ACTIONGROUPS)
+
+    assert checker.allowed(user, action, index) == expected
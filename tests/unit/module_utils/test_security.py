@@ -1,6 +1,6 @@
 from httpretty import HTTPretty
 import pytest
-from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi, fields_patch, plan_collection, select_collection
 
 
 @pytest.fixture
@@ -20,3 +20,77 @@ def test_get(base_api):
     assert HTTPretty.last_request.path == '/_opendistro/_security/api/FOO/BAR'
 
     assert data == {}
+
+
+CURRENT = {
+    'admin': {'reserved': True, 'backend_roles': ['admin']},
+    'foo': {'reserved': False, 'backend_roles': ['a', 'b'], 'attributes': {}, 'description': 'Foo'},
+    'bar': {'reserved': False, 'backend_roles': []},
+}
+
+
+def test_plan_collection_unchanged():
+    patch, plan, before, after = plan_collection(CURRENT, {
+        'foo': {'backend_roles': ['b', 'a'], 'attributes': {}, 'password': 'secret'},
+        'bar': {'backend_roles': []},
+    }, write_only=('password',))
+
+    assert patch == []
+    assert plan == dict(created=[], updated=[], removed=[])
+
+
+def test_plan_collection():
+    patch, plan, before, after = plan_collection(CURRENT, {
+        'foo': {'backend_roles': ['c'], 'description': None},
+        'baz': {'hash': 'x', 'backend_roles': []},
+    }, purge=True)
+
+    assert patch == [
+        {'op': 'add', 'path': '/baz', 'value': {'hash': 'x', 'backend_roles': []}},
+        {'op': 'replace', 'path': '/foo/backend_roles', 'value': ['c']},
+        {'op': 'remove', 'path': '/bar'},
+    ]
+    assert plan == dict(created=['baz'], updated=['foo'], removed=['bar'])
+    assert before == {'foo': CURRENT['foo'], 'bar': CURRENT['bar']}
+    assert after['foo'] == dict(CURRENT['foo'], backend_roles=['c'])
+
+
+@pytest.mark.parametrize('fields,patch', [
+    (dict(index_permissions=[], tenant_permissions=[]), []),
+    (dict(cluster_permissions=['b', 'a']), []),
+    (dict(cluster_permissions=[]), [{'op': 'replace', 'path': '/cluster_permissions', 'value': []}]),
+    (dict(description='', index_permissions=[{'index_patterns': ['foo']}]),
+     [{'op': 'add', 'path': '/index_permissions', 'value': [{'index_patterns': ['foo']}]}]),
+])
+def test_fields_patch(fields, patch):
+    current = {'cluster_permissions': ['a', 'b'], 'index_permissions': [], 'tenant_permissions': [], 'description': ''}
+
+    assert fields_patch(current, fields) == patch
+
+
+COLLECTION = [
+    ('foo2', {'backend_roles': ['b'], 'description': 'Foo 2'}),
+    ('bar', {'backend_roles': ['a'], 'description': 'Bar'}),
+    ('foo1', {'backend_roles': ['a'], 'description': 'Foo 1'}),
+]
+
+
+@pytest.mark.parametrize('kwargs,names,total', [
+    (dict(), ['bar', 'foo1', 'foo2'], 3),
+    (dict(names=['bar', 'nope']), ['bar'], 1),
+    (dict(names=['foo*']), ['foo1', 'foo2'], 2),
+    (dict(regex='o[0-9]$'), ['foo1', 'foo2'], 2),
+    (dict(offset=1, limit=1), ['foo1'], 3),
+    (dict(names=['foo*'], offset=1), ['foo2'], 2),
+])
+def test_select_collection(kwargs, names, total):
+    selected, count = select_collection(iter(COLLECTION), **kwargs)
+
+    assert list(selected) == names
+    assert count == total
+
+
+def test_select_collection_fields():
+    selected, count = select_collection(iter(COLLECTION), names=['bar'], fields=['backend_roles'])
+
+    assert selected == {'bar': {'backend_roles': ['a']}}
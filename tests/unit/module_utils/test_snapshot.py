@@ -0,0 +1,83 @@
+from httpretty import HTTPretty
+import os
+import pytest
+from ansible_collections.jiuka.opendistro.plugins.module_utils.security import SecurityApi
+from ansible_collections.jiuka.opendistro.plugins.module_utils.snapshot import SnapshotReader, SnapshotWriter, SnapshotError
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = str(tmp_path / 'snapshot.zip')
+    with SnapshotWriter(path) as writer:
+        writer.write_server({'version': '7.8.0'})
+        writer.write_collection('internalusers', [('admin', {'reserved': True}), ('foo/bar', {'backend_roles': ['a']})])
+        writer.write_collection('roles', [])
+    return path
+
+
+def test_writer(snapshot):
+    assert os.stat(snapshot).st_mode & 0o777 == 0o600
+    assert not os.path.exists('{0}.{1}.tmp'.format(snapshot, os.getpid()))
+
+
+def test_writer_changed(snapshot):
+    with SnapshotWriter(snapshot) as writer:
+        writer.write_server({'version': '7.8.0'})
+        writer.write_collection('internalusers', [('foo/bar', {'backend_roles': ['a']}), ('admin', {'reserved': True})])
+        writer.write_collection('roles', [])
+    assert not writer.changed
+
+    with SnapshotWriter(snapshot) as writer:
+        writer.write_server({'version': '7.8.0'})
+        writer.write_collection('internalusers', [('admin', {'reserved': True})])
+    assert writer.changed
+
+
+def test_reader_entity(snapshot):
+    reader = SnapshotReader(snapshot)
+
+    assert reader.server == {'version': '7.8.0'}
+    assert reader.request('GET', 'https://es:9200/_opendistro/_security/api/internalusers/admin') == \
+        (200, [], b'{"admin": {"reserved": true}}')
+    assert reader.request('GET', 'https://es:9200/_opendistro/_security/api/internalusers/foo%2Fbar')[0] == 200
+    assert reader.request('GET', 'https://es:9200/_opendistro/_security/api/internalusers/foo/bar')[0] == 200
+    assert reader.request('GET', 'https://es:9200/_opendistro/_security/api/internalusers/baz')[0] == 404
+
+
+def test_reader_collection(snapshot):
+    reader = SnapshotReader(snapshot)
+
+    assert reader.request('GET', 'https://es:9200/_opendistro/_security/api/internalusers') == \
+        (200, [], b'{"admin": {"reserved": true}, "foo/bar": {"backend_roles": ["a"]}}')
+    assert reader.request('GET', 'https://es:9200/_opendistro/_security/api/roles') == (200, [], b'{}')
+
+
+def test_reader_errors(snapshot, tmp_path):
+    reader = SnapshotReader(snapshot)
+
+    with pytest.raises(SnapshotError):
+        reader.request('GET', 'https://es:9200/_opendistro/_security/api/tenants')
+    with pytest.raises(SnapshotError):
+        reader.request('PATCH', 'https://es:9200/_opendistro/_security/api/internalusers')
+    with pytest.raises(SnapshotError):
+        SnapshotReader(str(tmp_path / 'missing.zip'))
+
+
+def test_api_check_mode(ansible_module, snapshot):
+    ansible_module.check_mode = True
+    ansible_module.params.update(snapshot=snapshot)
+    api = SecurityApi(ansible_module, 'foobar')
+
+    assert api.server == {'version': '7.8.0'}
+    assert api.get('internalusers', 'admin') == (200, {'admin': {'reserved': True}})
+    assert list(api.iter_collection('internalusers')) == [('admin', {'reserved': True}), ('foo/bar', {'backend_roles': ['a']})]
+    assert HTTPretty.latest_requests == []
+
+
+def test_api_not_check_mode(ansible_module, snapshot):
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_security/api/internalusers/admin', body='{}')
+    ansible_module.params.update(snapshot=snapshot)
+    api = SecurityApi(ansible_module, 'foobar')
+
+    assert api.get('internalusers', 'admin') == (200, {})
+    assert HTTPretty.last_request.path == '/_opendistro/_security/api/internalusers/admin'
@@ -0,0 +1,78 @@
+import pytest
+from ansible.errors import AnsibleFilterError
+from ansible_collections.jiuka.opendistro.plugins.module_utils.snapshot import SnapshotWriter
+from ansible_collections.jiuka.opendistro.plugins.plugin_utils import access
+from ansible_collections.jiuka.opendistro.plugins.plugin_utils.access import access_checker
+from ansible_collections.jiuka.opendistro.plugins.filter.access_check import access_check
+from ansible_collections.jiuka.opendistro.plugins.test.allowed import allowed
+
+
+CONFIG = {
+    'internalusers': {'bob': {'backend_roles': ['dev']}},
+    'rolesmapping': {'developer': {'backend_roles': ['dev']}},
+    'roles': {'developer': {'cluster_permissions': ['cluster:monitor/*'],
+                            'index_permissions': [{'index_patterns': ['dev-*'], 'allowed_actions': ['read']}]}},
+    'actiongroups': {'read': {'allowed_actions': ['indices:data/read*']}},
+}
+
+
+def test_access_checker_cache():
+    assert access_checker(CONFIG) is access_checker(dict(CONFIG))
+    assert access_checker(CONFIG) is not access_checker(dict(CONFIG, internalusers={}))
+
+
+def test_access_checker_version(monkeypatch):
+    calls = []
+    monkeypatch.setattr(access, '_checkers', {})
+    monkeypatch.setattr(access, 'fingerprint', lambda value: calls.append(value) or 'key')
+
+    for dummy in range(3):
+        assert access_checker(dict(CONFIG, version='1')).allowed('bob', 'cluster:monitor/health')
+    assert access_checker(dict(CONFIG, version='1')) is not access_checker(dict(CONFIG, version='2'))
+
+    assert calls == []
+
+
+def test_access_checker_invalid_pattern():
+    config = dict(CONFIG, roles={'developer': {'index_permissions': [{'index_patterns': ['/dev-(/'], 'allowed_actions': ['read']}]}})
+    with pytest.raises(AnsibleFilterError, match='Invalid pattern /dev-\\(/'):
+        allowed('bob', config, 'indices:data/read/search', 'dev-1')
+    with pytest.raises(AnsibleFilterError, match='Invalid pattern /\\[/'):
+        access_checker(dict(CONFIG, rolesmapping={'developer': {'users': ['/[/']}}))
+
+
+def test_access_checker_snapshot(tmp_path):
+    path = str(tmp_path / 'snapshot.zip')
+    with SnapshotWriter(path) as writer:
+        for collection in ('internalusers', 'rolesmapping', 'roles', 'actiongroups'):
+            writer.write_collection(collection, CONFIG[collection].items())
+
+    assert access_checker(path).allowed('bob', 'indices:data/read/get', 'dev-1')
+    assert access_checker(path) is access_checker(path)
+
+
+def test_access_checker_errors(tmp_path):
+    with pytest.raises(AnsibleFilterError):
+        access_checker(str(tmp_path / 'missing.zip'))
+    with pytest.raises(AnsibleFilterError):
+        access_checker(['internalusers'])
+
+
+def test_access_check():
+    assert access_check(CONFIG, [
+        dict(user='bob', action='indices:data/read/search', index='dev-1'),
+        dict(user='bob', action='indices:data/write/index', index='dev-1'),
+        dict(user='bob', action='cluster:monitor/health'),
+    ]) == [
+        dict(user='bob', action='indices:data/read/search', index='dev-1', allowed=True),
+        dict(user='bob', action='indices:data/write/index', index='dev-1', allowed=False),
+        dict(user='bob', action='cluster:monitor/health', allowed=True),
+    ]
+
+    with pytest.raises(AnsibleFilterError):
+        access_check(CONFIG, [dict(user='bob')])
+
+
+def test_allowed():
+    assert allowed('bob', CONFIG, 'indices:data/read/search', 'dev-1')
+    assert not allowed('alice', CONFIG, 'indices:data/read/search', 'dev-1')
@@ -0,0 +1,75 @@
+from unittest.mock import MagicMock
+
+import httpretty
+from httpretty import HTTPretty
+import pytest
+from ansible_collections.jiuka.opendistro.plugins.module_utils.basic import BaseApi
+from ansible_collections.jiuka.opendistro.plugins.plugin_utils.action import OpenDistroActionModule, run_module
+
+
+@pytest.fixture(autouse=True)
+def httpretty_setup(monkeypatch):
+    monkeypatch.setattr(BaseApi, 'shared_clients', None)
+    httpretty.enable(False)
+    yield
+    httpretty.disable()
+    httpretty.reset()
+
+
+def test_run_module():
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_security/api/internalusers/foo',
+                           body='{"foo": {"backend_roles": []}}')
+
+    result = run_module('jiuka.opendistro.user_info', dict(name='foo', elasticsearch_url='https://es:9200', cache_dir=None))
+
+    assert result['exists']
+    assert result['user'] == {'foo': {'backend_roles': []}}
+    assert BaseApi.shared_clients
+
+
+def test_run_module_shared_client():
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_nodes/_local/plugins',
+                           body='{"nodes": {"n1": {"name": "es", "version": "7.8.0", "plugins": []}}}')
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_security/api/roles/foo', body='{}', status=404)
+
+    for dummy in range(2):
+        result = run_module('jiuka.opendistro.role', dict(name='foo', elasticsearch_url='https://es:9200', cache_dir=None,
+                                                          _ansible_check_mode=True))
+        assert result['changed']
+        assert result['server']['version'] == '7.8.0'
+
+    assert [request.path for request in HTTPretty.latest_requests] == [
+        '/_nodes/_local/plugins',
+        '/_opendistro/_security/api/roles/foo',
+        '/_opendistro/_security/api/roles/foo',
+    ]
+
+
+def test_run_module_fail():
+    result = run_module('jiuka.opendistro.user_info', dict(name='foo'))
+
+    assert result['failed']
+    assert result['msg'] == 'missing required arguments: elasticsearch_url'
+
+
+def action_module(**args):
+    task = MagicMock(args=args, async_val=0)
+    return OpenDistroActionModule(task, MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock())
+
+
+def test_existing_users():
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_security/api/internalusers',
+                           body='{"foo": {}, "bar": {}}')
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_security/api/internalusers/foo', body='{"foo": {}}')
+    HTTPretty.register_uri(HTTPretty.GET, 'https://es:9200/_opendistro/_security/api/internalusers/baz', body='{}', status=404)
+    action = action_module(elasticsearch_url='https://es:9200', server_info_cache_ttl=0)
+
+    assert action._existing_users(['foo', 'baz', 'qux']) == set(['foo'])
+    assert action._existing_users(['foo']) == set(['foo'])
+    assert action._existing_users(['baz']) == set()
+
+
+def test_existing_users_unreachable(monkeypatch):
+    monkeypatch.delenv('ELASTICSEARCH_URL', raising=False)
+
+    assert action_module()._existing_users(['foo']) == set()
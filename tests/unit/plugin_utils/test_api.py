@@ -0,0 +1,34 @@
+import pytest
+from ansible.errors import AnsibleError
+from ansible_collections.jiuka.opendistro.plugins.plugin_utils.api import ControllerModule
+
+
+def test_params():
+    module = ControllerModule(dict(elasticsearch_url='https://es:9200', validate_certs='no', foo='bar'))
+
+    assert module.params['elasticsearch_url'] == 'https://es:9200'
+    assert module.params['validate_certs'] is False
+    assert module.params['connection_pool_size'] == 4
+    assert module.params['foo'] == 'bar'
+
+
+def test_env_fallback(monkeypatch):
+    monkeypatch.setenv('ELASTICSEARCH_URL', 'https://env:9200')
+
+    module = ControllerModule(dict())
+
+    assert module.params['elasticsearch_url'] == 'https://env:9200'
+
+
+def test_no_url(monkeypatch):
+    monkeypatch.delenv('ELASTICSEARCH_URL', raising=False)
+
+    with pytest.raises(AnsibleError, match='elasticsearch_url'):
+        ControllerModule(dict())
+
+
+def test_fail_json():
+    module = ControllerModule(dict(elasticsearch_url='https://es:9200'))
+
+    with pytest.raises(AnsibleError, match=r'Error \(HTTP 500: boom\)'):
+        module.fail_json(msg='Error', http_code=500, http_body='boom')
@@ -0,0 +1,50 @@
+import bcrypt
+import pytest
+from ansible_collections.jiuka.opendistro.plugins.plugin_utils.password import PasswordHasher, hash_passwords
+
+
+@pytest.fixture
+def hasher():
+    return PasswordHasher(rounds=4, workers=1)
+
+
+def test_hash(hasher):
+    pwhash = hasher.hash('foo', 'secret')
+
+    assert pwhash.startswith('$2a$04$')
+    assert bcrypt.checkpw(b'secret', pwhash.encode())
+
+
+def test_hash_memoized(hasher):
+    assert hasher.hash('foo', 'memo') == hasher.hash('foo', 'memo')
+
+
+def test_hash_salted_per_user(hasher):
+    assert hasher.hash('foo', 'shared') != hasher.hash('bar', 'shared')
+
+
+def test_hash_many():
+    hasher = PasswordHasher(rounds=4, workers=2)
+    hashes = hasher.hash_many([('foo', 'secret'), ('bar', 'other'), ('foo', 'secret'), ('baz', 'secret')])
+
+    assert hashes[0] == hashes[2]
+    assert hashes[0] != hashes[3]
+    assert bcrypt.checkpw(b'other', hashes[1].encode())
+    assert bcrypt.checkpw(b'secret', hashes[3].encode())
+
+
+def test_hash_passwords(hasher):
+    users = [
+        dict(name='new', password='secret'),
+        dict(name='old', password='secret'),
+        dict(name='update', password='secret', update_password=True),
+        dict(name='gone', password='secret', state='absent'),
+        dict(name='hashed', password_hash='$2a$04$foo'),
+    ]
+
+    hash_passwords(hasher, users, existing=set(['old', 'update', 'gone']))
+
+    assert [user.get('password', None) for user in users] == [None] * 5
+    assert [bool(user.get('password_hash', None)) for user in users] == [True, False, True, False, True]
+    assert users[0]['password_hash'] == hasher.hash('new', 'secret')
+    assert users[4]['password_hash'] == '$2a$04$foo'